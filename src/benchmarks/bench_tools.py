@@ -0,0 +1,328 @@
+"""
+Tool-layer benchmark: every tool from return_all_implemented_tools() against the offline
+stand-in server (tools/shared/stand_in_server.py), so no network or GitHub token is needed.
+
+Run from src/:
+    python -m benchmarks.bench_tools                      # measure and print
+    python -m benchmarks.bench_tools --update-baseline    # measure and store benchmarks/baseline.json
+    python -m benchmarks.bench_tools --check              # measure and exit 1 on a regression
+
+Per tool it reports cold latency (first call on a fresh worker pool, including the worker
+start), warm latency percentiles, and for read-only tools the throughput under concurrency.
+Peak RSS of this process and of the largest server worker is reported at the end (Linux only).
+
+Numbers depend on the machine: create the baseline on the machine that runs the check.
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+MIN_DELTA_MS = 1.0   # differences below this are timer noise, never a regression
+
+OWNER, REPO = "bench", "tools"
+
+# Tools that can be called concurrently with the same arguments.
+READ_ONLY = {
+    "list_notifications", "search_users", "list_issues", "get_issue", "get_file_contents", "get_me", "get_file",
+    "search_repositories", "list_commits", "get_commit_details", "list_branches", "list_tree", "search_issues",
+    "get_issue_comments", "search_pull_requests", "list_pull_requests", "get_pull_request",
+    "get_pull_request_diff", "get_pull_request_files", "get_pull_request_reviews", "get_pull_request_status",
+    "get_workflow_run_logs", "get_workflow_run_usage", "list_workflow_runs", "get_tool_output",
+}
+
+
+def _json(response: dict):
+    return json.loads(response["result"]["content"][0]["text"])
+
+
+def setup(call_mcp) -> dict:
+    """Create the issue, branches, pull requests and workflow run the tool cases point at."""
+    from tools.shared import staging, tool_output
+
+    repo = {"owner": OWNER, "repo": REPO}
+    ctx = dict(repo)
+    ctx["issue"] = _json(call_mcp("create_issue", dict(repo, title="Benchmark issue", body="bench")))["number"]
+    call_mcp("create_branch", dict(repo, branch="bench-head", from_branch="main"))
+    call_mcp("push_files", dict(repo, branch="bench-head", message="bench",
+                                files=[{"path": "bench/a.txt", "content": "a\n" * 200}, {"path": "src/main.py", "content": "print(1)\n"}]))
+
+    def pull(title):
+        return _json(call_mcp("create_pull_request", dict(repo, title=title, head="bench-head", base="main")))["number"]
+
+    ctx["pull"] = pull("Benchmark pull request")
+    ctx["review_pull"] = pull("Pending review target")
+    call_mcp("create_pending_pull_request_review", dict(repo, pullNumber=ctx["review_pull"]))
+    ctx["submit_pull"] = pull("Pending review submit target")
+    ctx["new_pull"] = lambda: pull("Throwaway pull request")
+    ctx["pending_review"] = lambda number: call_mcp("create_pending_pull_request_review", dict(repo, pullNumber=number))
+    ctx["stage"] = lambda path: staging.stage(OWNER, REPO, "main", path, "x", "bench")
+    ctx["push"] = lambda path: call_mcp("push_files", dict(repo, branch="main", message="bench", files=[{"path": path, "content": "x"}]))
+
+    call_mcp("run_workflow", dict(repo, workflow_id="bench.yml", ref="main"))
+    ctx["run"] = _json(call_mcp("list_workflow_runs", dict(repo, workflow_id="bench.yml")))["workflow_runs"][0]["id"]
+    ctx["sha"] = _json(call_mcp("list_commits", dict(repo)))[0]["sha"]
+    ctx["output"] = tool_output.store("benchmark output line\n" * 2000)
+    return ctx
+
+
+def _prepared(fn: Callable[[dict, int], None], args: Callable[[dict, int], dict]) -> Callable[[dict, int], dict]:
+    """Case whose untimed setup `fn` runs before each call."""
+    def case(ctx, i):
+        fn(ctx, i)
+        return args(ctx, i)
+    return case
+
+
+def _r(ctx, **kwargs) -> dict:
+    return dict(owner=ctx["owner"], repo=ctx["repo"], **kwargs)
+
+
+# tool name -> (ctx, iteration) -> arguments
+CASES: Dict[str, Callable[[dict, int], dict]] = {
+    "list_notifications": lambda c, i: {},
+    "search_users": lambda c, i: {"query": "bench"},
+    "list_issues": lambda c, i: _r(c),
+    "update_issue": lambda c, i: _r(c, issue_number=c["issue"], title=f"Benchmark issue {i}"),
+    "add_issue_comment": lambda c, i: _r(c, issue_number=str(c["issue"]), comment_body=f"comment {i}"),
+    "get_issue": lambda c, i: _r(c, issue_number=c["issue"]),
+    "create_issue": lambda c, i: _r(c, title=f"Issue {i}", body="body"),
+    "get_file_contents": lambda c, i: _r(c, path="src/main.py"),
+    "create_branch": lambda c, i: _r(c, branch=f"bench-branch-{i}-{time.perf_counter_ns()}", from_branch="main"),
+    "create_repository": lambda c, i: {"name": f"bench-repo-{i}-{time.perf_counter_ns()}"},
+    "get_me": lambda c, i: {},
+    "get_file": lambda c, i: _r(c, path="src/main.py", branch="main"),
+    "create_or_update_file": lambda c, i: _r(c, path=f"bench/new-{i}-{time.perf_counter_ns()}.txt", branch="main",
+                                             content="x", message="bench"),
+    "delete_file": _prepared(lambda c, i: c["push"](f"bench/delete-{i}.txt"),
+                             lambda c, i: _r(c, path=f"bench/delete-{i}.txt", branch="main", message="bench")),
+    "flush_staged_changes": _prepared(lambda c, i: c["stage"](f"bench/staged-{i}-{time.perf_counter_ns()}.txt"),
+                                      lambda c, i: _r(c, branch="main")),
+    "push_multiple_files": lambda c, i: _r(c, branch="bench-head", message="bench",
+                                           files=[{"path": "bench/pushed.txt", "content": str(i)}]),
+    "search_repositories": lambda c, i: {"query": "bench"},
+    "list_commits": lambda c, i: _r(c),
+    "get_commit_details": lambda c, i: _r(c, sha=c["sha"]),
+    "list_branches": lambda c, i: _r(c),
+    "list_tree": lambda c, i: _r(c),
+    "search_issues": lambda c, i: {"query": "bench"},
+    "get_issue_comments": lambda c, i: _r(c, issue_number=c["issue"]),
+    "search_pull_requests": lambda c, i: {"query": "bench"},
+    "list_pull_requests": lambda c, i: _r(c),
+    "create_pull_request": lambda c, i: _r(c, title=f"Pull request {i}", head="bench-head", base="main"),
+    "get_pull_request": lambda c, i: _r(c, pullNumber=c["pull"]),
+    "get_pull_request_diff": lambda c, i: _r(c, pullNumber=c["pull"]),
+    "get_pull_request_files": lambda c, i: _r(c, pullNumber=c["pull"]),
+    "get_pull_request_reviews": lambda c, i: _r(c, pullNumber=c["pull"]),
+    "update_pull_request": lambda c, i: _r(c, pullNumber=c["pull"], title=f"Benchmark pull request {i}"),
+    "merge_pull_request": lambda c, i: _r(c, pullNumber=c["new_pull"]()),
+    "create_pending_pull_request_review": lambda c, i: _r(c, pullNumber=c["new_pull"]()),
+    "add_pull_request_review_comment_to_pending_review": lambda c, i: _r(c, pullNumber=c["review_pull"], path="src/main.py",
+                                                                         body=f"note {i}", subjectType="FILE"),
+    "delete_pending_pull_request_review": _prepared(lambda c, i: c["pending_review"](c["submit_pull"]),
+                                                    lambda c, i: _r(c, pullNumber=c["submit_pull"])),
+    "submit_pending_pull_request_review": _prepared(lambda c, i: c["pending_review"](c["submit_pull"]),
+                                                    lambda c, i: _r(c, pullNumber=c["submit_pull"], event="COMMENT", body="ok")),
+    "create_and_submit_pull_request_review": lambda c, i: _r(c, pullNumber=c["pull"], body="ok", event="COMMENT"),
+    "get_pull_request_status": lambda c, i: _r(c, pullNumber=c["pull"]),
+    "cancel_workflow_run": lambda c, i: _r(c, run_id=c["run"]),
+    "get_workflow_run_logs": lambda c, i: _r(c, run_id=c["run"]),
+    "get_workflow_run_usage": lambda c, i: _r(c, run_id=c["run"]),
+    "list_workflow_runs": lambda c, i: _r(c, workflow_id="bench.yml"),
+    "rerun_workflow_run": lambda c, i: _r(c, run_id=c["run"]),
+    "run_workflow": lambda c, i: _r(c, workflow_id="bench.yml", ref="main"),
+    "get_tool_output": lambda c, i: {"handle": c["output"], "offset": -6000},
+}
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def _failed(output) -> bool:
+    text = str(output)
+    return text.startswith(("Error", "Exception")) or "Exception during" in text or "failed:" in text.lower()
+
+
+def _timed(tool, args: dict):
+    started = time.perf_counter()
+    try:
+        output = tool.invoke(args)
+        ok = not _failed(output)
+    except Exception:
+        ok = False
+    return (time.perf_counter() - started) * 1000, ok
+
+
+def bench_tool(tool, ctx: dict, iterations: int, concurrency: int, shutdown_pool) -> dict:
+    case = CASES[tool.name]
+
+    args = case(ctx, 0)
+    shutdown_pool()
+    cold_ms, cold_ok = _timed(tool, args)
+
+    warm, errors = [], 0 if cold_ok else 1
+    for i in range(1, iterations + 1):
+        ms, ok = _timed(tool, case(ctx, i))
+        warm.append(ms)
+        errors += not ok
+
+    result = {
+        "cold_ms": round(cold_ms, 3),
+        "p50_ms": round(percentile(warm, 50), 3),
+        "p95_ms": round(percentile(warm, 95), 3),
+        "p99_ms": round(percentile(warm, 99), 3),
+        "mean_ms": round(sum(warm) / len(warm), 3),
+        "errors": errors,
+    }
+
+    if tool.name in READ_ONLY:
+        args = case(ctx, 0)
+        calls = iterations * concurrency
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lambda _: _timed(tool, args), range(calls)))
+        result["throughput_per_s"] = round(calls / (time.perf_counter() - started), 1)
+    result["worker_peak_rss_kb"] = worker_peak_rss_kb()
+    return result
+
+
+def worker_peak_rss_kb() -> int:
+    """Largest peak RSS (VmHWM) among the live pool workers; 0 where /proc is not available."""
+    from tools.shared.session_pool import get_pool
+    peak = 0
+    for session in list(get_pool()._sessions):
+        try:
+            with open(f"/proc/{session.proc.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        peak = max(peak, int(line.split()[1]))
+        except OSError:
+            pass
+    return peak
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Human-readable regressions of `current` against `baseline` (warm p50/p95 and throughput)."""
+    regressions = []
+    for name, now in current["tools"].items():
+        before = baseline.get("tools", {}).get(name)
+        if before is None:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            if now[metric] > before[metric] * (1 + tolerance) and now[metric] - before[metric] > MIN_DELTA_MS:
+                regressions.append(f"{name}: {metric} {before[metric]} -> {now[metric]}")
+        if "throughput_per_s" in now and "throughput_per_s" in before:
+            if now["throughput_per_s"] < before["throughput_per_s"] * (1 - tolerance):
+                regressions.append(f"{name}: throughput_per_s {before['throughput_per_s']} -> {now['throughput_per_s']}")
+        if now["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {now['errors']}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every agent tool against the offline stand-in MCP server.")
+    parser.add_argument("--iterations", type=int, default=50, help="warm calls per tool (default 50)")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel callers in the throughput run (default 8)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated server latency per call")
+    parser.add_argument("--tools", help="comma-separated tool names (default: all)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a tool regressed against the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed relative slowdown (default 0.25)")
+    parser.add_argument("--output", help="also write the results JSON here")
+    args = parser.parse_args(argv)
+
+    os.environ["MCP_STAND_IN"] = "1"
+    os.environ["MCP_STAND_IN_LATENCY_MS"] = str(args.latency_ms)
+    os.environ.pop("MCP_STAND_IN_FIXTURES", None)
+    os.environ.pop("MCP_STAND_IN_STRICT", None)
+    os.environ.setdefault("GITHUB_PERSONAL_ACCESS_TOKEN", "benchmark")
+    # measure the real write path, not the staging area
+    os.environ.setdefault("STAGE_WRITES", "0")
+    os.environ.setdefault("MCP_POOL_SIZE", str(max(2, args.concurrency // 2)))
+
+    from tools.shared import call_mcp, return_all_implemented_tools
+    from tools.shared.session_pool import shutdown_pool
+
+    tools = return_all_implemented_tools()
+    if args.tools:
+        wanted = set(args.tools.split(","))
+        tools = [t for t in tools if t.name in wanted]
+    missing = [t.name for t in tools if t.name not in CASES]
+    if missing:
+        print(f"No benchmark case for: {', '.join(missing)}")
+        return 2
+
+    ctx = setup(call_mcp)
+    results = {}
+    print(f"{'tool':<52}{'cold':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'calls/s':>10}{'err':>5}")
+    for tool in tools:
+        # tools print progress; keep it out of the table
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            r = bench_tool(tool, ctx, args.iterations, args.concurrency, shutdown_pool)
+        results[tool.name] = r
+        print(f"{tool.name:<52}{r['cold_ms']:>9.2f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+              f"{r.get('throughput_per_s', float('nan')):>10.1f}{r['errors']:>5}")
+    shutdown_pool()
+
+    report = {
+        "config": {
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "peak_rss_kb": {
+            "process": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0,
+            "largest_worker": max(r["worker_peak_rss_kb"] for r in results.values()) if results else 0,
+        },
+        "tools": results,
+    }
+    print(f"\nPeak RSS: process {report['peak_rss_kb']['process']} KiB, "
+          f"largest worker {report['peak_rss_kb']['largest_worker']} KiB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; create one with --update-baseline")
+            return 2
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config", {}) != report["config"]:
+            print(f"Warning: baseline was measured with {baseline.get('config')}")
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
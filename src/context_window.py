@@ -0,0 +1,168 @@
+import json
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import tiktoken
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage, SystemMessage
+
+TOKENIZER_MODEL = "gpt-4o-mini"
+
+# prompt tokens each role may spend on conversation history (the role's system message not included)
+DEFAULT_BUDGETS = {
+    "analyst": 12000,
+    "architect": 16000,
+    "programmer": 32000,
+    "tester": 24000,
+}
+DEFAULT_BUDGET = 16000
+SUMMARY_SHARE = 8          # 1/8 of the budget is kept for the summary of older messages
+MESSAGE_OVERHEAD = 4       # role and separators per message, as the chat format counts them
+
+MAX_COUNTED_MESSAGES = 100_000
+MAX_CACHED_SUMMARIES = 4096
+
+_encoder = None
+_encoder_failed = False
+_token_counts: Dict[str, int] = {}
+_summaries: "OrderedDict[Tuple[str, int], Tuple[str, int]]" = OrderedDict()
+
+
+def budget(role: Optional[str]) -> int:
+    """Token budget of `role`; CONTEXT_TOKEN_BUDGETS="programmer=48000,analyst=8000" overrides the defaults."""
+    for item in os.getenv("CONTEXT_TOKEN_BUDGETS", "").split(","):
+        name, _, value = item.partition("=")
+        if name.strip() == role and value.strip():
+            return int(value)
+    return DEFAULT_BUDGETS.get(role or "", DEFAULT_BUDGET)
+
+
+def _text(msg: BaseMessage) -> str:
+    if isinstance(msg.content, str):
+        return msg.content
+    parts = [p if isinstance(p, str) else p.get("text", "") for p in msg.content if isinstance(p, (str, dict))]
+    return "\n".join(parts)
+
+
+def count_text(text: str) -> int:
+    global _encoder, _encoder_failed
+    if _encoder is None and not _encoder_failed:
+        try:
+            _encoder = tiktoken.encoding_for_model(TOKENIZER_MODEL)
+        except Exception as e:
+            # the encoding is downloaded on first use; estimate if that is not possible
+            _encoder_failed = True
+            print(f"Token counts are estimated (tokenizer unavailable: {e.__class__.__name__})")
+    if _encoder is None:
+        return len(text) // 4 + 1
+    return len(_encoder.encode(text, disallowed_special=()))
+
+
+def count_tokens(msg: BaseMessage) -> int:
+    """Prompt tokens of one message (text and tool calls), counted once per message id."""
+    cached = _token_counts.get(msg.id) if msg.id else None
+    if cached is not None:
+        return cached
+    text = _text(msg)
+    for call in getattr(msg, "tool_calls", None) or []:
+        text += call.get("name", "") + json.dumps(call.get("args", {}), ensure_ascii=False)
+    tokens = count_text(text) + MESSAGE_OVERHEAD
+    if msg.id:
+        if len(_token_counts) >= MAX_COUNTED_MESSAGES:
+            _token_counts.clear()
+        _token_counts[msg.id] = tokens
+    return tokens
+
+
+def _clip(text: str, limit: int) -> str:
+    text = re.sub(r"\s+", " ", text).strip()
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _summarize_unit(unit: Sequence[BaseMessage]) -> Tuple[str, int]:
+    """
+    Extractive summary of one step (a message and the tool results answering it): the
+    request or reply text, the tool calls with their arguments and the first line of each
+    result. Cached by the step's first message, since old steps never change.
+    """
+    key = (unit[0].id or "", len(unit))
+    if key[0] and key in _summaries:
+        _summaries.move_to_end(key)
+        return _summaries[key]
+    lines = []
+    for msg in unit:
+        if isinstance(msg, HumanMessage):
+            lines.append(f"- user: {_clip(_text(msg), 400)}")
+        elif isinstance(msg, ToolMessage):
+            text = _text(msg)
+            first = text.strip().splitlines()[0] if text.strip() else ""
+            lines.append(f"  -> {msg.name or 'tool'}: {_clip(first, 120)} ({len(text)} chars)")
+        elif isinstance(msg, AIMessage):
+            if _text(msg).strip():
+                lines.append(f"- assistant: {_clip(_text(msg), 300)}")
+            for call in msg.tool_calls or []:
+                args = ", ".join(f"{k}={_clip(str(v), 60)}" for k, v in call.get("args", {}).items())
+                lines.append(f"- called {call.get('name')}({args})")
+    text = "\n".join(lines)
+    summary = (text, count_text(text) + 1)
+    if key[0]:
+        _summaries[key] = summary
+        while len(_summaries) > MAX_CACHED_SUMMARIES:
+            _summaries.popitem(last=False)
+    return summary
+
+
+def _unit(msgs: Sequence[BaseMessage], starts: Sequence[int], i: int) -> Sequence[BaseMessage]:
+    return msgs[starts[i]:starts[i + 1] if i + 1 < len(starts) else len(msgs)]
+
+
+def _summary_message(msgs: Sequence[BaseMessage], starts: Sequence[int], count: int, limit: int) -> Optional[SystemMessage]:
+    """
+    The first `count` steps as a summary within `limit` tokens: the first step (the task)
+    and as many of the latest as fit.
+    """
+    if count <= 0 or limit <= 0:
+        return None
+    first, first_tokens = _summarize_unit(_unit(msgs, starts, 0))
+    used = first_tokens
+    kept: List[str] = []
+    i = count - 1
+    while i > 0:
+        text, tokens = _summarize_unit(_unit(msgs, starts, i))
+        if used + tokens > limit:
+            break
+        kept.append(text)
+        used += tokens
+        i -= 1
+    omitted = [f"- ... {i} earlier steps omitted"] if i > 0 else []
+    body = "\n".join([first, *omitted, *reversed(kept)])
+    return SystemMessage(content="Summary of the earlier part of this conversation (older messages are not shown):\n" + body)
+
+
+def build_context(msgs: Sequence[BaseMessage], starts: Sequence[int], role: Optional[str]) -> List[BaseMessage]:
+    """
+    The history to prompt `role` with, within its token budget.
+
+    `starts` are the indices where a step begins (every message but a ToolMessage), so a
+    tool call is never separated from its results. Whole steps are taken from the newest
+    backward while they fit (the newest is always taken); the steps before that are
+    replaced by one summary message, which gets at least 1/SUMMARY_SHARE of the budget.
+    """
+    if not msgs or not starts:
+        return []
+    total = budget(role)
+    reserve = total // SUMMARY_SHARE
+    used = 0
+    i = len(starts) - 1
+    while i >= 0:
+        tokens = sum(count_tokens(m) for m in _unit(msgs, starts, i))
+        if i < len(starts) - 1 and used + tokens > total - reserve:
+            break
+        used += tokens
+        i -= 1
+    recent = list(msgs[starts[i + 1]:])
+    if i < 0:
+        return recent
+    summary = _summary_message(msgs, starts, i + 1, max(reserve, total - used))
+    return ([summary] if summary is not None else []) + recent
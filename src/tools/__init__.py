@@ -4,6 +4,7 @@ from .shared import *
 from .issues import *
 from .pull_requests import *
 from .workflows import *
+from .outputs import *
 
 __all__ = (
     repository_management.__all__ +
@@ -11,5 +12,6 @@ __all__ = (
     user.__all__ +
     shared.__all__ +
     pull_requests.__all__ +
-    workflows.__all__ 
+    workflows.__all__ +
+    outputs.__all__
 )
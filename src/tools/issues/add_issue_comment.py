@@ -1,8 +1,7 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 import json
 
-@tool("add_issue_comment")
+@mcp_tool("add_issue_comment")
 def add_issue_comment_tool(owner: str, repo: str, issue_number: str, comment_body:str) -> str:
     """
     Add a comment to a specific GitHub issue.
@@ -25,7 +24,7 @@ def add_issue_comment_tool(owner: str, repo: str, issue_number: str, comment_bod
             "body": comment_body
         }
 
-        result = call_mcp("add_issue_comment", payload)
+        result = yield McpCall("add_issue_comment", payload)
 
         if "error" in result:
             return f"Error: {result['error']['message']}"
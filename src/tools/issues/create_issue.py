@@ -1,8 +1,7 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 import json
 
-@tool("create_issue")
+@mcp_tool("create_issue")
 def create_issue_tool(owner: str, repo: str, title:str, body:str) -> str:
     """
     Create a new issue in a GitHub repository.
@@ -27,7 +26,7 @@ def create_issue_tool(owner: str, repo: str, title:str, body:str) -> str:
             "body": body
         }
 
-        result = call_mcp("create_issue", payload)
+        result = yield McpCall("create_issue", payload)
 
         if "error" in result:
             return f"Error: {result['error']}"
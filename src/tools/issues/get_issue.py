@@ -1,8 +1,7 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 import json
 
-@tool("get_issue")
+@mcp_tool("get_issue")
 def get_issue_tool(owner: str, repo: str, issue_number: int) -> str:
     """
     Get details of a specific issue in a GitHub repository.
@@ -22,7 +21,7 @@ def get_issue_tool(owner: str, repo: str, issue_number: int) -> str:
             "issue_number": int(issue_number)
         }
 
-        result = call_mcp("get_issue", payload)
+        result = yield McpCall("get_issue", payload)
 
         if "error" in result:
             return f"Error: {result['error']['message']}"
@@ -1,8 +1,7 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 import json
 
-@tool("get_issue_comments")
+@mcp_tool("get_issue_comments")
 def get_issue_comments_tool(owner: str, repo: str, issue_number: int) -> str:
     """
     Get comments for a specific issue in a GitHub repository.
@@ -24,7 +23,7 @@ def get_issue_comments_tool(owner: str, repo: str, issue_number: int) -> str:
             "issue_number": int(issue_number)
         }
 
-        result = call_mcp("get_issue_comments", payload)
+        result = yield McpCall("get_issue_comments", payload)
 
         if "error" in result:
             return f"Error: {result['error']['message']}"
@@ -1,17 +1,15 @@
-from ..shared.call_mcp import call_mcp
-import json
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, BlockingCall
+from ..shared.pagination import collect, more_note
 
-@tool("list_issues")
+@mcp_tool("list_issues")
 def list_issues_tool(
     owner: str,
     repo: str,
     direction: str = "desc",
     labels: list[str] = [],
-    perPage: int = 30,
-    page: int = 1,
     sort: str = "created",
-    state: str = "open"
+    state: str = "open",
+    limit: int = 30
 ) -> str:
     """
     List issues in a GitHub repository.
@@ -21,10 +19,9 @@ def list_issues_tool(
         repo (str): Repository name
         direction (str): Sort direction ("asc" or "desc")
         labels (list[str]): Filter by labels
-        perPage (int): Results per page (min 1, max 100)
-        page (int): Page number for pagination (min 1)
         sort (str): Sort by field ("created", "updated", "comments")
         state (str): Filter by issue state ("open", "closed", "all")
+        limit (int): Maximum number of issues to return, fetched across pages as needed; 0 = all (default 30)
     
     Example:
     'DanielRiha8906/testicek|state=open|labels=bug,urgent'
@@ -38,27 +35,21 @@ def list_issues_tool(
         "repo": repo,
         "direction": direction,
         "labels": labels,
-        "perPage": perPage,
-        "page": page,
         "sort": sort,
         "state": state
         }
 
-        result = call_mcp("list_issues", payload)
-
-        if "error" in result:
-            return f"Error: {result['error']['message']}"
-
-        text = result["result"]["content"][0]["text"]
-        issues = json.loads(text)
+        limit = max(0, 30 if limit is None else limit)
+        issues = yield BlockingCall(collect, "list_issues", payload, limit=limit or None)
 
         if not issues:
             return "No issues found."
 
-        return "\n".join(
-            f"{issue['number']}: {issue['title']} ({issue['state']}) — {issue['html_url']}"
-            for issue in issues[:10]
-        )
+        lines = [f"{issue['number']}: {issue['title']} ({issue['state']}) — {issue['html_url']}" for issue in issues]
+        note = more_note(issues, limit)
+        if note:
+            lines.append(note)
+        return "\n".join(lines)
 
     except Exception as e:
         return f"Exception in list_issues: {str(e)}"
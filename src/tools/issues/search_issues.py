@@ -1,9 +1,8 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 import json
 from typing import Optional
 
-@tool("search_issues")
+@mcp_tool("search_issues")
 def search_issues_tool(query: str, owner: Optional[str] = None, repo: Optional[str] = None, sort: Optional[str] = None, order: Optional[str] = None, page: int = 1, perPage: int = 30
 ) -> str:
     """
@@ -34,7 +33,7 @@ def search_issues_tool(query: str, owner: Optional[str] = None, repo: Optional[s
 
         payload = {key: value for key, value in payload.items() if value is not None}
 
-        result = call_mcp("search_issues", payload)
+        result = yield McpCall("search_issues", payload)
 
         if "error" in result:
             return f"Error: {result['error']['message']}"
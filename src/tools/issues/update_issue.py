@@ -1,9 +1,8 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 import json
 from typing import Optional
 
-@tool("update_issue")
+@mcp_tool("update_issue")
 def update_issue_tool(
     owner: str,
     repo: str,
@@ -47,7 +46,7 @@ def update_issue_tool(
 
         payload = {key: value for key, value in payload.items() if value is not None}
 
-        result = call_mcp("update_issue", payload)
+        result = yield McpCall("update_issue", payload)
 
         if "error" in result:
             return f"Error: {result['error']['message']}"
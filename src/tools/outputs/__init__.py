@@ -0,0 +1,3 @@
+from .get_tool_output import get_tool_output_tool
+
+__all__ = ["get_tool_output_tool"]
\ No newline at end of file
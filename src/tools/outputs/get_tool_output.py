@@ -0,0 +1,28 @@
+from langchain_core.tools import tool
+
+from ..shared.tool_output import DEFAULT_MAX_CHARS, fetch
+
+MAX_READ_CHARS = 20000
+
+
+@tool("get_tool_output")
+def get_tool_output_tool(handle: str, offset: int = 0, length: int = DEFAULT_MAX_CHARS) -> str:
+    """
+    Read the full output of an earlier tool call that was shortened, by the handle it named.
+    args:
+        handle: The handle from the note, e.g. 'out-1a2b3c4d'.
+        offset: Character offset to start at; negative counts from the end (e.g. -6000 for the end of a log).
+        length: How many characters to return (at most 20000).
+    Returns:
+        The requested part of the output and where it sits in the whole, or an error message.
+    """
+    try:
+        text = fetch(handle)
+        if text is None:
+            return f"Error: no stored output '{handle}'; outputs are kept for this run only and the oldest are dropped."
+        start = max(0, len(text) + int(offset)) if int(offset) < 0 else min(int(offset), len(text))
+        end = min(len(text), start + max(1, min(int(length), MAX_READ_CHARS)))
+        more = f"; continue with offset={end}" if end < len(text) else ""
+        return f"{text[start:end]}\n[chars {start}-{end} of {len(text)}{more}]"
+    except Exception as e:
+        return f"Exception during get_tool_output: {str(e)}"
@@ -1,9 +1,8 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 from typing import Optional
 
 
-@tool("add_pull_request_review_comment_to_pending_review")
+@mcp_tool("add_pull_request_review_comment_to_pending_review")
 def add_pull_request_review_comment_to_pending_review_tool(owner: str, repo:str, pullNumber: int, path: str, body: str, subjectType: str, line: Optional[int] = None, startline: Optional[int] = None, side: Optional[str] = None, startSide: Optional[str] = None) -> str:
     """
     Add a comment to the latest pending pull request review using MCP.
@@ -45,7 +44,7 @@ def add_pull_request_review_comment_to_pending_review_tool(owner: str, repo:str,
         if startSide is not None:
             payload["startSide"] = startSide
         
-        result = call_mcp("add_pull_request_review_comment_to_pending_review", payload)
+        result = yield McpCall("add_pull_request_review_comment_to_pending_review", payload)
         if "error" in result:
             return f"Failed to add review comment: {result['error']}"
 
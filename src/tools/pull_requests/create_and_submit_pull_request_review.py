@@ -1,8 +1,7 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 from typing import Optional
 
-@tool("create_and_submit_pull_request_review")
+@mcp_tool("create_and_submit_pull_request_review")
 def create_and_submit_pull_request_review_tool(owner: str, repo: str, pullNumber: int, body: str, event: str, commitID: Optional[str] = None) -> str:
     """
     Create and submit a pull request review without comments using MCP.
@@ -33,7 +32,7 @@ def create_and_submit_pull_request_review_tool(owner: str, repo: str, pullNumber
         }
         if commitID is not None:
             payload["commitID"] = commitID
-        result = call_mcp("create_and_submit_pull_request_review", payload)
+        result = yield McpCall("create_and_submit_pull_request_review", payload)
         if "error" in result:
             return f"Failed to create and submit review: {result['error']}"
 
@@ -1,8 +1,7 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 from typing import Optional
 
-@tool("create_pending_pull_request_review")
+@mcp_tool("create_pending_pull_request_review")
 def create_pending_pull_request_review_tool(owner: str, repo: str, pullNumber: int, commitID: Optional[str] = None) -> str:
     """
     Create a pending review for a pull request using MCP.
@@ -25,7 +24,7 @@ def create_pending_pull_request_review_tool(owner: str, repo: str, pullNumber: i
         if commitID is not None:
             payload["commitID"] = commitID
 
-        result = call_mcp("create_pending_pull_request_review", payload)
+        result = yield McpCall("create_pending_pull_request_review", payload)
         if "error" in result:
             return f"Failed to create pending review: {result['error']}"
         
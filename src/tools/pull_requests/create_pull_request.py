@@ -1,8 +1,7 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 from typing import Optional
 
-@tool("create_pull_request")
+@mcp_tool("create_pull_request")
 def create_pull_request_tool(owner: str, repo: str, title: str, head: str, base: str, body: Optional[str] = None, draft: Optional[bool] = False, maintainer_can_modify: Optional[bool] = False ) -> str:
     """
     Create a new pull request in a GitHub repository using MCP.
@@ -39,7 +38,7 @@ def create_pull_request_tool(owner: str, repo: str, title: str, head: str, base:
         if maintainer_can_modify is not None and isinstance(maintainer_can_modify, bool):
             payload["maintainer_can_modify"] = maintainer_can_modify
 
-        result = call_mcp("create_pull_request", payload)
+        result = yield McpCall("create_pull_request", payload)
         if "error" in result:
             return f"Pull request creation failed: {result['error']}"
         return f"Pull request '{title}' created from '{head}' into '{base}' in '{owner}/{repo}'."
@@ -1,7 +1,6 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 
-@tool("delete_pending_pull_request_review")
+@mcp_tool("delete_pending_pull_request_review")
 def delete_pending_pull_request_review_tool(owner: str, repo: str, pullNumber: int) -> str:
     """
     Delete the latest pending pull request review using MCP.
@@ -20,7 +19,7 @@ def delete_pending_pull_request_review_tool(owner: str, repo: str, pullNumber: i
             "pullNumber": pullNumber
         }
 
-        result = call_mcp("delete_pending_pull_request_review", payload)
+        result = yield McpCall("delete_pending_pull_request_review", payload)
         if "error" in result:
             return f"Failed to delete pending review: {result['error']}"
 
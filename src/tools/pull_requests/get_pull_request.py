@@ -1,7 +1,6 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 
-@tool("get_pull_request")
+@mcp_tool("get_pull_request")
 def get_pull_request_tool(owner: str, repo: str, pullNumber: int) -> str:
     """
     Get details of a specific pull request from a GitHub repository using MCP.
@@ -20,7 +19,7 @@ def get_pull_request_tool(owner: str, repo: str, pullNumber: int) -> str:
             "pullNumber": pullNumber
         }
 
-        result = call_mcp("get_pull_request", payload)
+        result = yield McpCall("get_pull_request", payload)
         if "error" in result:
             return f"Get pull request failed: {result['error']}"
 
@@ -1,7 +1,6 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 
-@tool("get_pull_request_diff")
+@mcp_tool("get_pull_request_diff")
 def get_pull_request_diff_tool(owner: str, repo: str, pullNumber: int) -> str:
     """
     Get the diff of a specific pull request from a GitHub repository using MCP.
@@ -20,7 +19,7 @@ def get_pull_request_diff_tool(owner: str, repo: str, pullNumber: int) -> str:
             "pullNumber": pullNumber
         }
 
-        result = call_mcp("get_pull_request_diff", payload)
+        result = yield McpCall("get_pull_request_diff", payload)
         if "error" in result:
             return f"Get pull request diff failed: {result['error']}"
 
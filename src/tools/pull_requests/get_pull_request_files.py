@@ -1,8 +1,7 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 from typing import Optional
 
-@tool("get_pull_request_files")
+@mcp_tool("get_pull_request_files")
 def get_pull_request_files_tool(owner: str, repo: str, pullNumber: int, page: Optional[int] = 1, perPage: Optional[int] = 20 ) -> str:
     """
     Get the list of files changed in a specific pull request using MCP.
@@ -24,7 +23,7 @@ def get_pull_request_files_tool(owner: str, repo: str, pullNumber: int, page: Op
         if perPage is not None:
             payload["perPage"] = perPage
         
-        result = call_mcp("get_pull_request_files", payload)
+        result = yield McpCall("get_pull_request_files", payload)
         if "error" in result:
             return f"Get pull request files failed: {result['error']}"
 
@@ -1,7 +1,6 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 
-@tool("get_pull_request_reviews")
+@mcp_tool("get_pull_request_reviews")
 def get_pull_request_reviews_tool(owner: str, repo: str, pullNumber: int) -> str:
     """
     Get the list of reviews for a specific pull request using MCP.
@@ -18,7 +17,7 @@ def get_pull_request_reviews_tool(owner: str, repo: str, pullNumber: int) -> str
             "pullNumber": pullNumber
         }
 
-        result = call_mcp("get_pull_request_reviews", payload)
+        result = yield McpCall("get_pull_request_reviews", payload)
         if "error" in result:
             return f"Get pull request reviews failed: {result['error']}"
 
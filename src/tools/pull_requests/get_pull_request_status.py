@@ -1,7 +1,6 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 
-@tool("get_pull_request_status")
+@mcp_tool("get_pull_request_status")
 def get_pull_request_status_tool(owner: str, repo: str, pullNumber: int) -> str:
     """
     Get the status checks of a pull request using MCP.
@@ -18,7 +17,7 @@ def get_pull_request_status_tool(owner: str, repo: str, pullNumber: int) -> str:
             "pullNumber": pullNumber
         }
 
-        result = call_mcp("get_pull_request_status", payload)
+        result = yield McpCall("get_pull_request_status", payload)
         if "error" in result:
             return f"Failed to get PR status: {result['error']}"
 
@@ -1,8 +1,8 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, BlockingCall
+from ..shared.pagination import collect, more_note
 from typing import Optional
 
-@tool("list_pull_requests")
+@mcp_tool("list_pull_requests")
 def list_pull_requests_tool(
     owner: str,
     repo: str,
@@ -11,8 +11,7 @@ def list_pull_requests_tool(
     base: Optional[str] = None,
     sort: Optional[str] = "created",
     direction: Optional[str] = "desc",
-    page: Optional[int] = 1,
-    perPage: Optional[int] = 20
+    limit: Optional[int] = 20
 ) -> str:
     """
     List pull requests in a GitHub repository using MCP.
@@ -25,8 +24,7 @@ def list_pull_requests_tool(
         base (Optional[str]): The base branch of the pull request.
         sort (Optional[str]): The field to sort by (created, updated, popularity, long-running).
         direction (Optional[str]): The direction to sort (asc or desc).
-        page (Optional[int]): The page number for pagination.
-        perPage (Optional[int]): Number of results per page.
+        limit (Optional[int]): Maximum number of pull requests to return, fetched across pages as needed; 0 = all (default 20).
 
     Returns:
         str: A string representation of the pull requests or an error message.
@@ -42,15 +40,22 @@ def list_pull_requests_tool(
         if base: payload["base"] = base
         if sort: payload["sort"] = sort
         if direction: payload["direction"] = direction
-        if page: payload["page"] = page
-        if perPage: payload["perPage"] = perPage
 
-        result = call_mcp("list_pull_requests", payload)
-
-        if "error" in result:
-            return f"Listing pull requests failed: {result['error']}"
-
-        return result.get("result", "No pull requests found.")
+        limit = max(0, 20 if limit is None else limit)
+        pulls = yield BlockingCall(collect, "list_pull_requests", payload, limit=limit or None)
+
+        if not pulls:
+            return "No pull requests found."
+
+        lines = [
+            f"#{pr.get('number')}: {pr.get('title')} ({pr.get('state')}) "
+            f"{pr.get('head', {}).get('ref', '?')} -> {pr.get('base', {}).get('ref', '?')} — {pr.get('html_url', '')}"
+            for pr in pulls
+        ]
+        note = more_note(pulls, limit)
+        if note:
+            lines.append(note)
+        return "\n".join(lines)
 
     except Exception as e:
         return f"Exception during list_pull_requests: {str(e)}"
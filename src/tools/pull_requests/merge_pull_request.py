@@ -1,8 +1,9 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
+from ..shared import branch_index
+from ..shared.ref_resolver import invalidate
 from typing import Optional
 
-@tool("merge_pull_request")
+@mcp_tool("merge_pull_request")
 def merge_pull_request_tool(owner: str, repo: str, pullNumber: int, commit_title: Optional[str] = None, commit_message: Optional[str] = None, merge_method: Optional[str] = "merge" ) -> str:
     """
     Merge a pull request in a GitHub repository using MCP.
@@ -28,7 +29,12 @@ def merge_pull_request_tool(owner: str, repo: str, pullNumber: int, commit_title
         if merge_method: payload["merge_method"] = merge_method
 
 
-        result = call_mcp("merge_pull_request", payload)
+        try:
+            result = yield McpCall("merge_pull_request", payload)
+        finally:
+            # the base branch moved: stop serving reads from its old commit
+            invalidate(owner, repo)
+            branch_index.forget(owner, repo)
         if "error" in result:
             return f"Merge failed: {result['error']}"
 
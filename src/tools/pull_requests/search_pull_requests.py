@@ -1,8 +1,7 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 from typing import Optional
 
-@tool("search_pull_requests")
+@mcp_tool("search_pull_requests")
 def search_pull_requests_tool(query: str, owner: Optional[str] = None, repo: Optional[str] = None, sort: Optional[str] = None, order: Optional[str] = "desc", page: Optional[int] = 1, perPage: Optional[int] = 20  ) -> str:
     """
     Search for pull requests in GitHub repositories using query syntax.
@@ -35,7 +34,7 @@ def search_pull_requests_tool(query: str, owner: Optional[str] = None, repo: Opt
         if perPage:
             payload["perPage"] = perPage
             
-        result = call_mcp("search_pull_requests", payload)
+        result = yield McpCall("search_pull_requests", payload)
         if "error" in result:
             return f"Search failed: {result['error']}"
 
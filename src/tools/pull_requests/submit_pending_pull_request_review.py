@@ -1,8 +1,7 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 from typing import Optional
 
-@tool("submit_pending_pull_request_review")
+@mcp_tool("submit_pending_pull_request_review")
 def submit_pending_pull_request_review_tool(owner: str, repo: str, pullNumber: int, event: str, body: Optional[str]) -> str:
     """
     Submit the latest pending pull request review using MCP.
@@ -28,7 +27,7 @@ def submit_pending_pull_request_review_tool(owner: str, repo: str, pullNumber: i
         if body is not None:
             payload["body"] = body 
 
-        result = call_mcp("submit_pending_pull_request_review", payload)
+        result = yield McpCall("submit_pending_pull_request_review", payload)
         if "error" in result:
             return f"Failed to submit review: {result['error']}"
 
@@ -1,8 +1,7 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 from typing import Optional
 
-@tool("update_pull_request")
+@mcp_tool("update_pull_request")
 def update_pull_request_tool(owner: str, repo: str, pullNumber: int, title: Optional[str] = None, body: Optional[str] = None, state: Optional[str] = None, base: Optional[str] = None, maintainer_can_modify: Optional[bool] = None ) -> str:
     """
     Update an existing pull request in a GitHub repository using MCP.
@@ -37,7 +36,7 @@ def update_pull_request_tool(owner: str, repo: str, pullNumber: int, title: Opti
         if maintainer_can_modify is not None:
             payload["maintainer_can_modify"] = maintainer_can_modify
         
-        result = call_mcp("update_pull_request", payload)
+        result = yield McpCall("update_pull_request", payload)
         if "error" in result:
             return f"Update pull request failed: {result['error']}"
 
@@ -1,11 +1,13 @@
 from .create_branch import *
 from .create_repository import *
 from .delete_file import *
+from .flush_staged_changes import flush_staged_changes_tool
 from .get_commit import *
 from .get_file import *
 from .get_file_contents import *
 from .list_branches import *
 from .list_commits import *
+from .list_tree import list_tree_tool
 from .push_files import *
 from .search_repositories import *
 from .create_or_update_file import write_file_tool
@@ -13,11 +15,13 @@ from .create_or_update_file import write_file_tool
 __all__ = ["create_branch", 
            "create_repository_tool", 
            "delete_file_tool", 
+           "flush_staged_changes_tool", 
            "get_commit_tool", 
            "get_file_tool", 
            "get_file_contents_tool", 
            "list_branches_tool", 
            "list_commits_tool", 
+           "list_tree_tool", 
            "push_files_tool",
            "search_repositories_tool",
            "write_file_tool"]
\ No newline at end of file
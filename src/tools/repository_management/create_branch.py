@@ -1,9 +1,9 @@
 import json
-from langchain.tools import tool
-from ..shared.call_mcp import call_mcp
+from ..shared.mcp_tool import mcp_tool, McpCall
+from ..shared.ref_resolver import invalidate
 from typing import Optional
 
-@tool("create_branch")
+@mcp_tool("create_branch")
 def create_branch_tool(owner: str, repo: str, branch: str, from_branch: Optional[str] = None) -> str:
     """
     Create a new branch in a GitHub repository using MCP.
@@ -26,7 +26,11 @@ def create_branch_tool(owner: str, repo: str, branch: str, from_branch: Optional
             "from_branch": from_branch
         }
 
-        result = call_mcp("create_branch", payload)        
+        try:
+            result = yield McpCall("create_branch", payload)
+        finally:
+            # the branch moved (or may have): stop serving reads from its old commit
+            invalidate(owner, repo, branch)
         
         if "error" in result:
             return f"Branch creation failed: {result['error']}"
@@ -1,11 +1,14 @@
-from langchain_core.tools import tool
-from ..shared.call_mcp import call_mcp
-from .get_file import get_github_sha_and_content
+from ..shared import staging
+from ..shared.mcp_tool import mcp_tool
+from ..shared.ref_resolver import invalidate
+from .get_file import write_with_known_sha
 
-@tool("create_or_update_file")
+@mcp_tool("create_or_update_file")
 def write_file_tool(owner: str, repo: str, path: str, branch: str, content: str, message: str) -> str:
     """
     Write or update a file in a GitHub repo using MCP.
+    If write staging is on (STAGE_WRITES=1) the file is only staged: it is committed together
+    with the other staged changes on hand-off or by flush_staged_changes, not by this call.
     args:
         owner: The owner of the repository.
         repo: The name of the repository.
@@ -20,7 +23,12 @@ def write_file_tool(owner: str, repo: str, path: str, branch: str, content: str,
 
     """
     try:
-        sha, _ = get_github_sha_and_content(owner, repo, path, branch)
+        if staging.enabled():
+            # coalesced with the agent's other writes into one commit at hand-off
+            count = staging.stage(owner, repo, branch, path, content, message)
+            return (f"File '{path}' staged for branch '{branch}' in '{owner}/{repo}' "
+                    f"({count} change(s) pending; committed together on hand-off or flush_staged_changes).")
+
         payload = {
             "owner": owner,
             "repo": repo,
@@ -29,10 +37,13 @@ def write_file_tool(owner: str, repo: str, path: str, branch: str, content: str,
             "message": message,
             "branch": branch
         }
-        if sha:
-            payload["sha"] = sha
 
-        result = call_mcp("create_or_update_file", payload)
+        try:
+            # the file's SHA comes from earlier reads/writes in this run when we have it
+            result, _ = yield from write_with_known_sha("create_or_update_file", owner, repo, path, branch, payload)
+        finally:
+            # the branch moved (or may have): stop serving reads from its old commit
+            invalidate(owner, repo, branch)
         if "error" in result:
             return f"Write failed: {result['error']}"
         return f"File '{path}' written successfully to branch '{branch}' in '{owner}/{repo}'."
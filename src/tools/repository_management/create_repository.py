@@ -1,7 +1,6 @@
-from ..shared.call_mcp import call_mcp
-from langchain_core.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 from typing import Optional
-@tool("create_repository")
+@mcp_tool("create_repository")
 def create_repository_tool(name: str, description: Optional[str] = None, private: Optional[bool] = True, autoInit: Optional[bool] = True ) -> str:
     """
     Create a new GitHub repository using MCP.
@@ -24,7 +23,7 @@ def create_repository_tool(name: str, description: Optional[str] = None, private
 
         payload = {key: value for key, value in payload.items() if value is not None}
 
-        result = call_mcp("create_repository", payload)
+        result = yield McpCall("create_repository", payload)
         if "error" in result:
             return f"Failed to create repo: {result['error']}"
         return f"Repository '{name}' created successfully."
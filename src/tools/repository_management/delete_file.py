@@ -1,11 +1,14 @@
-from ..shared.call_mcp import call_mcp
-from langchain_core.tools import tool
-from .get_file import get_github_sha_and_content
+from ..shared import staging
+from ..shared.mcp_tool import mcp_tool
+from ..shared.ref_resolver import invalidate
+from .get_file import write_with_known_sha
 
-@tool("delete_file")
+@mcp_tool("delete_file")
 def delete_file_tool(owner: str, repo: str, path: str, message: str, branch: str) -> str:
     """
     Delete a file from a GitHub repository using MCP.
+    If write staging is on (STAGE_WRITES=1) the deletion is only staged: it is committed together
+    with the other staged changes on hand-off or by flush_staged_changes, not by this call.
     args:
         owner: The owner of the repository.
         repo: The name of the repository.
@@ -20,20 +23,26 @@ def delete_file_tool(owner: str, repo: str, path: str, message: str, branch: str
         'DanielRiha8906/testicek|path/to/file.txt|Delete file| Update file content|main'
     """
     try:
-        sha, _ = get_github_sha_and_content(owner, repo, path, branch)
-        if not sha:
-            return f"Error: Could not retrieve SHA for '{path}' in '{owner}/{repo}@{branch}'"
+        if staging.enabled():
+            count = staging.stage(owner, repo, branch, path, None, message)
+            return (f"Deletion of '{path}' staged for branch '{branch}' in '{owner}/{repo}' "
+                    f"({count} change(s) pending; committed on hand-off or flush_staged_changes).")
 
         payload = {
             "owner": owner,
             "repo": repo,
             "path": path,
             "message": message,
-            "branch": branch,
-            "sha": sha
+            "branch": branch
         }
 
-        result = call_mcp("delete_file", payload)
+        try:
+            result, _ = yield from write_with_known_sha("delete_file", owner, repo, path, branch, payload)
+        finally:
+            # the branch moved (or may have): stop serving reads from its old commit
+            invalidate(owner, repo, branch)
+        if result is None:
+            return f"Error: Could not retrieve SHA for '{path}' in '{owner}/{repo}@{branch}'"
         if "error" in result:
             return f"File deletion failed: {result['error'].get('message', str(result['error']))}"
 
@@ -0,0 +1,71 @@
+from ..shared import staging
+from ..shared.mcp_tool import mcp_tool
+from ..shared.ref_resolver import invalidate
+from .get_file import write_with_known_sha
+from .push_files import commit_files
+
+def flush_staged(owner=None, repo=None, branch=None):
+    """
+    Commit staged changes (see shared/staging.py), for use with `yield from` inside an @mcp_tool.
+
+    Per branch, all staged writes go out as one push_files commit; staged deletions follow
+    as delete_file calls (push_files cannot delete). Whatever could not be committed is
+    staged again. Returns one summary line per branch.
+    """
+    lines = []
+    for staged in staging.take(owner, repo, branch):
+        where = f"{staged.owner}/{staged.repo}@{staged.branch}"
+        writes = [{"path": p, "content": c} for p, c in staged.changes.items() if c is not None]
+        deletes = [p for p, c in staged.changes.items() if c is None]
+        message = staged.commit_message()
+        try:
+            if writes:
+                result = yield from commit_files(staged.owner, staged.repo, staged.branch, writes, message)
+                if "error" in result:
+                    raise RuntimeError(result["error"])
+                for f in writes:
+                    staged.changes.pop(f["path"])
+            missing = []
+            for path in deletes:
+                payload = {"owner": staged.owner, "repo": staged.repo, "path": path,
+                           "message": message, "branch": staged.branch}
+                try:
+                    result, _ = yield from write_with_known_sha("delete_file", staged.owner, staged.repo, path, staged.branch, payload)
+                finally:
+                    invalidate(staged.owner, staged.repo, staged.branch)
+                if result is not None and "error" in result:
+                    raise RuntimeError(result["error"])
+                if result is None:
+                    missing.append(path)
+                staged.changes.pop(path)
+        except Exception as e:
+            staging.restore(staged)
+            lines.append(f"{where}: flush failed, {len(staged.changes)} change(s) still staged: {e}")
+            continue
+        line = f"{where}: committed {len(writes)} file(s), deleted {len(deletes) - len(missing)} file(s)."
+        if missing:
+            line += f" Not found, nothing to delete: {', '.join(missing)}."
+        lines.append(line)
+    return lines
+
+@mcp_tool("flush_staged_changes")
+def flush_staged_changes_tool(owner: str = "", repo: str = "", branch: str = "") -> str:
+    """
+    Commit the file writes and deletions staged by create_or_update_file / delete_file.
+    Staging is off unless STAGE_WRITES=1. All staged writes for a branch become a single commit.
+    Staged changes are also flushed automatically when an agent hands off; changes that fail to
+    commit stay staged and must be fixed and flushed before the run ends.
+    args:
+        owner: Only flush this owner's repositories (optional).
+        repo: Only flush this repository (optional).
+        branch: Only flush this branch (optional).
+    Returns:
+        One line per flushed branch, or a message that nothing was staged.
+    Example:
+        'owner="DanielRiha8906", repo="testicek", branch="feature-x"'
+    """
+    try:
+        lines = yield from flush_staged(owner or None, repo or None, branch or None)
+        return "\n".join(lines) if lines else "No staged changes."
+    except Exception as e:
+        return f"Exception during flush_staged_changes: {str(e)}"
@@ -1,9 +1,8 @@
-from ..shared.call_mcp import call_mcp
-from langchain_core.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 import json
 from typing import Optional
 
-@tool("get_commit_details")
+@mcp_tool("get_commit_details")
 def get_commit_tool(owner: str, repo: str, sha: str, page: Optional[int] = 10, perPage: Optional[int] = 1) -> str:
     """
     Get all details of a specific commit.
@@ -25,7 +24,7 @@ def get_commit_tool(owner: str, repo: str, sha: str, page: Optional[int] = 10, p
                    "perPage": perPage}
         payload = {key: value for key, value in payload.items() if value is not None}
 
-        result = call_mcp("get_commit", payload)
+        result = yield McpCall("get_commit", payload)
 
         if "error" in result:
             return f"Get commit failed: {result['error'].get('message', str(result['error']))}"
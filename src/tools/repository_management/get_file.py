@@ -1,51 +1,147 @@
-import requests
-import os
 import base64
-from langchain.tools import tool
+import binascii
+from ..shared import blob_cache, branch_index, snapshot, staging
+from ..shared.etag_cache import cached_github_get
+from ..shared.http_client import contents_path, rest_available
+from ..shared.mcp_tool import mcp_tool, BlockingCall, McpCall
+from ..shared.ref_resolver import resolve_commit
 
 def get_github_sha_and_content(owner, repo, path, branch):
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}?ref={branch}"
-    headers = {
-        "Authorization": f"Bearer {os.getenv('GITHUB_PERSONAL_ACCESS_TOKEN')}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-    print(f"Fetching file from URL: {url}")
-    ## DEBUG
-    a = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN")
-    print(a[:8])
+    """
+    Fetch a file's blob SHA and decoded content over the GitHub REST API.
+
+    Uses the shared keep-alive session (see shared/http_client.py), so repeated lookups
+    reuse one TLS connection, and sends them as conditional requests (shared/etag_cache.py),
+    so an unchanged file is served from disk. Returns (sha, content), or ("", error text) on failure.
+    """
+    known = blob_cache.lookup(owner, repo, branch, path)
+    if known is not None:
+        return known[0], known[1].decode("utf-8")
     try:
-        response = requests.get(url, headers=headers)
-        print(f"Response status: {response.status_code}")
+        response = cached_github_get(contents_path(owner, repo, path), params={"ref": branch})
 
         if response.status_code == 200:
             data = response.json()
-            print(os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN"))
-            print(f"Response keys: {list(data.keys())}")
-            print(f"File SHA: {data.get('sha')}")
-            print(f"Content snippet (base64): {data.get('content', '')[:30]}...")
-
             if isinstance(data, dict) and data.get("type") == "file":
                 sha = data.get("sha", "")
                 content_b64 = data.get("content", "")
                 try:
-                    content = base64.b64decode(content_b64).decode("utf-8") if content_b64 else ""
+                    raw = base64.b64decode(content_b64) if content_b64 else b""
+                    content = raw.decode("utf-8")
                 except Exception as decode_error:
                     print(f"Decoding error: {decode_error}")
                     return "", f"[decode error]: {decode_error}"
+                blob_cache.remember(owner, repo, branch, path, raw, sha)
                 return sha, content
             else:
-                print("Warning: Path exists but is not a file.")
+                print(f"Warning: Path '{path}' exists but is not a file.")
                 return "", f"Path '{path}' is not a file."
         else:
-            print(f"Error: [{response.status_code}] {response.text}")
+            print(f"Error fetching '{path}': [{response.status_code}]")
             return "", f"[{response.status_code}] {response.text}"
     except Exception as e:
-        print(f"Unhandled exception: {e}")
+        print(f"Unhandled exception fetching '{path}': {e}")
+        return "", f"[exception] {e}"
+
+def _mcp_file_bytes(result):
+    """Raw bytes of a get_file_contents file result (text or blob resource), or None."""
+    for c in result.get("result", {}).get("content", []):
+        resource = c.get("resource") if isinstance(c, dict) and c.get("type") == "resource" else None
+        if isinstance(resource, dict):
+            if isinstance(resource.get("text"), str):
+                return resource["text"].encode("utf-8")
+            if isinstance(resource.get("blob"), str):
+                try:
+                    return base64.b64decode(resource["blob"])
+                except (ValueError, binascii.Error):
+                    return None
+    return None
+
+def file_sha_and_content(owner, repo, path, branch):
+    """
+    (sha, content) of a file, for use with `yield from` inside an @mcp_tool.
+
+    Goes over REST when a token is available, otherwise reads the file through the MCP
+    server and computes its git blob SHA locally. Either way the content ends up in the
+    blob cache. A local snapshot of the commit (shared/snapshot.py) is used when there is one.
+    Returns ("", error text) when the file cannot be read.
+    """
+    local = snapshot.read(owner, repo, branch, path)
+    if isinstance(local, bytes):
+        return blob_cache.git_blob_sha(local), local.decode("utf-8", errors="replace")
+    if rest_available():
+        sha, content = yield BlockingCall(get_github_sha_and_content, owner, repo, path, branch)
+        if sha:
+            branch_index.record(owner, repo, branch, path, sha)
+        return sha, content
+
+    known = blob_cache.lookup(owner, repo, branch, path)
+    if known is not None:
+        return known[0], known[1].decode("utf-8")
+    try:
+        payload = {"owner": owner, "repo": repo, "path": path}
+        if blob_cache.is_commit_sha(branch):
+            payload["sha"] = branch
+        else:
+            payload["ref"] = f"refs/heads/{branch}"
+        result = yield McpCall("get_file_contents", payload)
+    except Exception as e:
         return "", f"[exception] {e}"
+    if "truncated" in result or "spill" in result:
+        # a cut body would be cached and indexed under a SHA that does not exist on GitHub
+        return "", f"[truncated] the response for '{path}' was cut"
+    raw = _mcp_file_bytes(result)
+    if raw is None:
+        return "", f"Path '{path}' is not a file."
+    sha = blob_cache.remember(owner, repo, branch, path, raw)
+    branch_index.record(owner, repo, branch, path, sha)
+    return sha, raw.decode("utf-8", errors="replace")
+
+def _is_sha_conflict(error):
+    # 409: the sha we sent is not the file's current one; 422: we sent none but the file exists
+    return "409" in error or ("422" in error and "sha" in error.lower())
 
-file_cache = {}
+def write_with_known_sha(tool_name, owner, repo, path, branch, payload):
+    """
+    Send a create_or_update_file / delete_file call, for use with `yield from` inside an @mcp_tool.
+
+    The file's current blob SHA comes from shared/branch_index.py when this run has already
+    read or written the path on `branch`, so no lookup request is needed; otherwise it is
+    fetched with file_sha_and_content(). If the remembered SHA turns out to be stale (someone
+    else changed the file), it is fetched again and the call retried once.
+    Returns (result, sha used); a missing file gives an empty sha, and for delete_file no
+    call is made then (result is None).
+    """
+    sha = branch_index.known_sha(owner, repo, branch, path)
+    from_index = sha is not None
+    if not from_index:
+        sha, _ = yield from file_sha_and_content(owner, repo, path, branch)
+    if tool_name == "delete_file" and not sha:
+        return None, ""
+
+    while True:
+        call = dict(payload)
+        if sha:
+            call["sha"] = sha
+        try:
+            result = yield McpCall(tool_name, call)
+            break
+        except Exception as e:
+            if not from_index or not _is_sha_conflict(str(e)):
+                raise
+        branch_index.forget(owner, repo, branch, path)
+        sha, _ = yield from file_sha_and_content(owner, repo, path, branch)
+        from_index = False
+
+    if "error" not in result:
+        if tool_name == "delete_file":
+            branch_index.forget(owner, repo, branch, path)
+        else:
+            data = payload["content"].encode("utf-8")
+            branch_index.record(owner, repo, branch, path, blob_cache.get_blob_cache().put(data))
+    return result, sha
 
-@tool("get_file")
+@mcp_tool("get_file")
 def get_file_tool(owner: str, repo: str, path: str, branch: str) -> str:
     """
     Get a file's content from a GitHub repo.
@@ -65,11 +161,16 @@ def get_file_tool(owner: str, repo: str, path: str, branch: str) -> str:
         if not path.strip():
             return "Error: Path cannot be empty."
         
-        sha, content = get_github_sha_and_content(owner, repo, path.strip(), branch.strip())
+        found, staged = staging.staged_content(owner, repo, branch.strip(), path.strip())
+        if found:
+            return staged if staged is not None else f"Error: '{path}' is staged for deletion on branch '{branch}'."
 
-        cache_key = f"{owner}/{repo}/{path}"
-        file_cache[cache_key] = {"content": content, "sha": sha}
+        # read at the branch's current commit so repeated reads come from the blob cache
+        commit = yield from resolve_commit(owner, repo, branch.strip())
+        sha, content = yield from file_sha_and_content(owner, repo, path.strip(), commit or branch.strip())
+        if sha:
+            branch_index.record(owner, repo, branch.strip(), path.strip(), sha)
 
-        return content if content and not content.startswith("[") else f"Error: {content}"
+        return content if sha else f"Error: {content}"
     except Exception as e:
         return f"Error: {str(e)}"
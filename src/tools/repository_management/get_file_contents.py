@@ -2,8 +2,11 @@ from typing import Union, Optional, List, Dict, Any
 import base64
 import json
 import re
-from ..shared.call_mcp import call_mcp
-from langchain_core.tools import tool
+from ..shared import blob_cache, branch_index, snapshot, staging
+from ..shared.etag_cache import cached_github_get
+from ..shared.http_client import contents_path, rest_available
+from ..shared.mcp_tool import mcp_tool, McpCall, BlockingCall
+from ..shared.ref_resolver import resolve_commit
 
 # ---------- Helpers ----------
 
@@ -52,9 +55,49 @@ def _extract_payload_text(content: List[Dict[str, Any]]) -> Optional[str]:
     # 2) Fallback (directory listing JSON string or status message)
     return _first_text_chunk(content)
 
+def _read_via_rest(owner: str, repo: str, path: str, ref: Optional[str]) -> Optional[Union[str, List[str]]]:
+    """
+    File body or directory listing from the REST contents API, as a conditional request
+    cached on disk (unchanged files cost a 304, which is not rate limited).
+
+    Returns None when REST cannot answer (error, not found, binary or >1 MB file); the
+    caller then asks the MCP server, which also resolves partial paths.
+    """
+    params = {"ref": ref.strip()} if ref and ref.strip() else None
+    try:
+        response = cached_github_get(contents_path(owner, repo, path), params=params)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+    except Exception:
+        return None
+
+    if isinstance(data, list):
+        return [e["path"] for e in data if isinstance(e, dict) and isinstance(e.get("path"), str)] or None
+    if isinstance(data, dict) and data.get("type") == "file" and data.get("encoding") == "base64":
+        try:
+            raw = base64.b64decode(data.get("content", ""))
+            text = raw.decode("utf-8")
+        except (ValueError, UnicodeDecodeError):
+            return None
+        blob_cache.remember(owner, repo, ref, path, raw, data.get("sha"))
+        return text
+    return None
+
+def _seen(owner: str, repo: str, ref: Optional[str], path: str, text: str) -> str:
+    """Note the file's blob SHA on branch `ref` so a later write needs no lookup; returns `text`."""
+    branch_index.record(owner, repo, ref, path, blob_cache.git_blob_sha(text.encode("utf-8")))
+    return text
+
+def _listing(owner: str, repo: str, ref: Optional[str], commit: Optional[str], path: str, paths: List[str]) -> List[str]:
+    """A directory listing with staged changes applied. Listing directories means the repo is being
+    explored, so a local snapshot of the commit is fetched in the background for the next reads."""
+    snapshot.prefetch(owner, repo, commit, ref)
+    return staging.overlay_listing(owner, repo, ref, path, paths)
+
 # ---------- Tool ----------
 
-@tool("get_file_contents")
+@mcp_tool("get_file_contents")
 def get_file_contents_tool(
     owner: str,
     repo: str,
@@ -78,12 +121,49 @@ def get_file_contents_tool(
     if norm_ref is not None:
         payload["ref"] = norm_ref
 
-    result = call_mcp("get_file_contents", payload)
+    # Writes staged on this branch but not yet committed (see shared/staging.py) win
+    found, staged = staging.staged_content(owner, repo, ref, norm_path)
+    if found:
+        if staged is None:
+            raise RuntimeError(f"MCP domain error: '{norm_path}' is staged for deletion on '{ref}'")
+        return staged
+
+    # Read at the commit the ref points to: at a commit a file never changes, so it can be
+    # served from the blob cache once we have read it there.
+    commit = yield from resolve_commit(owner, repo, ref)
+    read_ref = commit or ref
+    if commit:
+        payload.pop("ref", None)
+        payload["sha"] = commit
+
+    local = snapshot.read(owner, repo, commit, norm_path)
+    if isinstance(local, list):
+        return staging.overlay_listing(owner, repo, ref, norm_path, local)
+    if local is not None:
+        branch_index.record(owner, repo, ref, norm_path, blob_cache.git_blob_sha(local))
+        return local.decode("utf-8", errors="replace")
+
+    known = blob_cache.lookup(owner, repo, read_ref, norm_path)
+    if known is not None:
+        branch_index.record(owner, repo, ref, norm_path, known[0])
+        return known[1].decode("utf-8", errors="replace")
+
+    if rest_available():
+        cached = yield BlockingCall(_read_via_rest, owner, repo, norm_path, read_ref)
+        if isinstance(cached, str):
+            return _seen(owner, repo, ref, norm_path, cached)
+        if cached is not None:
+            return _listing(owner, repo, ref, commit, norm_path, cached)
+
+    result = yield McpCall("get_file_contents", payload)
 
     # Transport error (JSON-RPC)
     if isinstance(result, dict) and "error" in result:
         msg = result["error"].get("message", str(result["error"]))
         raise RuntimeError(f"MCP transport error: {msg}")
+    # a cut body must never be cached or indexed under a SHA of its own (see response_reader.resolve_spill)
+    if "truncated" in result or "spill" in result:
+        raise RuntimeError(f"MCP response for '{norm_path}' was truncated")
 
     # Normalize shape and pull content array
     is_error = bool(result.get("isError")) or bool(result.get("result", {}).get("isError"))
@@ -97,7 +177,14 @@ def get_file_contents_tool(
     if is_error or "exception" in status_text.lower() or "error" in status_text.lower():
         raise RuntimeError(f"MCP domain error: {status_text or raw or 'unknown error'}")
 
-    # If server gave us a resource.text, it's almost certainly a FILE body → return as-is
+    # A resource.text is a FILE body → keep it in the blob cache and return it as-is
+    for c in content:
+        resource = c.get("resource") if isinstance(c, dict) and c.get("type") == "resource" else None
+        if isinstance(resource, dict) and isinstance(resource.get("text"), str):
+            sha = blob_cache.remember(owner, repo, read_ref, norm_path, resource["text"].encode("utf-8"))
+            branch_index.record(owner, repo, ref, norm_path, sha)
+            return resource["text"]
+
     # Otherwise, server likely returned a directory listing JSON in `raw`.
     # Try to parse JSON; if it fails, still return raw (some servers might send files as text).
     parsed: Any
@@ -117,7 +204,7 @@ def get_file_contents_tool(
             elif isinstance(e, str):
                 paths.append(e)
         if paths:
-            return paths
+            return _listing(owner, repo, ref, commit, norm_path, paths)
         raise RuntimeError(f"Unexpected directory listing format: {parsed!r}")
 
     # Some servers might return an object with 'content' (or type=file) in the text JSON.
@@ -1,19 +1,16 @@
-from ..shared.call_mcp import call_mcp
-from langchain_core.tools import tool
-import json
-import re
+from ..shared.mcp_tool import mcp_tool, BlockingCall
+from ..shared.pagination import collect, more_note
 from typing import Optional
 
-@tool("list_branches")
-def list_branches_tool(owner: str, repo: str, perPage: Optional[int] = 10, page: Optional[int] = 1 ) -> str:
+@mcp_tool("list_branches")
+def list_branches_tool(owner: str, repo: str, limit: Optional[int] = 100) -> str:
     """
     List all branches in a GitHub repository using MCP.
     
     Args:
         owner: The owner of the repository.
         repo: The name of the repository.
-        perPage: Number of branches to return per page (default is 10).
-        page: Page number for pagination (default is 1).
+        limit: Maximum number of branches to return, fetched across pages as needed; 0 = all (default is 100).
     
     Returns:
         A string listing all branches in the format:
@@ -23,28 +20,18 @@ def list_branches_tool(owner: str, repo: str, perPage: Optional[int] = 10, page:
     try:
         payload = {
             "owner": owner,
-            "repo": repo,
-            "perPage": perPage,
-            "page": page
+            "repo": repo
         }
 
-        payload = {key: value for key, value in payload.items() if value is not None}
+        limit = max(0, 100 if limit is None else limit)
+        parsed = yield BlockingCall(collect, "list_branches", payload, limit=limit or None)
 
-        result = call_mcp("list_branches", payload)
-
-        if "error" in result:
-            return f"Branch listing failed: {result['error']}"
-
-        content = result.get("result", {}).get("content", [])
-        if isinstance(content, list) and content and isinstance(content[0], dict) and "text" in content[0]:
-            try:
-                parsed = json.loads(content[0]["text"])
-                branches = [entry.get("name", "unknown") for entry in parsed]
-                return "Branches:\n" + "\n".join(f"- {b}" for b in branches) if branches else "No branches found."
-            except Exception as e:
-                return f"Error parsing branch list JSON: {e}"
-
-        return f"Unexpected response format: {content}"
+        branches = [entry.get("name", "unknown") for entry in parsed]
+        if not branches:
+            return "No branches found."
+        note = more_note(parsed, limit)
+        more = f"\n{note}" if note else ""
+        return "Branches:\n" + "\n".join(f"- {b}" for b in branches) + more
 
     except Exception as e:
         return f"Exception during list_branches: {str(e)}"
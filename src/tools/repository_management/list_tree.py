@@ -0,0 +1,241 @@
+from ..shared import blob_cache, snapshot, staging
+from ..shared.call_mcp import call_mcp_many
+from ..shared.etag_cache import cached_github_get
+from ..shared.http_client import rest_available
+from ..shared.mcp_tool import mcp_tool, BlockingCall
+from ..shared.ref_resolver import resolve_commit
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+import fnmatch
+import json
+import os
+import posixpath
+import threading
+
+MAX_CACHED_TREES = 64
+MAX_LISTED_ENTRIES = 1000
+
+
+class CommitTree:
+    """
+    Directory contents of one commit: dir path ("" = root) -> [{"path", "type", "size", "sha"}].
+
+    Filled all at once from the git trees API or a snapshot (`complete`), or directory by
+    directory by the MCP fallback; a directory is in `dirs` once its children are known.
+    A commit never changes, so entries are never refreshed.
+    """
+
+    def __init__(self):
+        self.dirs: Dict[str, List[dict]] = {}
+        self.complete = False
+        self.too_large = False   # GitHub truncated the recursive tree; walk it instead
+
+    def load(self, entries: List[dict]):
+        """Replace the contents with a whole tree (a new dict, so concurrent readers see old or new)."""
+        dirs: Dict[str, List[dict]] = {"": []}
+        for entry in entries:
+            dirs.setdefault(posixpath.dirname(entry["path"]), []).append(entry)
+        self.dirs = dirs
+        self.complete = True
+
+    def kind(self, path: str) -> Optional[str]:
+        """'dir' or 'file' if the tree knows `path`."""
+        if path in self.dirs:
+            return "dir"
+        for entry in self.dirs.get(posixpath.dirname(path), []):
+            if entry["path"] == path:
+                return entry["type"]
+        return None
+
+
+_trees: "OrderedDict[Tuple[str, str, str], CommitTree]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _tree(owner: str, repo: str, commit: str) -> CommitTree:
+    key = (owner.lower(), repo.lower(), commit.lower())
+    with _lock:
+        tree = _trees.get(key)
+        if tree is None:
+            tree = _trees[key] = CommitTree()
+        _trees.move_to_end(key)
+        while len(_trees) > MAX_CACHED_TREES:
+            _trees.popitem(last=False)
+        return tree
+
+
+def _load_snapshot(tree: CommitTree, root: str):
+    entries = []
+    for current, dirnames, filenames in os.walk(root):
+        rel = os.path.relpath(current, root).replace(os.sep, "/")
+        rel = "" if rel == "." else rel
+        for name in dirnames:
+            entries.append({"path": posixpath.join(rel, name), "type": "dir", "size": 0, "sha": ""})
+        for name in filenames:
+            size = os.path.getsize(os.path.join(current, name))
+            entries.append({"path": posixpath.join(rel, name), "type": "file", "size": size, "sha": ""})
+    tree.load(entries)
+
+
+def _rest_tree(owner: str, repo: str, commit: str) -> Optional[dict]:
+    """The recursive git tree of `commit` (one request, cached on disk by ETag), or None."""
+    try:
+        response = cached_github_get(f"repos/{quote(owner)}/{quote(repo)}/git/trees/{commit}", params={"recursive": "1"})
+        return response.json() if response.status_code == 200 else None
+    except Exception:
+        return None
+
+
+def _load_rest(tree: CommitTree, owner: str, repo: str, commit: str, data: dict):
+    if data.get("truncated"):
+        tree.too_large = True
+        return
+    entries = []
+    index = blob_cache.get_path_index()
+    for item in data.get("tree", []):
+        kind = {"blob": "file", "tree": "dir"}.get(item.get("type"))
+        if kind is None:
+            continue  # submodules
+        entries.append({"path": item["path"], "type": kind, "size": item.get("size", 0), "sha": item.get("sha", "")})
+        if kind == "file" and item.get("sha"):
+            # later reads of these files at this commit can be answered from the blob cache
+            index.put(owner, repo, commit, item["path"], item["sha"])
+    tree.load(entries)
+
+
+def _entries_from_mcp(result) -> Optional[List[dict]]:
+    """Child entries from a get_file_contents directory result, or None if it is not a directory."""
+    for c in result.get("result", {}).get("content", []):
+        if isinstance(c, dict) and c.get("type") == "text":
+            try:
+                parsed = json.loads(c["text"])
+            except (ValueError, KeyError):
+                continue
+            if isinstance(parsed, list):
+                return [{"path": e["path"].strip("/"), "type": "dir" if e.get("type") == "dir" else "file",
+                         "size": e.get("size") or 0, "sha": e.get("sha") or ""}
+                        for e in parsed if isinstance(e, dict) and isinstance(e.get("path"), str)]
+    return None
+
+
+def _walk_mcp(tree: CommitTree, owner: str, repo: str, commit: str, base: str, max_depth: int):
+    """Fill the directories under `base` (down to `max_depth`) one level per batch of concurrent calls."""
+    level, depth, errors = [base], 0, []
+    while level and (not max_depth or depth < max_depth):
+        missing = [d for d in level if d not in tree.dirs]
+        if missing:
+            calls = [("get_file_contents", {"owner": owner, "repo": repo, "path": d or "/", "sha": commit}) for d in missing]
+            results = yield BlockingCall(call_mcp_many, calls)
+            for d, result in zip(missing, results):
+                entries = None if isinstance(result, Exception) else _entries_from_mcp(result)
+                if entries is None:
+                    errors.append(f"{d or '/'}: {result if isinstance(result, Exception) else 'not a directory'}")
+                    continue
+                tree.dirs[d] = entries
+        level = [e["path"] for d in level for e in tree.dirs.get(d, []) if e["type"] == "dir"]
+        depth += 1
+    return errors
+
+
+def _collect(tree: CommitTree, base: str, max_depth: int) -> List[dict]:
+    found, level, depth = [], [base], 0
+    while level and (not max_depth or depth < max_depth):
+        children = [e for d in level for e in tree.dirs.get(d, [])]
+        found.extend(children)
+        level = [e["path"] for e in children if e["type"] == "dir"]
+        depth += 1
+    return found
+
+
+def _overlay(entries: List[dict], changes: Dict[str, Optional[str]], base: str, max_depth: int) -> List[dict]:
+    """The listed entries as they will be after the staged changes are flushed (see shared/staging.py)."""
+    prefix = f"{base}/" if base else ""
+    listed = {e["path"]: e for e in entries if changes.get(e["path"], "") is not None}
+    for path, content in changes.items():
+        if content is None or not path.startswith(prefix):
+            continue
+        parts = path[len(prefix):].split("/")
+        for depth in range(1, min(len(parts), max_depth or len(parts)) + 1):
+            child = prefix + "/".join(parts[:depth])
+            if child == path:
+                listed[child] = {"path": child, "type": "file", "size": len(content.encode()), "sha": ""}
+            elif child not in listed:
+                # a new file in a new subdirectory
+                listed[child] = {"path": child, "type": "dir", "size": 0, "sha": ""}
+    return list(listed.values())
+
+
+@mcp_tool("list_tree")
+def list_tree_tool(owner: str, repo: str, path: str = "", ref: Optional[str] = None,
+                   glob: str = "", max_depth: int = 0) -> str:
+    """
+    List a directory of a GitHub repo recursively, with types and sizes, in one call.
+    Prefer this over walking directories with get_file_contents.
+    args:
+        owner: The owner of the repository.
+        repo: The name of the repository.
+        path: Directory to list (default: the repository root).
+        ref: Branch, tag or commit SHA (default: the default branch).
+        glob: Only list files matching this pattern, e.g. '*.py' or 'src/*/test_*.py'.
+        max_depth: How many levels below `path` to list; 0 means unlimited.
+    Returns:
+        One line per entry: 'dir  <path>/' or 'file <path> (<size> B)', or an error message.
+    Example:
+        'owner="DanielRiha8906", repo="testicek", path="src", glob="*.py", max_depth=2'
+    """
+    try:
+        base = (path or "").strip().strip("/")
+        commit = yield from resolve_commit(owner, repo, ref)
+        if not commit:
+            return f"Error: could not resolve '{ref or 'the default branch'}' in '{owner}/{repo}'."
+        max_depth = max(0, int(max_depth or 0))
+
+        tree = _tree(owner, repo, commit)
+        if not tree.complete:
+            root = snapshot.snapshot_dir(owner, repo, commit, exact=True)
+            if root is not None:
+                _load_snapshot(tree, root)
+            elif rest_available() and not tree.too_large:
+                data = yield BlockingCall(_rest_tree, owner, repo, commit)
+                if data is not None:
+                    _load_rest(tree, owner, repo, commit, data)
+
+        errors = []
+        if not tree.complete and tree.kind(base) != "file":
+            errors = yield from _walk_mcp(tree, owner, repo, commit, base, max_depth)
+            snapshot.prefetch(owner, repo, commit, ref)
+
+        # writes staged on this branch are part of what the agent sees (None = deletion)
+        changes = staging.staged_changes(owner, repo, ref)
+        kind = tree.kind(base) if base else "dir"
+        if base in changes:
+            kind = "file" if changes[base] is not None else None
+        elif kind is None and any(p.startswith(f"{base}/") and c is not None for p, c in changes.items()):
+            kind, errors = "dir", []  # only staged files live there so far
+        if kind == "file":
+            return f"Error: '{base}' is a file, not a directory; use get_file_contents to read it."
+        if kind is None:
+            detail = f" ({'; '.join(errors)})" if errors else ""
+            return f"Error: '{base or '/'}' not found in '{owner}/{repo}' at {commit[:7]}{detail}."
+
+        entries = _collect(tree, base, max_depth)
+        if changes:
+            entries = _overlay(entries, changes, base, max_depth)
+        if glob:
+            entries = [e for e in entries if e["type"] == "file" and fnmatch.fnmatchcase(e["path"], glob)]
+        entries.sort(key=lambda e: e["path"])
+
+        header = f"{owner}/{repo}@{commit[:7]} /{base}: {len(entries)} entries"
+        if changes:
+            header += f" (as if the {len(changes)} staged change(s) on this branch were committed)"
+        lines = [f"dir  {e['path']}/" if e["type"] == "dir" else f"file {e['path']} ({e['size']} B)"
+                 for e in entries[:MAX_LISTED_ENTRIES]]
+        if len(entries) > MAX_LISTED_ENTRIES:
+            lines.append(f"... {len(entries) - MAX_LISTED_ENTRIES} more; narrow it down with path, glob or max_depth.")
+        if errors:
+            lines.append(f"Could not list: {'; '.join(errors)}")
+        return "\n".join([header] + lines)
+
+    except Exception as e:
+        return f"Exception during list_tree: {str(e)}"
@@ -1,8 +1,32 @@
-from ..shared.call_mcp import call_mcp
-from langchain_core.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
+from ..shared import blob_cache, branch_index
+from ..shared.ref_resolver import invalidate
 from typing import List, Dict
 
-@tool("push_multiple_files")
+def commit_files(owner, repo, branch, files, message):
+    """
+    Commit `files` ([{"path", "content"}]) to `branch` in one commit, for use with `yield from`
+    inside an @mcp_tool. Returns the MCP result.
+    """
+    payload = {
+        "owner": owner,
+        "repo": repo,
+        "branch": branch,
+        "files": files,
+        "message": message
+    }
+    try:
+        result = yield McpCall("push_files", payload)
+    finally:
+        # the branch moved (or may have): stop serving reads from its old commit
+        invalidate(owner, repo, branch)
+    if "error" not in result:
+        for f in files:
+            if isinstance(f.get("content"), str):
+                branch_index.record(owner, repo, branch, f["path"], blob_cache.git_blob_sha(f["content"].encode("utf-8")))
+    return result
+
+@mcp_tool("push_multiple_files")
 def push_files_tool(owner: str, repo: str, branch: str, files: List[Dict[str, str]], message: str) -> str:
     """
     Push multiple files to a GitHub repository using MCP.
@@ -21,15 +45,7 @@ def push_files_tool(owner: str, repo: str, branch: str, files: List[Dict[str, st
         'owner="DanielRiha8906", repo="testicek", branch="main", message="Update files", files=[{"path": "file1.txt", "content": "Content of file 1"}, {"path": "file2.txt", "content": "Content of file 2"}]'
     """
     try:
-        payload = {
-            "owner": owner,
-            "repo": repo,
-            "branch": branch,
-            "files": files,
-            "message": message
-        }
-
-        result = call_mcp("push_files", payload)
+        result = yield from commit_files(owner, repo, branch, files, message)
         if "error" in result:
             return f"Push failed: {result['error']}"
         return f"Successfully pushed {len(files)} file(s) to {owner}/{repo}@{branch}."
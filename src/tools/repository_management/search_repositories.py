@@ -1,9 +1,8 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 import json
 from typing import Optional
 
-@tool("search_repositories")
+@mcp_tool("search_repositories")
 def search_repositories_tool(query: str, page: Optional[int] = 1, perPage: Optional[int] = 10 ) -> str:
     """
     Search for GitHub repositories owned by a specific user using MCP.
@@ -27,7 +26,7 @@ def search_repositories_tool(query: str, page: Optional[int] = 1, perPage: Optio
                    "page": page,
                    "perPage": perPage}
         
-        result = call_mcp("search_repositories", payload)
+        result = yield McpCall("search_repositories", payload)
        
         if isinstance(result, str):
             return f"Unexpected response: {result}"
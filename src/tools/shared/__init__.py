@@ -1,4 +1,8 @@
-from .call_mcp import call_mcp
+from .call_mcp import call_mcp, acall_mcp, call_mcp_many, acall_mcp_many
+from .mcp_session import live_worker_count
+from .server_binary import ensure_server_binary
 from .tool_lists import return_all_implemented_tools
+from .tracing import agent_role, add_span_exporter
 
-__all__ = ["call_mcp", "return_all_implemented_tools"]
\ No newline at end of file
+__all__ = ["call_mcp", "acall_mcp", "call_mcp_many", "acall_mcp_many", "live_worker_count", "ensure_server_binary",
+           "return_all_implemented_tools", "agent_role", "add_span_exporter"]
\ No newline at end of file
@@ -0,0 +1,209 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .cache_dir import cache_path, prune_lru, touch
+
+DEFAULT_BLOB_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_BLOB_DISK_BYTES = 512 * 1024 * 1024
+DISK_PRUNE_TARGET = 0.9    # a full disk tier is pruned to this share of its budget, so not every write scans it
+DEFAULT_INDEXED_COMMITS = 256
+
+_COMMIT_SHA = re.compile(r"^[0-9a-f]{40}$", re.IGNORECASE)
+
+
+def git_blob_sha(data: bytes) -> str:
+    """The git blob SHA-1 of `data` (what GitHub reports as a file's `sha`)."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def is_commit_sha(ref: Optional[str]) -> bool:
+    """Full commit SHAs are immutable, so anything read at one can be cached forever."""
+    return bool(ref) and bool(_COMMIT_SHA.fullmatch(ref.strip()))
+
+
+class BlobCache:
+    """
+    File contents keyed by git blob SHA.
+
+    Blobs live in memory under an LRU policy bounded by total bytes (`max_bytes`) and are
+    also written to TOOLS_CACHE_DIR/blobs, so a blob evicted from memory, or fetched by an
+    earlier run, is read back from disk instead of from GitHub. Identical content on
+    different branches, paths or runs is stored once. The disk tier is LRU too, bounded by
+    `max_disk_bytes` (0 = unbounded); a file's mtime is its last use.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_BLOB_CACHE_BYTES, directory: Optional[str] = None,
+                 max_disk_bytes: int = DEFAULT_BLOB_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._blobs: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes: Optional[int] = None   # unknown until the directory is first scanned
+        self._pruning = False
+        self._lock = threading.Lock()
+
+    def _disk_path(self, sha: str) -> Optional[str]:
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, sha[:2], sha)
+
+    def _remember(self, sha: str, data: bytes):
+        # caller holds the lock
+        if sha in self._blobs:
+            self._blobs.move_to_end(sha)
+            return
+        if len(data) > self.max_bytes:
+            return
+        self._blobs[sha] = data
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._blobs.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def get(self, sha: str) -> Optional[bytes]:
+        sha = sha.lower()
+        with self._lock:
+            data = self._blobs.get(sha)
+            if data is not None:
+                self._blobs.move_to_end(sha)
+                return data
+        path = self._disk_path(sha)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if git_blob_sha(data) != sha:
+            return None
+        touch(path)
+        with self._lock:
+            self._remember(sha, data)
+        return data
+
+    def put(self, data: bytes, sha: Optional[str] = None) -> str:
+        """Store `data`; returns its blob SHA (computed when not given)."""
+        sha = (sha or git_blob_sha(data)).lower()
+        with self._lock:
+            known = sha in self._blobs
+            self._remember(sha, data)
+        path = self._disk_path(sha)
+        if known or path is None:
+            return sha
+        if os.path.exists(path):
+            touch(path)
+            return sha
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._grow_disk(len(data))
+        return sha
+
+    def _grow_disk(self, size: int):
+        """Count a new file on disk; past the budget, drop the least recently used files."""
+        if self.max_disk_bytes <= 0:
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += size
+                if self._disk_bytes <= self.max_disk_bytes:
+                    return
+            if self._pruning:
+                return
+            self._pruning = True
+        left = None
+        try:
+            # other processes share the directory, so the total is recounted from disk each time
+            left = prune_lru(self.directory, int(self.max_disk_bytes * DISK_PRUNE_TARGET))
+        finally:
+            with self._lock:
+                self._disk_bytes, self._pruning = left, False
+
+    def size(self) -> int:
+        """Bytes held in memory."""
+        with self._lock:
+            return self._bytes
+
+
+class PathIndex:
+    """
+    path -> blob SHA per (owner, repo, commit).
+
+    Only immutable commit SHAs are indexed; the least recently used commits are
+    dropped beyond `max_commits`.
+    """
+
+    def __init__(self, max_commits: int = DEFAULT_INDEXED_COMMITS):
+        self.max_commits = max_commits
+        self._commits: "OrderedDict[Tuple[str, str, str], Dict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, owner: str, repo: str, commit: str, path: str) -> Optional[str]:
+        key = (owner.lower(), repo.lower(), commit.lower())
+        with self._lock:
+            paths = self._commits.get(key)
+            if paths is None:
+                return None
+            self._commits.move_to_end(key)
+            return paths.get(path.strip("/"))
+
+    def put(self, owner: str, repo: str, commit: str, path: str, sha: str):
+        key = (owner.lower(), repo.lower(), commit.lower())
+        with self._lock:
+            self._commits.setdefault(key, {})[path.strip("/")] = sha.lower()
+            self._commits.move_to_end(key)
+            while len(self._commits) > self.max_commits:
+                self._commits.popitem(last=False)
+
+
+_blob_cache: Optional[BlobCache] = None
+_path_index: Optional[PathIndex] = None
+_singleton_lock = threading.Lock()
+
+
+def get_blob_cache() -> BlobCache:
+    """
+    Process-wide blob cache, bounded by BLOB_CACHE_MAX_BYTES (default 64 MiB) in memory and
+    BLOB_CACHE_DISK_MAX_BYTES (default 512 MiB) on disk.
+    """
+    global _blob_cache
+    with _singleton_lock:
+        if _blob_cache is None:
+            _blob_cache = BlobCache(int(os.getenv("BLOB_CACHE_MAX_BYTES", DEFAULT_BLOB_CACHE_BYTES)), cache_path("blobs"),
+                                    int(os.getenv("BLOB_CACHE_DISK_MAX_BYTES", DEFAULT_BLOB_DISK_BYTES)))
+        return _blob_cache
+
+
+def get_path_index() -> PathIndex:
+    global _path_index
+    with _singleton_lock:
+        if _path_index is None:
+            _path_index = PathIndex()
+        return _path_index
+
+
+def lookup(owner: str, repo: str, ref: Optional[str], path: str) -> Optional[Tuple[str, bytes]]:
+    """(sha, content) of `path` at `ref` without any request, if `ref` is a commit we have read it at."""
+    if not is_commit_sha(ref):
+        return None
+    sha = get_path_index().get(owner, repo, ref.strip(), path)
+    if sha is None:
+        return None
+    data = get_blob_cache().get(sha)
+    return (sha, data) if data is not None else None
+
+
+def remember(owner: str, repo: str, ref: Optional[str], path: str, data: bytes, sha: Optional[str] = None) -> str:
+    """Store a file read at `ref`; returns its blob SHA. Indexed by path when `ref` is a commit SHA."""
+    sha = get_blob_cache().put(data, sha)
+    if is_commit_sha(ref):
+        get_path_index().put(owner, repo, ref.strip(), path, sha)
+    return sha
@@ -0,0 +1,45 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+from .blob_cache import is_commit_sha
+from .ref_resolver import normalize_ref
+
+# (owner, repo, branch) -> {path: blob sha}, for the lifetime of this run
+_branches: Dict[Tuple[str, str, str], Dict[str, str]] = {}
+_lock = threading.Lock()
+
+
+def _key(owner: str, repo: str, branch: str) -> Tuple[str, str, str]:
+    return owner.lower(), repo.lower(), normalize_ref(branch)
+
+
+def known_sha(owner: str, repo: str, branch: str, path: str) -> Optional[str]:
+    """Blob SHA of `path` on `branch` as last seen by this run (read or written), if any."""
+    with _lock:
+        return _branches.get(_key(owner, repo, branch), {}).get(path.strip("/"))
+
+
+def record(owner: str, repo: str, branch: Optional[str], path: str, sha: str):
+    """Remember what `path` looks like on `branch`; reads at a commit SHA are not tied to a branch and are skipped."""
+    if not branch or is_commit_sha(branch):
+        return
+    with _lock:
+        _branches.setdefault(_key(owner, repo, branch), {})[path.strip("/")] = sha.lower()
+
+
+def forget(owner: str, repo: str, branch: Optional[str] = None, path: Optional[str] = None):
+    """Drop one path, one branch, or (without `branch`) every branch of the repository."""
+    owner, repo = owner.lower(), repo.lower()
+    with _lock:
+        if branch is None:
+            for key in [k for k in _branches if k[:2] == (owner, repo)]:
+                del _branches[key]
+        elif path is None:
+            _branches.pop(_key(owner, repo, branch), None)
+        else:
+            _branches.get(_key(owner, repo, branch), {}).pop(path.strip("/"), None)
+
+
+def clear():
+    with _lock:
+        _branches.clear()
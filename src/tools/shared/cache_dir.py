@@ -0,0 +1,54 @@
+import os
+import time
+
+
+def cache_path(*parts: str) -> str:
+    """
+    Directory under the tool-layer cache root, created on demand.
+
+    The root is TOOLS_CACHE_DIR if set, otherwise ~/.cache/bakalar.
+    """
+    root = os.getenv("TOOLS_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "bakalar")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def touch(path: str):
+    """Mark a cached file as just used (its mtime orders eviction in prune_lru)."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune_lru(directory: str, max_bytes: int, max_age: float = 0.0) -> int:
+    """
+    Delete cached files under `directory`, least recently used first, until the rest fit in
+    `max_bytes`; with `max_age` (seconds) also those not used for that long. Files being
+    written (*.tmp) are left alone. Returns the bytes left. Safe to run from several
+    processes at once: a file another process removed first is just skipped.
+    """
+    files = []
+    for current, _, names in os.walk(directory):
+        for name in names:
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(current, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    files.sort()
+    total = sum(size for _, size, _ in files)
+    cutoff = time.time() - max_age if max_age > 0 else None
+    for mtime, size, path in files:
+        if total <= max_bytes and (cutoff is None or mtime >= cutoff):
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+    return total
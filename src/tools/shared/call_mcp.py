@@ -1,63 +1,277 @@
-def call_mcp(tool_name: str, arguments: dict):
-    import subprocess
-    import uuid
-    import json
-    import os
-
-    body = {
-        "jsonrpc": "2.0",
-        "id": str(uuid.uuid4()),
-        "method": "tools/call",
-        "params": {
-            "name": tool_name,
-            "arguments": arguments
+import asyncio
+import difflib
+import json
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import List, Optional, Tuple
+
+from . import response_cache, singleflight
+from .session_pool import get_pool
+from .tracing import Span
+
+
+def check_tool_call(tool_name: str, arguments: dict, span: Optional[Span] = None) -> dict:
+    """
+    Validate a call against the cached tools/list schema before anything is sent; returns
+    the tool's tools/list entry.
+
+    Raises:
+        Exception: unknown tool name or missing required arguments.
+    """
+    tools = get_pool().tools(span)
+    schema = tools.get(tool_name)
+    if schema is None:
+        close = difflib.get_close_matches(tool_name, tools.keys(), n=1)
+        hint = f" Did you mean '{close[0]}'?" if close else ""
+        raise Exception(f"Unknown MCP tool '{tool_name}'.{hint}")
+
+    required = schema.get("inputSchema", {}).get("required", [])
+    missing = [name for name in required if arguments.get(name) is None]
+    if missing:
+        raise Exception(f"MCP tool '{tool_name}' is missing required arguments: {', '.join(missing)}")
+    return schema
+
+
+def _unwrap(result: dict) -> dict:
+    if "error" in result:
+        raise Exception(f"MCP JSON-RPC error: {json.dumps(result['error'])}")
+
+    mcp_result = result.get("result", {})
+    if mcp_result.get("isError"):
+        raise Exception(f"MCP call failed: {json.dumps(mcp_result.get('content', ''))}")
+
+    return result
+
+
+def _start(tool_name: str, arguments: dict) -> Tuple[Span, Future]:
+    """
+    Validate and send a tools/call request; the span covers the call until _finish/_fail.
+
+    A fresh answer from the read-through cache (response_cache.py) comes back as an
+    already completed future without anything being sent, and a read identical to one
+    already in flight waits for that one's answer (singleflight.py).
+    """
+    span = Span(tool_name)
+    cached = response_cache.get(tool_name, arguments)
+    if cached is not None:
+        span.attributes["mcp.cache_hit"] = True
+        future = Future()
+        future.timing = {}
+        future.set_result(cached)
+        return span, future
+    # our own write makes cached reads stale as soon as it is sent
+    response_cache.invalidate(tool_name, arguments)
+    try:
+        # the server says which tools only read (readOnlyHint); anything else may write
+        is_read = singleflight.read_only(check_tool_call(tool_name, arguments, span))
+        if not is_read:
+            singleflight.detach(arguments)
+        body = {
+            "jsonrpc": "2.0",
+            "id": str(uuid.uuid4()),
+            "method": "tools/call",
+            "params": {
+                "name": tool_name,
+                "arguments": arguments
+            }
         }
-    }
+        generation = response_cache.token(tool_name, arguments)
+        future = singleflight.join(tool_name, arguments, lambda: get_pool().submit(body, span), is_read)
+    except Exception as e:
+        span.finish(e)
+        raise
+    if getattr(future, "coalesced", False):
+        span.attributes["mcp.coalesced"] = True
+    future.cache_request = (tool_name, arguments, generation)
+    return span, future
+
+
+def _finish(span: Span, future: Future, response: dict) -> dict:
+    timing = future.timing
+    if "write" in timing:
+        span.phase("write", timing["write"])
+    if "received_at" in timing:
+        # the answer can start arriving before the write call has returned
+        span.phase("ttfb", max(0.0, timing["received_at"] - timing["write_started"] - timing.get("write", 0.0)))
+        span.phase("read", timing["read"])
+        span.phase("decode", timing["decode"])
+        span.attributes["mcp.result_bytes"] = timing["response_bytes"]
+        span.attributes["mcp.result_spilled"] = timing["spilled"]
+    try:
+        result = _unwrap(response)
+    except Exception as e:
+        span.finish(e)
+        raise
+    if getattr(future, "cache_request", None) is not None:
+        tool_name, arguments, generation = future.cache_request
+        # and once more when it is done, for reads that were answered while it ran
+        response_cache.invalidate(tool_name, arguments)
+        response_cache.store(tool_name, arguments, result, generation)
+    span.finish()
+    return result
+
+
+def _fail(span: Span, error: BaseException) -> BaseException:
+    span.finish(error)
+    return error
+
 
-    env = os.environ.copy()
-    token = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN", "")
-    wd = os.getenv("github_mcp_server_location", "")
-    env["GITHUB_PERSONAL_ACCESS_TOKEN"] = token
+DEFAULT_CALL_TIMEOUT = 120.0
 
-    print("\n=== DEBUG: CALLING MCP ===")
-    print("Tool name:", tool_name)
-    print("Arguments:", json.dumps(arguments, indent=2))
-    print("GITHUB_TOKEN (first 8 chars):", token[:8] + "..." if token else "[MISSING]")
-    print("===========================\n")
 
-    proc = subprocess.Popen(
-        ["go", "run", "cmd/github-mcp-server/main.go", "stdio", "--toolsets=all"],
-        cwd=wd,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        env=env
-    )
+def _deadline(timeout: Optional[float]) -> float:
+    return timeout if timeout is not None else float(os.getenv("MCP_CALL_TIMEOUT", DEFAULT_CALL_TIMEOUT))
 
-    banner = proc.stderr.readline()
-    print("[MCP BANNER]", banner.strip())
 
-    input_payload = json.dumps(body)
-    print("[MCP SEND]", input_payload)
+def call_mcp(tool_name: str, arguments: dict, timeout: Optional[float] = None):
+    """
+    Call an MCP tool on a pooled worker and return the JSON-RPC response.
 
-    proc.stdin.write(input_payload + "\n")
-    proc.stdin.flush()
+    `timeout` (default MCP_CALL_TIMEOUT, 120 s) is the deadline for the answer; when it
+    passes the request is cancelled on the server and TimeoutError is raised.
+    Every call emits a latency span (see tracing.py).
+    """
+    limit = _deadline(timeout)
+    span, future = _start(tool_name, arguments)
+    try:
+        response = future.result(timeout=limit)
+    except TimeoutError:
+        future.cancel()
+        raise _fail(span, TimeoutError(f"MCP call '{tool_name}' timed out after {limit:g}s"))
+    except Exception as e:
+        raise _fail(span, e)
+    return _finish(span, future, response)
+
+
+class PendingCall:
+    """An MCP request that has been sent but not yet awaited (see start_mcp)."""
+
+    def __init__(self, tool_name: str, span: Span, future: Future, limit: float):
+        self.tool_name = tool_name
+        self._span = span
+        self._future = future
+        self._limit = limit
+        self._deadline = time.monotonic() + limit
+
+    def result(self) -> dict:
+        """Wait for the response, with call_mcp's deadline and errors (counted from when it was sent)."""
+        try:
+            response = self._future.result(timeout=max(0.0, self._deadline - time.monotonic()))
+        except TimeoutError:
+            self._future.cancel()
+            raise _fail(self._span, TimeoutError(f"MCP call '{self.tool_name}' timed out after {self._limit:g}s"))
+        except Exception as e:
+            raise _fail(self._span, e)
+        return _finish(self._span, self._future, response)
 
-    response_line = proc.stdout.readline()
-    print("[MCP RESPONSE]", response_line.strip())
+    def cancel(self):
+        """Drop the request (the server is told); its span records the cancellation."""
+        if self._future.cancel():
+            self._span.attributes["mcp.cancelled"] = True
+            self._span.finish()
 
+
+def start_mcp(tool_name: str, arguments: dict, timeout: Optional[float] = None) -> PendingCall:
+    """
+    Send an MCP call without waiting for it, so several requests can be in flight from one
+    thread (e.g. prefetching the next pages of a listing). Collect it with `.result()`.
+    """
+    limit = _deadline(timeout)
+    span, future = _start(tool_name, arguments)
+    return PendingCall(tool_name, span, future, limit)
+
+
+async def acall_mcp(tool_name: str, arguments: dict, timeout: Optional[float] = None):
+    """
+    Asyncio variant of call_mcp.
+
+    The request is pipelined on a pooled worker and awaited without blocking the
+    event loop, so many calls can be in flight from one loop. Only starting a new
+    worker (first use, or after a crash) blocks briefly. Cancelling the awaiting task,
+    or hitting the deadline, cancels the request on the server.
+    """
+    limit = _deadline(timeout)
+    span, future = _start(tool_name, arguments)
     try:
-        result = json.loads(response_line)
+        response = await asyncio.wait_for(asyncio.wrap_future(future), limit)
+    except asyncio.TimeoutError:
+        raise _fail(span, TimeoutError(f"MCP call '{tool_name}' timed out after {limit:g}s"))
+    except BaseException as e:
+        raise _fail(span, e)
+    return _finish(span, future, response)
+
+
+DEFAULT_BATCH_CONCURRENCY = 8
+
+
+def _batch_limit(max_concurrency: Optional[int]) -> int:
+    return max(1, max_concurrency or int(os.getenv("MCP_BATCH_CONCURRENCY", DEFAULT_BATCH_CONCURRENCY)))
+
+
+def call_mcp_many(calls: List[Tuple[str, dict]], max_concurrency: Optional[int] = None, timeout: Optional[float] = None) -> list:
+    """
+    Run several (tool_name, arguments) calls concurrently over the pooled sessions.
+
+    At most `max_concurrency` calls (default MCP_BATCH_CONCURRENCY, 8) are in flight at once,
+    and each one gets its own `timeout` deadline counted from when it was sent.
+    Results come back in the order of `calls`; the slot of a failed call holds its
+    Exception instead of a result, so one failure never hides the others.
+
+    Example:
+        results = call_mcp_many([("get_issue", {...}), ("get_issue_comments", {...})])
+        errors = [r for r in results if isinstance(r, Exception)]
+    """
+    width = _batch_limit(max_concurrency)
+    limit = _deadline(timeout)
+    results: list = [None] * len(calls)
+    in_flight = {}  # future -> (index, tool name, span, deadline)
+    sent = 0
+
+    while sent < len(calls) or in_flight:
+        while sent < len(calls) and len(in_flight) < width:
+            tool_name, arguments = calls[sent]
+            try:
+                span, future = _start(tool_name, arguments)
+            except Exception as e:
+                results[sent] = e
+            else:
+                in_flight[future] = (sent, tool_name, span, time.monotonic() + limit)
+            sent += 1
+        if not in_flight:
+            continue
+
+        # wake up for the first answer or the earliest deadline, whichever comes first
+        earliest = min(deadline for _, _, _, deadline in in_flight.values())
+        done, _ = wait(in_flight, timeout=max(0.0, earliest - time.monotonic()), return_when=FIRST_COMPLETED)
+        for future in done:
+            i, tool_name, span, _ = in_flight.pop(future)
+            try:
+                response = future.result()
+            except Exception as e:
+                results[i] = _fail(span, e)
+                continue
+            try:
+                results[i] = _finish(span, future, response)
+            except Exception as e:
+                results[i] = e
+        now = time.monotonic()
+        for future, (i, tool_name, span, deadline) in list(in_flight.items()):
+            if deadline <= now and not future.done():
+                # its slot goes to the next call even if the worker never answers
+                del in_flight[future]
+                future.cancel()
+                results[i] = _fail(span, TimeoutError(f"MCP call '{tool_name}' timed out after {limit:g}s"))
+    return results
 
-        if "error" in result:
-            raise Exception(f"MCP JSON-RPC error: {json.dumps(result['error'])}")
 
-        mcp_result = result.get("result", {})
-        if mcp_result.get("isError"):
-            raise Exception(f"MCP call failed: {json.dumps(mcp_result.get('content', ''))}")
+async def acall_mcp_many(calls: List[Tuple[str, dict]], max_concurrency: Optional[int] = None, timeout: Optional[float] = None) -> list:
+    """Asyncio variant of call_mcp_many, with the same ordering, deadline and per-item error contract."""
+    slots = asyncio.Semaphore(_batch_limit(max_concurrency))
 
-        return result
+    async def one(tool_name: str, arguments: dict):
+        async with slots:
+            return await acall_mcp(tool_name, arguments, timeout)
 
-    except json.JSONDecodeError as e:
-        raise Exception(f"Invalid JSON response: {e}\nRaw line: {response_line.strip()}")
+    return await asyncio.gather(*(one(name, args) for name, args in calls), return_exceptions=True)
@@ -0,0 +1,186 @@
+import base64
+import binascii
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from .blob_cache import get_blob_cache
+from .cache_dir import cache_path, prune_lru, touch
+from .http_client import api_url, github_get
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+PRUNE_TARGET = 0.9    # a full cache is pruned to this share of its budget, so not every store scans it
+
+_stats = {"hits": 0, "misses": 0, "uncacheable": 0}
+_stats_lock = threading.Lock()
+_disk_bytes: Optional[int] = None   # unknown until the cache is first pruned in this process
+_prune_lock = threading.Lock()
+
+
+class CachedResponse:
+    """The parts of a requests.Response the tools use; `from_cache` is True when a 304 was served from disk."""
+
+    def __init__(self, status_code: int, content: bytes, headers: dict, from_cache: bool = False):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def enabled() -> bool:
+    return os.getenv("GITHUB_HTTP_CACHE", "1").lower() not in ("0", "false", "no")
+
+
+def max_bytes() -> int:
+    """GITHUB_HTTP_CACHE_MAX_BYTES (default 256 MiB; 0 = unbounded)."""
+    return int(os.getenv("GITHUB_HTTP_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+
+
+def max_age() -> float:
+    """GITHUB_HTTP_CACHE_MAX_AGE_DAYS (default 30; 0 = no limit), in seconds."""
+    return float(os.getenv("GITHUB_HTTP_CACHE_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS)) * 86400
+
+
+def _key(path: str, params: Optional[dict], accept: Optional[str]) -> str:
+    identity = json.dumps([api_url(path), sorted((params or {}).items()), accept or ""])
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+
+def _entry_paths(key: str):
+    directory = cache_path("http", key[:2])
+    return os.path.join(directory, key + ".json"), os.path.join(directory, key + ".body")
+
+
+def _load(key: str):
+    meta_path, body_path = _entry_paths(key)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return None, None
+    touch(meta_path)
+    touch(body_path)
+    if meta.get("blob_sha"):
+        # file content lives in the blob cache; without it the entry cannot be revalidated
+        data = get_blob_cache().get(meta["blob_sha"])
+        if data is None:
+            return None, None
+        document = json.loads(body)
+        document["content"] = base64.b64encode(data).decode()
+        body = json.dumps(document).encode()
+    return meta, body
+
+
+def _split_blob(body: bytes):
+    """For a contents-API file, move the content into the blob cache: (body without content, sha)."""
+    try:
+        document = json.loads(body)
+        if not (isinstance(document, dict) and document.get("type") == "file"
+                and document.get("encoding") == "base64" and document.get("sha")):
+            return body, None
+        data = base64.b64decode(document.get("content") or "")
+    except (ValueError, binascii.Error):
+        return body, None
+    sha = get_blob_cache().put(data, document["sha"])
+    document["content"] = ""
+    return json.dumps(document).encode(), sha
+
+
+def _store(key: str, meta: dict, body: bytes):
+    meta_path, body_path = _entry_paths(key)
+    meta_data = json.dumps(meta).encode()
+    # body first, then meta: a reader that finds the new meta always finds its body
+    for path, data in ((body_path, body), (meta_path, meta_data)):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    _grow(len(body) + len(meta_data))
+
+
+def _grow(size: int):
+    """
+    Count a stored entry. The first store of a process, and any store past the byte budget,
+    prunes TOOLS_CACHE_DIR/http: entries unused for max_age() go, then the least recently used.
+    """
+    global _disk_bytes
+    with _prune_lock:
+        limit = max_bytes()
+        if _disk_bytes is not None:
+            _disk_bytes += size
+            if limit <= 0 or _disk_bytes <= limit:
+                return
+        # other processes share the directory, so the total is recounted from disk
+        target = int(limit * PRUNE_TARGET) if limit > 0 else float("inf")
+        _disk_bytes = prune_lru(cache_path("http"), target, max_age())
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def stats() -> dict:
+    """Counters since start: hits (served after a 304), misses (200 stored) and uncacheable responses."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def cached_github_get(path: str, params: Optional[dict] = None, accept: Optional[str] = None) -> CachedResponse:
+    """
+    GET a GitHub REST path as a conditional request backed by an on-disk cache.
+
+    A stored ETag / Last-Modified is sent as If-None-Match / If-Modified-Since; on 304 the
+    stored body is returned (and GitHub does not count the request against the rate limit).
+    200 responses carrying a validator are stored under TOOLS_CACHE_DIR/http; for contents-API
+    files only the metadata is stored there and the content goes to the blob cache by SHA.
+    Disabled with GITHUB_HTTP_CACHE=0.
+    """
+    headers = {"Accept": accept} if accept else {}
+    if not enabled():
+        response = github_get(path, params=params, headers=headers)
+        return CachedResponse(response.status_code, response.content, dict(response.headers))
+
+    key = _key(path, params, accept)
+    meta, body = _load(key)
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = github_get(path, params=params, headers=headers)
+    if response.status_code == 304 and meta is not None:
+        _count("hits")
+        return CachedResponse(meta["status"], body, meta.get("headers", {}), from_cache=True)
+
+    etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+    if response.status_code == 200 and (etag or last_modified):
+        _count("misses")
+        body, blob_sha = _split_blob(response.content) if "/contents/" in path else (response.content, None)
+        _store(key, {
+            "url": api_url(path),
+            "params": params or {},
+            "status": response.status_code,
+            "etag": etag,
+            "last_modified": last_modified,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+            "blob_sha": blob_sha,
+            "stored_at": time.time(),
+        }, body)
+    else:
+        _count("uncacheable")
+    return CachedResponse(response.status_code, response.content, dict(response.headers))
@@ -0,0 +1,80 @@
+import atexit
+import os
+import threading
+from typing import Optional
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_API_URL = "https://api.github.com"
+DEFAULT_HTTP_POOL_SIZE = 10
+DEFAULT_HTTP_TIMEOUT = 30.0
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def api_url(path: str) -> str:
+    """Absolute GitHub REST URL for `path` (GITHUB_API_URL, default api.github.com, e.g. for GHES)."""
+    base = os.getenv("GITHUB_API_URL", DEFAULT_API_URL).rstrip("/")
+    return f"{base}/{path.lstrip('/')}"
+
+
+def contents_path(owner: str, repo: str, path: str) -> str:
+    return f"repos/{quote(owner)}/{quote(repo)}/contents/{quote(path.strip('/'))}"
+
+
+def rest_available() -> bool:
+    """Direct REST calls make sense: a token is configured and the offline stand-in is not in use."""
+    return bool(os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN")) and not os.getenv("MCP_STAND_IN")
+
+
+def github_session() -> requests.Session:
+    """
+    Process-wide requests.Session for direct GitHub REST calls.
+
+    Connections are kept alive and pooled per host (up to GITHUB_HTTP_POOL_SIZE, default 10,
+    so that many threads can share it), responses are gzip-compressed, and idempotent GETs
+    are retried on connection errors and 502/503/504.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            size = int(os.getenv("GITHUB_HTTP_POOL_SIZE", DEFAULT_HTTP_POOL_SIZE))
+            retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=("GET", "HEAD"))
+            adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "Accept": "application/vnd.github+json",
+                "Accept-Encoding": "gzip, deflate",
+                "X-GitHub-Api-Version": "2022-11-28",
+                "User-Agent": "bakalar-agents",
+            })
+            _session = session
+        return _session
+
+
+def github_get(path: str, params: Optional[dict] = None, headers: Optional[dict] = None,
+               stream: bool = False) -> requests.Response:
+    """GET a GitHub REST path on the shared session, authenticated with GITHUB_PERSONAL_ACCESS_TOKEN if set."""
+    request_headers = dict(headers or {})
+    token = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN")
+    if token:
+        request_headers["Authorization"] = f"Bearer {token}"
+    timeout = float(os.getenv("GITHUB_HTTP_TIMEOUT", DEFAULT_HTTP_TIMEOUT))
+    return github_session().get(api_url(path), params=params, headers=request_headers, timeout=timeout, stream=stream)
+
+
+def close_session():
+    global _session
+    with _session_lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
+
+
+atexit.register(close_session)
@@ -0,0 +1,314 @@
+import json
+import os
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import Future, InvalidStateError
+from typing import Dict, List
+
+from .recorder import record_call, record_tools, recording
+from .response_reader import discard_spill, load_spilled_response, read_messages, resolve_spill
+from .server_binary import ensure_server_binary
+from .stand_in_server import stand_in_command
+
+
+def server_command() -> List[str]:
+    """
+    Command used to start github-mcp-server in stdio mode, from the prebuilt cached binary.
+
+    With MCP_STAND_IN set, the offline stand-in server is started instead (see stand_in_server.py).
+    """
+    if os.getenv("MCP_STAND_IN"):
+        return stand_in_command()
+    binary = ensure_server_binary(os.getenv("github_mcp_server_location", ""))
+    return [binary, "stdio", "--toolsets=all"]
+
+
+def server_env() -> dict:
+    env = os.environ.copy()
+    env["GITHUB_PERSONAL_ACCESS_TOKEN"] = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN", "")
+    return env
+
+
+PROTOCOL_VERSION = "2025-03-26"
+CLIENT_INFO = {"name": "bakalar-agents", "version": "1.0.0"}
+HANDSHAKE_TIMEOUT = 60.0
+
+_live_workers = 0
+_live_lock = threading.Lock()
+
+
+def live_worker_count() -> int:
+    """Number of server processes started by this interpreter that have not been reaped yet."""
+    with _live_lock:
+        return _live_workers
+
+
+def _settle(future: Future, result=None, error: Exception = None):
+    # A caller may cancel (deadline hit) while the answer is arriving; the first outcome wins.
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+class McpSession:
+    """
+    One long-lived github-mcp-server process speaking JSON-RPC over stdin/stdout.
+
+    The MCP initialize handshake runs once when the process starts; the server's
+    capabilities and its tools/list schema are cached on the session.
+
+    Requests are pipelined: any number of them can be outstanding at once, and a
+    background reader thread routes each response to its caller by JSON-RPC id.
+    Cancelling a request's future drops it and tells the server via notifications/cancelled.
+
+    close() always reaps the process (EOF, then terminate, then kill) and closes its pipes.
+    """
+
+    def __init__(self):
+        global _live_workers
+        started = time.perf_counter()
+        self.proc = subprocess.Popen(
+            server_command(),
+            cwd=None if os.getenv("MCP_STAND_IN") else os.getenv("github_mcp_server_location", "") or None,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=server_env()
+        )
+        with _live_lock:
+            _live_workers += 1
+        self._reaped = False
+        self._reap_lock = threading.Lock()
+        spawned = time.perf_counter()
+        self.banner = self.proc.stderr.readline().decode(errors="replace").strip()
+        banner_read = time.perf_counter()
+
+        self._write_lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._answering = True    # False once pending requests have been failed for good
+
+        # The server logs to stderr; keep draining it so a full pipe never blocks it.
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+        self._reader_thread = threading.Thread(target=self._read_responses, daemon=True)
+        self._reader_thread.start()
+
+        self.capabilities: dict = {}
+        self.server_info: dict = {}
+        self.tools: Dict[str, dict] = {}
+        try:
+            self._handshake()
+        except Exception:
+            self.close()
+            raise
+        # startup cost in seconds, charged to the span of the call that triggered it
+        self.startup = {
+            "spawn": spawned - started,
+            "banner": banner_read - spawned,
+            "handshake": time.perf_counter() - banner_read,
+        }
+
+    def _rpc(self, method: str, params: dict) -> dict:
+        body = {"jsonrpc": "2.0", "id": str(uuid.uuid4()), "method": method, "params": params}
+        response = self.request(body, timeout=HANDSHAKE_TIMEOUT)
+        if "error" in response:
+            raise RuntimeError(f"MCP {method} failed: {json.dumps(response['error'])}")
+        return response.get("result", {})
+
+    def _handshake(self):
+        init = self._rpc("initialize", {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": CLIENT_INFO
+        })
+        self.capabilities = init.get("capabilities", {})
+        self.server_info = init.get("serverInfo", {})
+        self.notify("notifications/initialized")
+
+        cursor = None
+        while True:
+            page = self._rpc("tools/list", {"cursor": cursor} if cursor else {})
+            for t in page.get("tools", []):
+                self.tools[t["name"]] = t
+            cursor = page.get("nextCursor")
+            if not cursor:
+                break
+        if recording():
+            record_tools(list(self.tools.values()))
+
+    def _drain_stderr(self):
+        for _ in self.proc.stderr:
+            pass
+
+    def _read_responses(self):
+        error: Exception = RuntimeError("MCP server closed its output before answering")
+        try:
+            # large results are spilled to disk and arrive as a truncated view (see response_reader.py)
+            for message, meta in read_messages(self.proc.stdout):
+                if "method" in message:
+                    # server-initiated traffic; only ping expects an answer
+                    if message.get("method") == "ping" and "id" in message:
+                        self._write({"jsonrpc": "2.0", "id": message["id"], "result": {}})
+                    continue
+
+                with self._pending_lock:
+                    future = self._pending.pop(message.get("id"), None)
+                if future is not None:
+                    future.timing.update(
+                        received_at=meta["first_byte_at"],
+                        read=meta["complete_at"] - meta["first_byte_at"],
+                        decode=meta["decode"],
+                        response_bytes=meta["response_bytes"],
+                        spilled=meta["spilled"]
+                    )
+                    params = future.request.get("params") or {}
+                    if recording() and future.request.get("method") == "tools/call":
+                        self._record(params, message)
+                    # before anyone (or any cache) sees it: a spilled answer is never passed on as if it were whole
+                    _settle(future, result=resolve_spill(params.get("name"), message))
+                else:
+                    discard_spill(message)  # nobody waits for it any more (cancelled)
+
+            try:
+                code = self.proc.wait(timeout=5)
+                self._reap()
+            except subprocess.TimeoutExpired:
+                code = None
+            error = RuntimeError(f"MCP server closed its output (exit code {code}) before answering")
+        except Exception as e:
+            error = RuntimeError(f"MCP response reader failed: {e}")
+            raise
+        finally:
+            # whatever ended the loop, nobody may be left waiting for an answer that cannot come
+            self._fail_pending(error)
+
+    @staticmethod
+    def _record(params: dict, message: dict):
+        full = load_spilled_response(message["spill"]["path"]) if "spill" in message else message
+        if "result" in full:
+            record_call(params["name"], params.get("arguments") or {}, full["result"])
+
+    def _fail_pending(self, error: Exception):
+        with self._pending_lock:
+            self._answering = False
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            _settle(future, error=error)
+
+    def _on_done(self, request_id: str, future: Future):
+        if not future.cancelled():
+            return
+        with self._pending_lock:
+            dropped = self._pending.pop(request_id, None)
+        if dropped is not None and self.proc.poll() is None:
+            try:
+                self.notify("notifications/cancelled", {"requestId": request_id, "reason": "client cancelled"})
+            except (OSError, ValueError):
+                pass
+
+    def _reap(self):
+        global _live_workers
+        with self._reap_lock:
+            if self._reaped:
+                return
+            self._reaped = True
+        with _live_lock:
+            _live_workers -= 1
+
+    def _write(self, body: dict):
+        with self._write_lock:
+            self.proc.stdin.write((json.dumps(body) + "\n").encode())
+            self.proc.stdin.flush()
+
+    def is_alive(self) -> bool:
+        return self.proc.poll() is None and self._reader_thread.is_alive()
+
+    def in_flight(self) -> int:
+        with self._pending_lock:
+            return len(self._pending)
+
+    def notify(self, method: str, params: dict = None):
+        """Send a JSON-RPC notification (no id, no response)."""
+        body = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            body["params"] = params
+        self._write(body)
+
+    def submit(self, body: dict) -> Future:
+        """
+        Send one JSON-RPC request without waiting; the future resolves to the response dict.
+
+        `future.timing` collects perf_counter timestamps for tracing: write_started / write
+        (set here), then received_at, read, decode, response_bytes and spilled (set by the reader).
+
+        Raises:
+            BrokenPipeError: the process died before the request was written (safe to retry).
+        """
+        future: Future = Future()
+        future.timing = {}
+        future.request = body
+        with self._pending_lock:
+            if not self._answering:
+                raise BrokenPipeError("MCP server is no longer answering")
+            self._pending[body["id"]] = future
+        # the reader may resolve the future before _write returns, so stamp the start first
+        future.timing["write_started"] = time.perf_counter()
+        try:
+            self._write(body)
+            future.timing["write"] = time.perf_counter() - future.timing["write_started"]
+        except (BrokenPipeError, ValueError, OSError) as e:
+            with self._pending_lock:
+                self._pending.pop(body["id"], None)
+            raise BrokenPipeError(f"MCP server is not accepting input: {e}") from e
+        future.add_done_callback(lambda f, request_id=body["id"]: self._on_done(request_id, f))
+        return future
+
+    def request(self, body: dict, timeout: float = None) -> dict:
+        """
+        Send one JSON-RPC request and block until its response arrives.
+
+        Raises:
+            TimeoutError: no response within `timeout` seconds (the request is cancelled).
+        """
+        future = self.submit(body)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self, timeout: float = 5.0):
+        """Stop the process (EOF, then terminate, then kill), close its pipes and fail pending calls."""
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.close()
+            except OSError:
+                pass
+            try:
+                self.proc.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.proc.terminate()
+                try:
+                    self.proc.wait(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    self.proc.kill()
+                    self.proc.wait()
+        self._reap()
+
+        # the process is gone, so both readers hit EOF and finish before their pipes are closed
+        for thread in (self._reader_thread, self._stderr_thread):
+            if thread is not threading.current_thread():
+                thread.join(timeout=1)
+        for pipe in (self.proc.stdin, self.proc.stdout, self.proc.stderr):
+            try:
+                pipe.close()
+            except (OSError, ValueError):
+                pass
+        self._fail_pending(RuntimeError("MCP session closed"))
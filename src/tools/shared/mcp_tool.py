@@ -0,0 +1,99 @@
+import asyncio
+import functools
+from typing import Any, Callable, Generator, NamedTuple
+
+from langchain_core.tools import StructuredTool, tool
+
+from .call_mcp import acall_mcp, call_mcp
+
+
+class McpCall(NamedTuple):
+    """Request yielded by a tool body: call an MCP tool and send back its result."""
+    tool_name: str
+    arguments: dict
+
+
+class BlockingCall:
+    """Request yielded by a tool body: run a plain blocking function (e.g. a REST call)."""
+
+    def __init__(self, fn: Callable, *args, **kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+
+def _perform(request):
+    if isinstance(request, McpCall):
+        return call_mcp(request.tool_name, request.arguments)
+    return request.fn(*request.args, **request.kwargs)
+
+
+async def _aperform(request):
+    if isinstance(request, McpCall):
+        return await acall_mcp(request.tool_name, request.arguments)
+    return await asyncio.to_thread(request.fn, *request.args, **request.kwargs)
+
+
+def _drive(body: Generator) -> Any:
+    try:
+        request = next(body)
+        while True:
+            try:
+                value = _perform(request)
+            except Exception as e:
+                request = body.throw(e)
+            else:
+                request = body.send(value)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def _adrive(body: Generator) -> Any:
+    try:
+        request = next(body)
+        while True:
+            try:
+                value = await _aperform(request)
+            except Exception as e:
+                request = body.throw(e)
+            else:
+                request = body.send(value)
+    except StopIteration as stop:
+        return stop.value
+
+
+def mcp_tool(name: str):
+    """
+    Like langchain's @tool, but builds a tool with both a sync and an async implementation.
+
+    The decorated function is a generator: it yields McpCall / BlockingCall requests and
+    receives their results (or has their exceptions raised at the yield), so each tool's
+    logic is written once. `invoke` runs the requests with call_mcp, `ainvoke` awaits
+    them with acall_mcp without blocking the event loop.
+
+    Example:
+        @mcp_tool("get_issue")
+        def get_issue_tool(owner: str, repo: str, issue_number: int) -> str:
+            result = yield McpCall("get_issue", {...})
+            return ...
+    """
+    def decorator(fn):
+        # Name, description and argument schema come from the original signature/docstring.
+        schema_tool = tool(name)(fn)
+
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            return _drive(fn(*args, **kwargs))
+
+        @functools.wraps(fn)
+        async def arun(*args, **kwargs):
+            return await _adrive(fn(*args, **kwargs))
+
+        return StructuredTool.from_function(
+            func=run,
+            coroutine=arun,
+            name=name,
+            description=schema_tool.description,
+            args_schema=schema_tool.args_schema
+        )
+    return decorator
@@ -0,0 +1,111 @@
+import json
+import os
+from collections import deque
+from typing import Any, Callable, Generator, Optional
+
+from .call_mcp import start_mcp
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_PREFETCH = 2
+DEFAULT_MAX_PAGES = 50
+
+
+class Listing(list):
+    """The items collect() read; `more` is True when it stopped before the last page."""
+    more = False
+
+
+def json_items(result: dict, key: Optional[str] = None) -> list:
+    """
+    The items of one page of a list tool: the JSON array in the first text content, or for an
+    object response (e.g. {"total_count": .., "workflow_runs": [..]}) its `key` list, or its
+    only list if no key is given.
+    """
+    content = result.get("result", {}).get("content", [])
+    text = content[0].get("text", "") if content and isinstance(content[0], dict) else ""
+    data = json.loads(text) if text else []
+    if isinstance(data, dict):
+        data = data.get(key, []) if key else next((v for v in data.values() if isinstance(v, list)), [])
+    return data if isinstance(data, list) else []
+
+
+def _prefetch() -> int:
+    return max(0, int(os.getenv("MCP_PAGE_PREFETCH", DEFAULT_PREFETCH)))
+
+
+def max_pages() -> int:
+    """MCP_MAX_PAGES (default 50): how many pages an unlimited listing reads at most."""
+    return max(1, int(os.getenv("MCP_MAX_PAGES", DEFAULT_MAX_PAGES)))
+
+
+def paginate(tool_name: str, arguments: dict, limit: Optional[int] = None,
+             stop: Optional[Callable[[Any], bool]] = None,
+             items: Callable[[dict], list] = json_items,
+             page_size: int = DEFAULT_PAGE_SIZE) -> Generator[Any, None, bool]:
+    """
+    Items of a paginated MCP list tool (page / perPage arguments), yielded lazily across pages.
+
+    The first page is fetched alone. Once it comes back full there are more pages, so
+    MCP_PAGE_PREFETCH (default 2) further pages are kept in flight while the caller
+    consumes the current one. Iteration ends at the first short page, after `limit` items,
+    or before the first item for which `stop(item)` is true. Pages still in flight at that
+    point are cancelled. A failing page raises once the items before it have been yielded.
+    Without a limit at most max_pages() pages are read. The generator returns True when it
+    stopped while there may be more items (at `limit` or at the page cap), else False.
+
+    Example:
+        open_bugs = [i for i in paginate("list_issues", {"owner": o, "repo": r, "labels": ["bug"]}, limit=200)]
+    """
+    per_page = min(page_size, limit) if limit else page_size
+    last_page = -(-limit // per_page) if limit else max_pages()
+
+    def request(page: int):
+        return start_mcp(tool_name, dict(arguments, page=page, perPage=per_page))
+
+    window = deque([request(1)])
+    next_page, yielded = 2, 0
+    try:
+        while window:
+            page_items = items(window.popleft().result())
+            full = len(page_items) >= per_page
+            if full:
+                while len(window) < max(1, _prefetch()) and next_page <= last_page:
+                    window.append(request(next_page))
+                    next_page += 1
+            for n, item in enumerate(page_items, 1):
+                if stop is not None and stop(item):
+                    return False
+                yield item
+                yielded += 1
+                if limit and yielded >= limit:
+                    return full or n < len(page_items)
+            if not full:
+                return False
+        # every page up to the cap came back full
+        return True
+    finally:
+        for pending in window:
+            pending.cancel()
+
+
+def collect(tool_name: str, arguments: dict, limit: Optional[int] = None,
+            stop: Optional[Callable[[Any], bool]] = None,
+            items: Callable[[dict], list] = json_items) -> Listing:
+    """The items of paginate(...) with its `more` flag, for use as a BlockingCall inside an @mcp_tool."""
+    listing = Listing()
+    pages = paginate(tool_name, arguments, limit=limit, stop=stop, items=items)
+    while True:
+        try:
+            listing.append(next(pages))
+        except StopIteration as done:
+            listing.more = bool(done.value)
+            return listing
+
+
+def more_note(listing: Listing, limit: Optional[int]) -> Optional[str]:
+    """The line a list tool adds when collect() stopped before the end, else None."""
+    if not listing.more:
+        return None
+    if limit:
+        return f"(stopped at limit={limit}; there may be more)"
+    return f"(stopped after {max_pages()} pages; there may be more, narrow the filters or pass a limit)"
@@ -0,0 +1,39 @@
+import json
+import os
+import threading
+
+_lock = threading.Lock()
+_tools_recorded = False
+
+
+def recording() -> bool:
+    return bool(os.getenv("MCP_RECORD_FILE"))
+
+
+def _append(entry: dict):
+    path = os.getenv("MCP_RECORD_FILE")
+    line = json.dumps(entry)
+    with _lock:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def record_tools(tools: list):
+    """Record the server's tools/list schemas (once per process)."""
+    global _tools_recorded
+    if _tools_recorded:
+        return
+    _tools_recorded = True
+    _append({"tools": tools})
+
+
+def record_call(tool_name: str, arguments: dict, result: dict):
+    """
+    Append one answered tools/call to MCP_RECORD_FILE.
+
+    Lines are {"tool", "arguments", "result"} (or {"tools": [...]} for the schemas) and can be
+    replayed offline with stand_in_server.py --fixtures.
+    """
+    _append({"tool": tool_name, "arguments": arguments, "result": result})
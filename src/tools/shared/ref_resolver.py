@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+from .blob_cache import is_commit_sha
+from .http_client import github_get, rest_available
+from .mcp_tool import BlockingCall, McpCall
+
+DEFAULT_REF_TTL = 30.0
+HEAD = "HEAD"   # key used for "no ref given" (the default branch)
+
+_refs: Dict[Tuple[str, str, str], Tuple[str, float]] = {}
+_lock = threading.Lock()
+
+
+def _ttl() -> float:
+    return float(os.getenv("REF_CACHE_TTL", DEFAULT_REF_TTL))
+
+
+def normalize_ref(ref: Optional[str]) -> str:
+    """'main', 'heads/main' and 'refs/heads/main' all name the branch 'main'; no ref means HEAD."""
+    r = (ref or "").strip()
+    for prefix in ("refs/heads/", "heads/"):
+        if r.startswith(prefix):
+            return r[len(prefix):]
+    return r or HEAD
+
+
+def _key(owner: str, repo: str, ref: Optional[str]) -> Tuple[str, str, str]:
+    return owner.lower(), repo.lower(), normalize_ref(ref)
+
+
+def cached_commit(owner: str, repo: str, ref: Optional[str]) -> Optional[str]:
+    if is_commit_sha(ref):
+        return ref.strip().lower()
+    with _lock:
+        entry = _refs.get(_key(owner, repo, ref))
+    if entry is not None and entry[1] > time.monotonic():
+        return entry[0]
+    return None
+
+
+def remember_commit(owner: str, repo: str, ref: Optional[str], sha: str):
+    with _lock:
+        _refs[_key(owner, repo, ref)] = (sha.lower(), time.monotonic() + _ttl())
+
+
+def invalidate(owner: str, repo: str, ref: Optional[str] = None):
+    """
+    Forget resolved commits after a write. With `ref`, that branch and the default-branch
+    entry (which may be the same branch); without it, every ref of the repository.
+    """
+    owner, repo = owner.lower(), repo.lower()
+    with _lock:
+        if ref is None:
+            for key in [k for k in _refs if k[:2] == (owner, repo)]:
+                del _refs[key]
+        else:
+            _refs.pop((owner, repo, normalize_ref(ref)), None)
+            _refs.pop((owner, repo, HEAD), None)
+
+
+def _resolve_rest(owner: str, repo: str, ref: str) -> Optional[str]:
+    # the sha media type returns just the commit SHA as plain text
+    try:
+        response = github_get(f"repos/{quote(owner)}/{quote(repo)}/commits/{quote(ref)}",
+                              headers={"Accept": "application/vnd.github.sha"})
+    except Exception:
+        return None
+    sha = response.text.strip() if response.status_code == 200 else ""
+    return sha if is_commit_sha(sha) else None
+
+
+def resolve_commit(owner: str, repo: str, ref: Optional[str]):
+    """
+    Commit SHA that `ref` (branch, tag, short SHA, or None for the default branch) points at,
+    for use with `yield from` inside an @mcp_tool.
+
+    Results are cached for REF_CACHE_TTL seconds (default 30); anything read at the returned
+    commit can then be cached without expiry. Our own writes call invalidate(). Resolves over
+    REST when a token is available, otherwise with the MCP list_commits tool. Returns None
+    if the ref cannot be resolved, so callers can fall back to reading by ref.
+    """
+    sha = cached_commit(owner, repo, ref)
+    if sha is not None:
+        return sha
+
+    name = normalize_ref(ref)
+    if rest_available():
+        sha = yield BlockingCall(_resolve_rest, owner, repo, name)
+    else:
+        payload = {"owner": owner, "repo": repo, "perPage": 1}
+        if name != HEAD:
+            payload["sha"] = name
+        try:
+            result = yield McpCall("list_commits", payload)
+            commits = json.loads(result["result"]["content"][0]["text"])
+            sha = commits[0]["sha"] if commits else None
+        except Exception:
+            sha = None
+
+    if sha and is_commit_sha(sha):
+        remember_commit(owner, repo, ref, sha)
+        return sha.lower()
+    return None
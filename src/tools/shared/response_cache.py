@@ -0,0 +1,144 @@
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# read-only tools whose answers are reused for a while (seconds)
+DEFAULT_TTLS = {
+    "get_issue": 60.0,
+    "get_issue_comments": 30.0,
+    "get_pull_request": 30.0,
+    "get_pull_request_status": 15.0,
+    "get_pull_request_reviews": 30.0,
+}
+
+# mutating tool -> (cached tools it makes stale, scope): "number" drops the entries of the
+# issue / pull request it touched, "repo" those of every number in the repository
+INVALIDATES = {
+    "update_issue": (("get_issue", "get_pull_request"), "number"),
+    "add_issue_comment": (("get_issue", "get_issue_comments"), "number"),
+    "update_pull_request": (("get_issue", "get_pull_request", "get_pull_request_status"), "number"),
+    "merge_pull_request": (tuple(DEFAULT_TTLS), "number"),
+    "create_pending_pull_request_review": (("get_pull_request_reviews",), "number"),
+    "add_pull_request_review_comment_to_pending_review": (("get_pull_request_reviews",), "number"),
+    "submit_pending_pull_request_review": (("get_pull_request_reviews", "get_pull_request"), "number"),
+    "create_and_submit_pull_request_review": (("get_pull_request_reviews", "get_pull_request"), "number"),
+    "delete_pending_pull_request_review": (("get_pull_request_reviews",), "number"),
+    # a push moves pull request heads (mergeability, checks) without naming the pull request
+    "create_or_update_file": (("get_pull_request", "get_pull_request_status"), "repo"),
+    "delete_file": (("get_pull_request", "get_pull_request_status"), "repo"),
+    "push_files": (("get_pull_request", "get_pull_request_status"), "repo"),
+    "run_workflow": (("get_pull_request_status",), "repo"),
+    "rerun_workflow_run": (("get_pull_request_status",), "repo"),
+    "cancel_workflow_run": (("get_pull_request_status",), "repo"),
+}
+
+MAX_ENTRIES = 512
+
+Key = Tuple[str, str, str, Optional[int], str]
+
+_entries: "OrderedDict[Key, Tuple[float, dict]]" = OrderedDict()
+_generations: Dict[Tuple[str, str], int] = {}
+_stats = {"hits": 0, "misses": 0, "invalidated": 0}
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.getenv("MCP_RESPONSE_CACHE", "1").lower() not in ("0", "false", "no")
+
+
+def ttl(tool_name: str) -> float:
+    """TTL of `tool_name`; MCP_RESPONSE_CACHE_TTLS="get_issue=120,get_pull_request_status=0" overrides the defaults."""
+    for item in os.getenv("MCP_RESPONSE_CACHE_TTLS", "").split(","):
+        name, _, value = item.partition("=")
+        if name.strip() == tool_name and value.strip():
+            return float(value)
+    return DEFAULT_TTLS.get(tool_name, 0.0)
+
+
+def _number(arguments: dict) -> Optional[int]:
+    for name in ("issue_number", "pullNumber", "pull_number"):
+        if arguments.get(name) is not None:
+            try:
+                return int(arguments[name])
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def _repo(arguments: dict) -> Tuple[str, str]:
+    return str(arguments.get("owner", "")).lower(), str(arguments.get("repo", "")).lower()
+
+
+def _key(tool_name: str, arguments: dict) -> Key:
+    """(tool, owner, repo, number, the other arguments as canonical JSON); '5' and 5 are the same issue."""
+    rest = {k: v for k, v in arguments.items()
+            if k not in ("owner", "repo", "issue_number", "pullNumber", "pull_number") and v is not None}
+    return (tool_name, *_repo(arguments), _number(arguments), json.dumps(rest, sort_keys=True, default=str))
+
+
+def get(tool_name: str, arguments: dict) -> Optional[dict]:
+    """A fresh cached response for this call, or None."""
+    if tool_name not in DEFAULT_TTLS or not enabled():
+        return None
+    key = _key(tool_name, arguments)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            _stats["misses"] += 1
+            return None
+        _entries.move_to_end(key)
+        _stats["hits"] += 1
+    return copy.deepcopy(entry[1])
+
+
+def token(tool_name: str, arguments: dict) -> Optional[int]:
+    """Taken when a cacheable call is sent; store() refuses the answer if the repo was written to meanwhile."""
+    if tool_name not in DEFAULT_TTLS or not enabled():
+        return None
+    with _lock:
+        return _generations.get(_repo(arguments), 0)
+
+
+def store(tool_name: str, arguments: dict, response: dict, generation: Optional[int]):
+    seconds = ttl(tool_name)
+    if generation is None or seconds <= 0 or "truncated" in response or "spill" in response:
+        return
+    repo = _repo(arguments)
+    with _lock:
+        if _generations.get(repo, 0) != generation:
+            return  # one of our writes overlapped this read; its answer may predate the write
+        _entries[_key(tool_name, arguments)] = (time.monotonic() + seconds, copy.deepcopy(response))
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+
+def invalidate(tool_name: str, arguments: dict):
+    """Drop what a call to the mutating `tool_name` makes stale (a no-op for other tools)."""
+    rule = INVALIDATES.get(tool_name)
+    if rule is None:
+        return
+    tools, scope = rule
+    repo = _repo(arguments)
+    number = _number(arguments) if scope == "number" else None
+    with _lock:
+        _generations[repo] = _generations.get(repo, 0) + 1
+        stale = [k for k in _entries
+                 if k[0] in tools and k[1:3] == repo and (number is None or k[3] == number)]
+        for k in stale:
+            del _entries[k]
+        _stats["invalidated"] += len(stale)
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+def stats() -> dict:
+    """Counters since start: hits, misses and entries dropped by our own writes."""
+    with _lock:
+        return dict(_stats, entries=len(_entries))
@@ -0,0 +1,301 @@
+import atexit
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from . import tool_output
+from .cache_dir import cache_path, prune_lru
+
+DEFAULT_MAX_RESPONSE_BYTES = 4 * 1024 * 1024
+DEFAULT_PREVIEW_BYTES = 64 * 1024
+CHUNK_SIZE = 64 * 1024
+SPILL_MAX_AGE = 3600.0   # spill files this old are leftovers of a crashed run
+
+# tools whose answer must arrive whole (file reads are never cut, see tool_output.UNCAPPED):
+# a spilled response of theirs is read back in full
+FULL_RESULT_TOOLS = {"get_file_contents"}
+
+_STRING_STOP = re.compile(rb'["\\]')
+_REQUEST_ID = re.compile(rb'"id"\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+)')
+_spilled_files = set()
+_spill_lock = threading.Lock()
+_spill_dir_pruned = False
+
+
+def max_response_bytes() -> int:
+    return int(os.getenv("MCP_MAX_RESPONSE_BYTES", DEFAULT_MAX_RESPONSE_BYTES))
+
+
+def preview_bytes() -> int:
+    return int(os.getenv("MCP_PREVIEW_BYTES", DEFAULT_PREVIEW_BYTES))
+
+
+class TruncatingJsonFilter:
+    """
+    Incrementally copies a JSON document, cutting every string value longer than `limit` bytes.
+
+    Fed chunk by chunk, it never holds more than the (truncated) output, so an oversized
+    response can be decoded into a small view of the same shape. Cuts never split an
+    escape sequence or a UTF-8 character, and each cut string ends with a marker that
+    states its original size.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.out = bytearray()
+        self._in_string = False
+        self._esc: Optional[bytearray] = None   # escape sequence being collected
+        self._skip_next = False                 # past the cut: byte after a backslash
+        self._length = 0                        # bytes of the current string value so far
+        self._cut = False
+
+    def feed(self, data: bytes):
+        i, n = 0, len(data)
+        while i < n:
+            if not self._in_string:
+                quote = data.find(b'"', i)
+                end = n if quote == -1 else quote + 1
+                self.out += data[i:end]
+                if quote != -1:
+                    self._in_string, self._length, self._cut = True, 0, False
+                i = end
+            elif self._skip_next:
+                self._skip_next = False
+                self._length += 1
+                i += 1
+            elif self._esc is not None:
+                self._esc.append(data[i])
+                i += 1
+                if len(self._esc) == 6 or (len(self._esc) == 2 and self._esc[1] != ord("u")):
+                    self._emit(bytes(self._esc))
+                    self._esc = None
+            else:
+                stop = _STRING_STOP.search(data, i)
+                end = n if stop is None else stop.start()
+                self._emit(data[i:end], splittable=True)
+                i = end
+                if stop is None:
+                    break
+                if data[i] == ord("\\"):
+                    if self._cut:
+                        # nothing is copied any more, only the closing quote matters
+                        self._length += 1
+                        self._skip_next = True
+                    else:
+                        self._esc = bytearray()
+                        self._esc.append(data[i])
+                    i += 1
+                    continue
+                # closing quote
+                if self._cut:
+                    self.out += f"...[truncated, {self._length} bytes total]".encode()
+                self.out += b'"'
+                self._in_string = False
+                i += 1
+
+    def _emit(self, piece: bytes, splittable: bool = False):
+        if not piece:
+            return
+        room = self.limit - self._length
+        self._length += len(piece)
+        if self._cut:
+            return
+        if len(piece) <= room:
+            self.out += piece
+            return
+        self._cut = True
+        if splittable:
+            # escape sequences are kept or dropped whole
+            self.out += piece[:room]
+        # the character at the cut may have started in an earlier piece or feed
+        _drop_partial_char(self.out)
+
+
+def _drop_partial_char(buf: bytearray):
+    """Remove a UTF-8 character left incomplete at the end of `buf`."""
+    i = len(buf) - 1
+    while i >= 0 and len(buf) - i < 4 and (buf[i] & 0xC0) == 0x80:
+        i -= 1
+    if i < 0 or buf[i] < 0xC0:
+        return
+    needed = 2 if buf[i] < 0xE0 else 3 if buf[i] < 0xF0 else 4
+    if len(buf) - i < needed:
+        del buf[i:]
+
+
+def _undecodable(line: bytes, error: ValueError) -> Optional[dict]:
+    """
+    A JSON-RPC error standing in for a response that could not be decoded, addressed to the
+    request id found near the start of the line (None if there is none), so the caller
+    waiting for it fails instead of waiting for its deadline.
+    """
+    match = _REQUEST_ID.search(line[:4096])
+    if match is None:
+        return None
+    return {"jsonrpc": "2.0", "id": json.loads(match.group(1)),
+            "error": {"code": -32700, "message": f"Undecodable response ({len(line)} bytes): {error}"}}
+
+
+def _spill_file() -> Tuple[BinaryIO, str]:
+    global _spill_dir_pruned
+    directory = cache_path("mcp-responses")
+    with _spill_lock:
+        first, _spill_dir_pruned = not _spill_dir_pruned, True
+    if first:
+        # a spill file lives only until its response is resolved; older ones were never cleaned up
+        prune_lru(directory, float("inf"), SPILL_MAX_AGE)
+    fd, path = tempfile.mkstemp(prefix="mcp-response-", suffix=".json", dir=directory)
+    with _spill_lock:
+        _spilled_files.add(path)
+    return os.fdopen(fd, "wb"), path
+
+
+def discard_spill(message: dict):
+    """Delete the spill file behind `message`, if any (its response has been used or dropped)."""
+    spill = message.get("spill")
+    if not spill:
+        return
+    with _spill_lock:
+        _spilled_files.discard(spill["path"])
+    try:
+        os.remove(spill["path"])
+    except OSError:
+        pass
+
+
+def read_messages(stream: BinaryIO, max_bytes: Optional[int] = None) -> Iterator[Tuple[dict, dict]]:
+    """
+    Yield (message, meta) for every newline-delimited JSON message on `stream`.
+
+    Lines up to `max_bytes` (default MCP_MAX_RESPONSE_BYTES) are decoded normally. A longer
+    line is streamed to a temp file while being filtered through TruncatingJsonFilter, so
+    memory stays bounded; the yielded message is the truncated view with a "spill" entry
+    ({"path", "bytes"}) pointing at the full payload (see load_spilled_response).
+
+    meta holds perf_counter stamps first_byte_at / complete_at, decode (seconds),
+    response_bytes and spilled. A line that is not valid JSON is reported and, if its request
+    id can be found, replaced by a JSON-RPC error for that request.
+    """
+    limit = max_bytes if max_bytes is not None else max_response_bytes()
+    buf = bytearray()
+    total = 0
+    first_byte_at = None
+    spill = spill_path = json_filter = None
+
+    while True:
+        chunk = stream.read1(CHUNK_SIZE)
+        if not chunk:
+            break
+        now = time.perf_counter()
+        start = 0
+        while start < len(chunk):
+            newline = chunk.find(b"\n", start)
+            piece = chunk[start:] if newline == -1 else chunk[start:newline]
+            if piece and first_byte_at is None:
+                first_byte_at = now
+            total += len(piece)
+
+            if spill is not None:
+                spill.write(piece)
+                json_filter.feed(piece)
+            else:
+                buf += piece
+                if len(buf) > limit:
+                    spill, spill_path = _spill_file()
+                    spill.write(buf)
+                    json_filter = TruncatingJsonFilter(preview_bytes())
+                    json_filter.feed(bytes(buf))
+                    buf = bytearray()
+
+            if newline == -1:
+                break
+            start = newline + 1
+
+            if total:
+                complete_at = time.perf_counter()
+                if spill is not None:
+                    spill.close()
+                line = bytes(json_filter.out) if spill is not None else bytes(buf)
+                try:
+                    message = json.loads(line)
+                    if spill is not None:
+                        message["spill"] = {"path": spill_path, "bytes": total}
+                except ValueError as e:
+                    # JSONDecodeError, or UnicodeDecodeError from a bad byte sequence
+                    message = _undecodable(line, e)
+                    print(f"[MCP] Dropping invalid JSON line ({total} bytes): {e}")
+                if message is not None:
+                    yield message, {
+                        "first_byte_at": first_byte_at,
+                        "complete_at": complete_at,
+                        "decode": time.perf_counter() - complete_at,
+                        "response_bytes": total,
+                        "spilled": spill is not None,
+                    }
+            buf = bytearray()
+            total = 0
+            first_byte_at = None
+            spill = spill_path = json_filter = None
+
+    if spill is not None:
+        spill.close()
+
+
+def load_spilled_response(path: str) -> dict:
+    """Decode the full JSON-RPC response behind a "spill" handle."""
+    with open(path, "rb") as f:
+        return json.load(f)
+
+
+def _full_text(response: dict) -> str:
+    """The text items of a response's content, or the whole response as JSON."""
+    content = (response.get("result") or {}).get("content")
+    if isinstance(content, list):
+        texts = [c.get("text", "") for c in content if isinstance(c, dict) and c.get("type") == "text"]
+        if texts:
+            return "\n".join(texts)
+    return json.dumps(response)
+
+
+def resolve_spill(tool_name: Optional[str], message: dict) -> dict:
+    """
+    What the caller of `tool_name` gets for `message`. A spilled response of a FULL_RESULT_TOOLS
+    tool is read back whole; for other tools the truncated view stays, marked "truncated" and
+    with a note naming a get_tool_output handle to the full text. A response that cannot be
+    read back becomes a JSON-RPC error, never partial content.
+    """
+    spill = message.get("spill")
+    if spill is None:
+        return message
+    try:
+        full = load_spilled_response(spill["path"])
+    except (OSError, ValueError) as e:
+        discard_spill(message)
+        return {"jsonrpc": "2.0", "id": message.get("id"),
+                "error": {"code": -32603, "message": f"Response of {spill['bytes']} bytes could not be read back: {e}"}}
+    discard_spill(message)
+    if tool_name in FULL_RESULT_TOOLS:
+        return full
+    handle = tool_output.store(_full_text(full))
+    view = {k: v for k, v in message.items() if k != "spill"}
+    view["truncated"] = {"bytes": spill["bytes"], "handle": handle}
+    content = (view.get("result") or {}).get("content")
+    if isinstance(content, list):
+        content.append({"type": "text", "text": f"[response of {spill['bytes']} bytes shortened; "
+                                                f"full output: get_tool_output(handle=\"{handle}\")]"})
+    return view
+
+
+@atexit.register
+def _remove_spilled_files():
+    with _spill_lock:
+        paths = list(_spilled_files)
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,68 @@
+import hashlib
+import os
+import subprocess
+import threading
+
+from .cache_dir import cache_path
+
+_SOURCE_FILES = (".go", "go.mod", "go.sum")
+_SKIP_DIRS = {".git", "e2e", "docs", "node_modules"}
+
+_built = {}
+_build_lock = threading.Lock()
+
+
+def source_tree_hash(src_dir: str) -> str:
+    """sha256 over every Go source file (path and content) in the server checkout."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(src_dir):
+        dirs[:] = sorted(d for d in dirs if d not in _SKIP_DIRS)
+        for name in sorted(files):
+            if not name.endswith(_SOURCE_FILES):
+                continue
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, src_dir).replace(os.sep, "/").encode())
+            digest.update(b"\0")
+            with open(path, "rb") as f:
+                digest.update(f.read())
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def ensure_server_binary(src_dir: str) -> str:
+    """
+    Return the path of a github-mcp-server binary built from `src_dir`.
+
+    The binary is cached under <cache>/github-mcp-server/<source hash>/, so `go build`
+    only runs again after the Go sources change. The hash is computed once per process.
+
+    Raises:
+        RuntimeError: if the location is missing or the build fails.
+    """
+    if not src_dir or not os.path.isdir(src_dir):
+        raise RuntimeError(f"github_mcp_server_location is not a directory: '{src_dir}'")
+
+    with _build_lock:
+        if src_dir in _built:
+            return _built[src_dir]
+
+        tree_hash = source_tree_hash(src_dir)
+        out_dir = cache_path("github-mcp-server", tree_hash[:16])
+        binary = os.path.join(out_dir, "github-mcp-server.exe" if os.name == "nt" else "github-mcp-server")
+
+        if not os.path.isfile(binary):
+            print(f"[MCP] Building github-mcp-server into {out_dir} ...")
+            tmp_binary = f"{binary}.{os.getpid()}.tmp"
+            build = subprocess.run(
+                ["go", "build", "-o", tmp_binary, "./cmd/github-mcp-server"],
+                cwd=src_dir,
+                capture_output=True,
+                text=True
+            )
+            if build.returncode != 0:
+                raise RuntimeError(f"go build failed:\n{build.stderr.strip()}")
+            # atomic, so concurrent builders never expose a half-written binary
+            os.replace(tmp_binary, binary)
+
+        _built[src_dir] = binary
+        return binary
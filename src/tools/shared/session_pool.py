@@ -0,0 +1,152 @@
+import atexit
+import os
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from .mcp_session import McpSession
+from .tracing import Span
+
+DEFAULT_POOL_SIZE = 2
+
+
+class SessionPool:
+    """
+    Keeps up to `size` warm github-mcp-server processes and spreads requests over them.
+
+    Every worker pipelines requests, so a call never waits for a free worker: it goes
+    to the least busy live one. Workers are started lazily (a new one only when all
+    running workers are busy) and replaced when they crash.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE):
+        self.size = max(1, size)
+        self._sessions: List[McpSession] = []
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._starting = 0      # workers being spawned outside the lock
+        self._closed = False
+        self._tools: Dict[str, dict] = {}
+
+    def _pick(self) -> Tuple[McpSession, bool]:
+        """Least busy live worker, and whether it had to be started for this call."""
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise RuntimeError("MCP session pool is shut down")
+
+                dead = [s for s in self._sessions if not s.is_alive()]
+                self._sessions = [s for s in self._sessions if s.is_alive()]
+                for session in dead:
+                    session.close()
+
+                idle = min(self._sessions, key=lambda s: s.in_flight(), default=None)
+                full = len(self._sessions) + self._starting >= self.size
+                if idle is not None and (idle.in_flight() == 0 or full):
+                    return idle, False
+                if not full:
+                    # reserve the slot so concurrent callers cannot overshoot `size`
+                    self._starting += 1
+                    break
+                # no live worker yet and every slot is being started: wait for one
+                self._changed.wait()
+
+        # spawning and the handshake take a while; other callers keep using the running workers
+        try:
+            session = McpSession()
+        except BaseException:
+            with self._lock:
+                self._starting -= 1
+                self._changed.notify_all()
+            raise
+        with self._lock:
+            self._starting -= 1
+            self._changed.notify_all()
+            if self._closed:
+                session.close()
+                raise RuntimeError("MCP session pool is shut down")
+            self._sessions.append(session)
+            if not self._tools:
+                self._tools = dict(session.tools)
+        return session, True
+
+    def _discard(self, session: McpSession):
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        session.close()
+
+    def tools(self, span: Optional[Span] = None) -> Dict[str, dict]:
+        """
+        The server's tools/list schema, keyed by tool name.
+
+        Cached from the first worker's handshake; starts a worker if none has run yet
+        (and charges its startup phases to `span`).
+        """
+        if not self._tools:
+            session, spawned = self._pick()
+            if spawned and span is not None:
+                self._charge_startup(session, span)
+        return self._tools
+
+    @staticmethod
+    def _charge_startup(session: McpSession, span: Span):
+        for name, seconds in session.startup.items():
+            span.phase(name, seconds)
+
+    def submit(self, body: dict, span: Optional[Span] = None) -> Future:
+        """
+        Send a JSON-RPC request on the least busy worker; the future resolves to the response dict.
+
+        If a worker had to be started for this request, its startup phases are added to `span`.
+        """
+        session, spawned = self._pick()
+        try:
+            future = session.submit(body)
+        except BrokenPipeError:
+            # The worker died before the request reached it, so retrying cannot double-apply it.
+            self._discard(session)
+            session, spawned = self._pick()
+            future = session.submit(body)
+        if spawned and span is not None:
+            self._charge_startup(session, span)
+        return future
+
+    def request(self, body: dict) -> dict:
+        return self.submit(body).result()
+
+    def live_sessions(self) -> int:
+        with self._lock:
+            return sum(1 for s in self._sessions if s.is_alive())
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            sessions, self._sessions = self._sessions, []
+            self._changed.notify_all()
+        for session in sessions:
+            session.close()
+
+
+_pool: Optional[SessionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> SessionPool:
+    """Process-wide pool, sized by the MCP_POOL_SIZE environment variable."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SessionPool(int(os.getenv("MCP_POOL_SIZE", DEFAULT_POOL_SIZE)))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(shutdown_pool)
@@ -0,0 +1,139 @@
+import copy
+import json
+import os
+import threading
+from concurrent.futures import Future, InvalidStateError
+from typing import Callable, Dict, Optional, Tuple
+
+Key = Tuple[str, str, str, str]
+
+
+class _Flight:
+    """One request in flight and the callers waiting for its answer."""
+
+    def __init__(self):
+        self.shared = Future()                 # settled with the answer of `request`
+        self.request: Optional[Future] = None  # the session future, once sent
+        self.waiters = 0
+
+
+_inflight: Dict[Key, _Flight] = {}
+_stats = {"sent": 0, "saved": 0}
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.getenv("MCP_SINGLEFLIGHT", "1").lower() not in ("0", "false", "no")
+
+
+def read_only(schema: Optional[dict]) -> bool:
+    """Whether the server marks a tool as only reading (annotations.readOnlyHint in its tools/list entry)."""
+    return bool(((schema or {}).get("annotations") or {}).get("readOnlyHint"))
+
+
+def _repo(arguments: dict) -> Tuple[str, str]:
+    return str(arguments.get("owner", "")).lower(), str(arguments.get("repo", "")).lower()
+
+
+def _key(tool_name: str, arguments: dict) -> Key:
+    return (tool_name, *_repo(arguments), json.dumps(arguments, sort_keys=True, default=str))
+
+
+def _deliver(shared: Future, waiter: Future, private_copy: bool):
+    if shared.cancelled():
+        waiter.cancel()
+        return
+    try:
+        error = shared.exception()
+        if error is not None:
+            waiter.set_exception(error)
+        else:
+            # every caller gets its own dict, as if it had sent the request itself
+            waiter.set_result(copy.deepcopy(shared.result()) if private_copy else shared.result())
+    except InvalidStateError:
+        pass  # the waiter gave up meanwhile
+
+
+def _settle(key: Key, flight: _Flight, request: Future):
+    with _lock:
+        if _inflight.get(key) is flight:
+            del _inflight[key]
+    if request.cancelled():
+        flight.shared.cancel()
+    elif request.exception() is not None:
+        flight.shared.set_exception(request.exception())
+    else:
+        flight.shared.set_result(request.result())
+
+
+def _leave(key: Key, flight: _Flight, waiter: Future):
+    """A waiter was cancelled; the request itself is cancelled once nobody waits for it."""
+    if not waiter.cancelled():
+        return
+    with _lock:
+        flight.waiters -= 1
+        abandoned = flight.waiters == 0 and not flight.shared.done()
+        if abandoned and _inflight.get(key) is flight:
+            del _inflight[key]
+    if abandoned and flight.request is not None:
+        flight.request.cancel()
+
+
+def join(tool_name: str, arguments: dict, send: Callable[[], Future], is_read: bool) -> Future:
+    """
+    A future for the answer to this call; `send()` is only called if no identical read is
+    already in flight, otherwise the caller waits for that one (`future.coalesced` is True).
+
+    Each caller's future can be cancelled on its own; the request is cancelled on the
+    server when the last one waiting for it is. Calls that are not reads (`is_read`, see
+    read_only) go straight to `send()`.
+    """
+    if not is_read or not enabled():
+        return send()
+    key = _key(tool_name, arguments)
+    with _lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+            _stats["sent"] += 1
+        else:
+            _stats["saved"] += 1
+        flight.waiters += 1
+
+    waiter = Future()
+    waiter.timing = {}
+    waiter.coalesced = not leader
+    if leader:
+        try:
+            request = send()
+        except BaseException as e:
+            with _lock:
+                if _inflight.get(key) is flight:
+                    del _inflight[key]
+            flight.shared.set_exception(e)
+            raise
+        # the leader's span reports the request's phases (write, ttfb, read, ...)
+        waiter.timing = request.timing
+        flight.request = request
+        request.add_done_callback(lambda f: _settle(key, flight, f))
+    flight.shared.add_done_callback(lambda s: _deliver(s, waiter, private_copy=not leader))
+    waiter.add_done_callback(lambda w: _leave(key, flight, w))
+    return waiter
+
+
+def detach(arguments: dict):
+    """
+    Stop handing out reads of this repository that are already in flight. Called when a
+    write is sent, so a read started after it never gets an answer from before it.
+    """
+    repo = _repo(arguments)
+    with _lock:
+        for key in [k for k in _inflight if k[1:3] == repo]:
+            del _inflight[key]
+
+
+def stats() -> dict:
+    """Counters since start: reads sent, and reads answered by joining an identical one in flight."""
+    with _lock:
+        return dict(_stats, in_flight=len(_inflight))
@@ -0,0 +1,290 @@
+import base64
+import json
+import os
+import posixpath
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import threading
+from typing import Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import quote
+
+from .blob_cache import git_blob_sha, is_commit_sha
+from .cache_dir import cache_path
+from .http_client import github_get, rest_available
+from .ref_resolver import normalize_ref
+
+DEFAULT_SNAPSHOT_MAX_BYTES = 256 * 1024 * 1024
+SNAPSHOTS_PER_REPO = 3
+FETCH_TIMEOUT = 300
+GAPS_FILE = "gaps.json"
+
+_building: Dict[Tuple[str, str, str], threading.Thread] = {}
+_failed: Set[Tuple[str, str, str]] = set()
+_prefetched: Set[Tuple[str, str, str]] = set()    # (owner, repo, branch) prefetched in this run
+_gaps_by_root: Dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def source() -> Optional[str]:
+    """
+    How snapshots are fetched: "git" when SNAPSHOT_GIT_URL is set, "tarball" (REST) when a
+    token is available, None when disabled (SNAPSHOT_SOURCE=off) or neither is possible.
+    SNAPSHOT_SOURCE=git / tarball forces one of the two.
+    """
+    choice = os.getenv("SNAPSHOT_SOURCE", "auto").lower()
+    if choice in ("0", "off", "false", "no"):
+        return None
+    if choice in ("auto", "git") and os.getenv("SNAPSHOT_GIT_URL"):
+        return "git"
+    if choice in ("auto", "tarball") and rest_available():
+        return "tarball"
+    return None
+
+
+def _key(owner: str, repo: str, commit: str) -> Tuple[str, str, str]:
+    return owner.lower(), repo.lower(), commit.strip().lower()
+
+
+def _root(owner: str, repo: str, commit: str) -> str:
+    return os.path.join(cache_path("snapshots", owner.lower(), repo.lower()), commit.strip().lower())
+
+
+def _gaps(owner: str, repo: str, commit: str) -> Optional[dict]:
+    """
+    Where a finished snapshot differs from the commit: {"missing", "differs", "dirs"} sets of
+    paths (see _compare), or None if there is no finished snapshot of `commit`.
+    """
+    root = _root(owner, repo, commit)
+    with _lock:
+        gaps = _gaps_by_root.get(root)
+    if gaps is not None and os.path.isdir(root):
+        return gaps
+    try:
+        with open(os.path.join(root, GAPS_FILE), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    missing, differs = set(data.get("missing", [])), set(data.get("differs", []))
+    gaps = {"missing": missing, "differs": differs, "dirs": {posixpath.dirname(p) for p in missing}}
+    with _lock:
+        _gaps_by_root[root] = gaps
+    return gaps
+
+
+def snapshot_dir(owner: str, repo: str, commit: Optional[str], exact: bool = False) -> Optional[str]:
+    """
+    Directory holding the files of `commit`, if a complete snapshot of it is on disk.
+    With exact=True only if every file of the commit is in it unchanged (no gaps).
+    """
+    if not is_commit_sha(commit):
+        return None
+    gaps = _gaps(owner, repo, commit)
+    if gaps is None or (exact and (gaps["missing"] or gaps["differs"])):
+        return None
+    return os.path.join(_root(owner, repo, commit), "files")
+
+
+def _unpack(tar: tarfile.TarFile, dest: str, strip_top: bool):
+    """Extract regular files only, refusing absolute and '..' paths (and a size over SNAPSHOT_MAX_BYTES)."""
+    limit = int(os.getenv("SNAPSHOT_MAX_BYTES", DEFAULT_SNAPSHOT_MAX_BYTES))
+    total = 0
+    for member in tar:
+        name = member.name
+        if strip_top:
+            # GitHub tarballs put everything under "<owner>-<repo>-<sha>/"
+            name = name.split("/", 1)[1] if "/" in name else ""
+        parts = [p for p in name.split("/") if p not in ("", ".")]
+        if not parts or name.startswith("/") or ".." in parts:
+            continue
+        target = os.path.join(dest, *parts)
+        if member.isdir():
+            os.makedirs(target, exist_ok=True)
+        elif member.isfile():
+            total += member.size
+            if total > limit:
+                raise RuntimeError(f"repository is larger than {limit} bytes")
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with tar.extractfile(member) as src, open(target, "wb") as out:
+                shutil.copyfileobj(src, out)
+
+
+def _rest_blobs(owner: str, repo: str, commit: str) -> Dict[str, str]:
+    """path -> blob SHA of every non-directory entry of `commit`, from the git trees API."""
+    response = github_get(f"repos/{quote(owner)}/{quote(repo)}/git/trees/{commit}", params={"recursive": "1"})
+    if response.status_code != 200:
+        raise RuntimeError(f"tree request failed: [{response.status_code}]")
+    data = response.json()
+    if data.get("truncated"):
+        raise RuntimeError("tree is too large to check the snapshot against")
+    return {e["path"]: e.get("sha", "") for e in data.get("tree", []) if e.get("type") != "tree"}
+
+
+def _git_blobs(git_dir: str, commit: str, env: dict) -> Dict[str, str]:
+    """path -> blob SHA of every non-directory entry of `commit`, from git ls-tree."""
+    listing = subprocess.run(["git", "--git-dir", git_dir, "ls-tree", "-r", "-z", commit],
+                             check=True, capture_output=True, env=env).stdout
+    blobs = {}
+    for record in listing.split(b"\0"):
+        if record:
+            info, _, path = record.partition(b"\t")
+            blobs[path.decode("utf-8", errors="replace")] = info.split()[2].decode()
+    return blobs
+
+
+def _fetch_tarball(owner: str, repo: str, commit: str, dest: str) -> Dict[str, str]:
+    response = github_get(f"repos/{quote(owner)}/{quote(repo)}/tarball/{commit}", stream=True)
+    with response:
+        if response.status_code != 200:
+            raise RuntimeError(f"tarball request failed: [{response.status_code}]")
+        response.raw.decode_content = True
+        with tarfile.open(fileobj=response.raw, mode="r|*") as tar:
+            _unpack(tar, dest, strip_top=True)
+    return _rest_blobs(owner, repo, commit)
+
+
+def _fetch_git(owner: str, repo: str, commit: str, dest: str) -> Dict[str, str]:
+    url = os.environ["SNAPSHOT_GIT_URL"].format(owner=owner, repo=repo)
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    token = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN")
+    if token and url.startswith("https://"):
+        # passed through the environment so the token does not show up in the process list
+        credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+        env.update(GIT_CONFIG_COUNT="1", GIT_CONFIG_KEY_0="http.extraHeader",
+                   GIT_CONFIG_VALUE_0=f"Authorization: Basic {credentials}")
+    with tempfile.TemporaryDirectory(prefix="snapshot-git-") as git_dir:
+        subprocess.run(["git", "init", "-q", "--bare", git_dir], check=True, capture_output=True, env=env)
+        subprocess.run(["git", "--git-dir", git_dir, "fetch", "-q", "--depth", "1", url, commit],
+                       check=True, capture_output=True, env=env, timeout=FETCH_TIMEOUT)
+        archive = subprocess.Popen(["git", "--git-dir", git_dir, "archive", "--format=tar", commit],
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env)
+        try:
+            with tarfile.open(fileobj=archive.stdout, mode="r|") as tar:
+                _unpack(tar, dest, strip_top=False)
+        finally:
+            archive.stdout.close()
+            if archive.wait() != 0:
+                raise RuntimeError(f"git archive exited with {archive.returncode}")
+        return _git_blobs(git_dir, commit, env)
+
+
+def _compare(dest: str, blobs: Dict[str, str]) -> dict:
+    """
+    Check the unpacked files against the commit's tree. An archive leaves out export-ignore
+    paths, symlinks and submodules ("missing") and expands export-subst files ("differs");
+    reads of those paths, and listings of directories with missing children, go to the API.
+    """
+    missing, differs = [], []
+    for path, sha in sorted(blobs.items()):
+        full = os.path.join(dest, *path.split("/"))
+        if not os.path.isfile(full):
+            missing.append(path)
+            continue
+        with open(full, "rb") as f:
+            if git_blob_sha(f.read()) != sha:
+                differs.append(path)
+    return {"missing": missing, "differs": differs}
+
+
+def _prune(owner: str, repo: str, keep: str):
+    """Keep the newest SNAPSHOTS_PER_REPO snapshots of a repository."""
+    parent = os.path.dirname(_root(owner, repo, keep))
+    entries = [os.path.join(parent, e) for e in os.listdir(parent) if is_commit_sha(e)]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for path in entries[SNAPSHOTS_PER_REPO:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def build(owner: str, repo: str, commit: str) -> Optional[str]:
+    """
+    Fetch the whole repository at `commit` in one go and unpack it under TOOLS_CACHE_DIR/snapshots.
+
+    Returns the snapshot directory, or None when snapshots are disabled or the fetch fails
+    (a failure is not retried in this run). The directory appears atomically, so readers
+    never see a half-unpacked snapshot. Paths where the archive differs from the commit are
+    recorded next to it (see _compare) and never served from it.
+    """
+    existing = snapshot_dir(owner, repo, commit)
+    kind = source()
+    if existing is not None or kind is None or not is_commit_sha(commit):
+        return existing
+    commit = commit.strip().lower()
+    final = _root(owner, repo, commit)
+    tmp = tempfile.mkdtemp(prefix=f".{commit}.", dir=os.path.dirname(final))
+    try:
+        files = os.path.join(tmp, "files")
+        os.makedirs(files)
+        blobs = (_fetch_git if kind == "git" else _fetch_tarball)(owner, repo, commit, files)
+        with open(os.path.join(tmp, GAPS_FILE), "w", encoding="utf-8") as f:
+            json.dump(_compare(files, blobs), f)
+        if os.path.isdir(final) and not os.path.exists(os.path.join(final, GAPS_FILE)):
+            shutil.rmtree(final, ignore_errors=True)  # unfinished, or from before gaps were recorded
+        try:
+            os.rename(tmp, final)
+        except OSError:
+            # built concurrently by another process
+            shutil.rmtree(tmp, ignore_errors=True)
+    except Exception as e:
+        shutil.rmtree(tmp, ignore_errors=True)
+        with _lock:
+            _failed.add(_key(owner, repo, commit))
+        print(f"Snapshot of {owner}/{repo}@{commit[:7]} failed: {e}")
+        return None
+    _prune(owner, repo, commit)
+    return snapshot_dir(owner, repo, commit)
+
+
+def prefetch(owner: str, repo: str, commit: Optional[str], ref: Optional[str] = None) -> bool:
+    """
+    Start building a snapshot of `commit` (what `ref` points to) in the background; returns
+    True if a build was started. Each branch is prefetched at most once per run: every
+    write moves it to a new commit, and refetching the whole repository after each write
+    would cost far more than the reads it saves.
+    """
+    if not is_commit_sha(commit) or source() is None or snapshot_dir(owner, repo, commit) is not None:
+        return False
+    key = _key(owner, repo, commit)
+    branch = (owner.lower(), repo.lower(), normalize_ref(ref))
+    with _lock:
+        if key in _failed or branch in _prefetched or (key in _building and _building[key].is_alive()):
+            return False
+        _prefetched.add(branch)
+        thread = threading.Thread(target=build, args=(owner, repo, commit), name=f"snapshot-{commit[:7]}", daemon=True)
+        _building[key] = thread
+    thread.start()
+    return True
+
+
+def wait(owner: str, repo: str, commit: str, timeout: Optional[float] = None) -> Optional[str]:
+    """Wait for a background build of `commit` to finish; returns the snapshot directory, if any."""
+    with _lock:
+        thread = _building.get(_key(owner, repo, commit))
+    if thread is not None:
+        thread.join(timeout)
+    return snapshot_dir(owner, repo, commit)
+
+
+def read(owner: str, repo: str, commit: Optional[str], path: str) -> Union[None, bytes, List[str]]:
+    """
+    `path` at `commit` from the local snapshot: file bytes, or for a directory the child
+    paths (as the contents API lists them). None when there is no snapshot, no such path,
+    or the snapshot differs from the commit there (see _compare).
+    """
+    root = snapshot_dir(owner, repo, commit)
+    if root is None:
+        return None
+    rel = (path or "").strip().strip("/")
+    parts = [p for p in rel.split("/") if p]
+    if ".." in parts:
+        return None
+    gaps = _gaps(owner, repo, commit)
+    if rel in gaps["missing"] or rel in gaps["differs"] or rel in gaps["dirs"]:
+        return None
+    full = os.path.join(root, *parts)
+    if os.path.isfile(full):
+        with open(full, "rb") as f:
+            return f.read()
+    if os.path.isdir(full):
+        return [f"{rel}/{name}" if rel else name for name in sorted(os.listdir(full))]
+    return None
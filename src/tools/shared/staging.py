@@ -0,0 +1,147 @@
+import os
+import posixpath
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .ref_resolver import normalize_ref
+
+# tools that look at a branch on GitHub (commits, PRs, CI runs); staged changes are
+# flushed before any of them runs so they see what the agent has written
+FLUSH_BEFORE = {
+    "create_branch",
+    "push_multiple_files",
+    "create_pull_request",
+    "update_pull_request",
+    "merge_pull_request",
+    "get_pull_request_diff",
+    "get_pull_request_files",
+    "get_pull_request_status",
+    "list_commits",
+    "get_commit_details",
+    "run_workflow",
+    "rerun_workflow_run",
+}
+
+
+class StagedBranch:
+    """Pending changes for one branch: path -> new content, or None for a deletion."""
+
+    def __init__(self, owner: str, repo: str, branch: str):
+        self.owner = owner
+        self.repo = repo
+        self.branch = branch
+        self.changes: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self.messages: List[str] = []
+
+    def commit_message(self) -> str:
+        """The first message as subject, any further ones as a bullet list below it."""
+        if len(self.messages) <= 1:
+            return self.messages[0] if self.messages else f"Update {len(self.changes)} file(s)"
+        return self.messages[0] + "\n\n" + "\n".join(f"- {m}" for m in self.messages[1:])
+
+
+_branches: "OrderedDict[Tuple[str, str, str], StagedBranch]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    """STAGE_WRITES=1 turns staging on; by default every write is committed right away."""
+    return os.getenv("STAGE_WRITES", "0").lower() in ("1", "true", "yes")
+
+
+def _key(owner: str, repo: str, branch: Optional[str]) -> Tuple[str, str, str]:
+    return owner.lower(), repo.lower(), normalize_ref(branch)
+
+
+def stage(owner: str, repo: str, branch: str, path: str, content: Optional[str], message: str) -> int:
+    """Stage a write (or, with content=None, a deletion) of `path`; returns the branch's pending change count."""
+    path = path.strip().strip("/")
+    with _lock:
+        staged = _branches.get(_key(owner, repo, branch))
+        if staged is None:
+            staged = _branches[_key(owner, repo, branch)] = StagedBranch(owner, repo, normalize_ref(branch))
+        staged.changes[path] = content
+        staged.changes.move_to_end(path)
+        if message and message not in staged.messages:
+            staged.messages.append(message)
+        return len(staged.changes)
+
+
+def staged_content(owner: str, repo: str, ref: Optional[str], path: str) -> Tuple[bool, Optional[str]]:
+    """(True, content) when `path` has a staged change on branch `ref` (content None = deleted), else (False, None)."""
+    if not ref:
+        return False, None
+    with _lock:
+        staged = _branches.get(_key(owner, repo, ref))
+        if staged is None:
+            return False, None
+        path = path.strip().strip("/")
+        if path not in staged.changes:
+            return False, None
+        return True, staged.changes[path]
+
+
+def staged_changes(owner: str, repo: str, ref: Optional[str]) -> Dict[str, Optional[str]]:
+    """A copy of the changes staged on branch `ref`: path -> new content, or None for a deletion."""
+    if not ref:
+        return {}
+    with _lock:
+        staged = _branches.get(_key(owner, repo, ref))
+        return dict(staged.changes) if staged is not None else {}
+
+
+def overlay_listing(owner: str, repo: str, ref: Optional[str], directory: str, paths: List[str]) -> List[str]:
+    """A directory listing as it will look after the flush: staged new files added, staged deletions removed."""
+    if not ref:
+        return paths
+    directory = directory.strip().strip("/")
+    with _lock:
+        staged = _branches.get(_key(owner, repo, ref))
+        changes = dict(staged.changes) if staged is not None else {}
+    if not changes:
+        return paths
+    listed = [p for p in paths if changes.get(p.strip("/"), "") is not None]
+    for path, content in changes.items():
+        if content is None or path in listed:
+            continue
+        parent = posixpath.dirname(path)
+        if parent == directory:
+            listed.append(path)
+        elif parent.startswith(directory + "/" if directory else ""):
+            # a new file in a new subdirectory shows up as that subdirectory
+            child = path[len(directory) + 1 if directory else 0:].split("/", 1)[0]
+            child = f"{directory}/{child}" if directory else child
+            if child not in listed:
+                listed.append(child)
+    return listed
+
+
+def take(owner: Optional[str] = None, repo: Optional[str] = None, branch: Optional[str] = None) -> List[StagedBranch]:
+    """Remove and return the staged branches matching the given filters (all of them by default)."""
+    with _lock:
+        keys = [k for k in _branches
+                if (not owner or k[0] == owner.lower())
+                and (not repo or k[1] == repo.lower())
+                and (not branch or k[2] == normalize_ref(branch))]
+        return [_branches.pop(k) for k in keys]
+
+
+def restore(staged: StagedBranch):
+    """Put back changes whose flush failed; anything staged for the branch since then wins."""
+    with _lock:
+        key = _key(staged.owner, staged.repo, staged.branch)
+        current = _branches.get(key)
+        if current is None:
+            _branches[key] = staged
+            return
+        for path, content in staged.changes.items():
+            if path not in current.changes:
+                current.changes[path] = content
+        current.messages = staged.messages + [m for m in current.messages if m not in staged.messages]
+
+
+def pending() -> Dict[str, int]:
+    """'owner/repo@branch' -> number of staged changes."""
+    with _lock:
+        return {f"{s.owner}/{s.repo}@{s.branch}": len(s.changes) for s in _branches.values()}
@@ -0,0 +1,789 @@
+"""
+Offline stand-in for github-mcp-server.
+
+Speaks the same newline-delimited JSON-RPC over stdio (initialize, tools/list, tools/call,
+ping, notifications/cancelled) and answers every tool the agents use from a small in-memory
+GitHub model: files per branch, commits, issues, pull requests and workflow runs. Results
+have the same shape as the real server's (JSON text content, file bodies as resources).
+
+Fixture files recorded with MCP_RECORD_FILE (see recorder.py) are replayed first: a
+tools/call whose tool name and arguments match a recorded call gets the recorded result,
+and a recorded tools/list replaces the built-in schemas.
+
+Standard library only; it is started by path (not as part of the `tools` package):
+
+    python stand_in_server.py [--state FILE] [--fixtures FILE] [--latency-ms N] [--strict]
+
+Set MCP_STAND_IN=1 to make call_mcp launch it instead of the real server
+(see stand_in_command()).
+"""
+import argparse
+import atexit
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: workers of one client are not locked against each other
+    fcntl = None
+
+PROTOCOL_VERSION = "2025-03-26"
+DEFAULT_BRANCH = "main"
+LOGIN = "stand-in-user"
+
+# tool -> (required, optional) arguments, as in github-mcp-server's tools/list, so that
+# check_tool_call validates offline calls the same way it validates real ones
+_PAGED = ("page", "perPage")
+_PULL = ("owner", "repo", "pullNumber")
+_RUN = ("owner", "repo", "run_id")
+TOOL_ARGS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    # repository_management
+    "get_file_contents": (("owner", "repo"), ("path", "ref", "sha")),
+    "create_repository": (("name",), ("description", "private", "autoInit")),
+    "create_branch": (("owner", "repo", "branch"), ("from_branch",)),
+    "delete_file": (("owner", "repo", "path", "message", "branch"), ()),
+    "push_files": (("owner", "repo", "branch", "files", "message"), ()),
+    "create_or_update_file": (("owner", "repo", "path", "content", "message", "branch"), ("sha",)),
+    "list_branches": (("owner", "repo"), _PAGED),
+    "list_commits": (("owner", "repo"), ("sha", "author") + _PAGED),
+    "get_commit": (("owner", "repo", "sha"), _PAGED),
+    "search_repositories": (("query",), _PAGED),
+    # issues
+    "search_issues": (("query",), ("owner", "repo", "sort", "order") + _PAGED),
+    "create_issue": (("owner", "repo", "title"), ("body", "assignees", "labels", "milestone")),
+    "get_issue": (("owner", "repo", "issue_number"), ()),
+    "get_issue_comments": (("owner", "repo", "issue_number"), _PAGED),
+    "add_issue_comment": (("owner", "repo", "issue_number", "body"), ()),
+    "update_issue": (("owner", "repo", "issue_number"), ("title", "body", "state", "labels", "assignees", "milestone")),
+    "list_issues": (("owner", "repo"), ("state", "labels", "sort", "direction", "since") + _PAGED),
+    # pull_requests
+    "search_pull_requests": (("query",), ("owner", "repo", "sort", "order") + _PAGED),
+    "list_pull_requests": (("owner", "repo"), ("state", "head", "base", "sort", "direction") + _PAGED),
+    "create_pull_request": (("owner", "repo", "title", "head", "base"), ("body", "draft", "maintainer_can_modify")),
+    "get_pull_request": (_PULL, ()),
+    "get_pull_request_diff": (_PULL, ()),
+    "get_pull_request_files": (_PULL, ()),
+    "get_pull_request_reviews": (_PULL, ()),
+    "update_pull_request": (_PULL, ("title", "body", "state", "base", "maintainer_can_modify")),
+    "merge_pull_request": (_PULL, ("commit_title", "commit_message", "merge_method")),
+    "create_pending_pull_request_review": (_PULL, ("commitID",)),
+    "add_pull_request_review_comment_to_pending_review": (
+        _PULL + ("path", "body", "subjectType"), ("line", "side", "startLine", "startSide")),
+    "delete_pending_pull_request_review": (_PULL, ()),
+    "submit_pending_pull_request_review": (_PULL + ("event",), ("body",)),
+    "create_and_submit_pull_request_review": (_PULL + ("body", "event"), ("commitID",)),
+    "get_pull_request_status": (_PULL, ()),
+    # user
+    "get_me": ((), ()),
+    "search_users": (("query",), ("sort", "order") + _PAGED),
+    "list_notifications": ((), ("filter", "since", "before", "owner", "repo") + _PAGED),
+    # workflows
+    "run_workflow": (("owner", "repo", "workflow_id", "ref"), ("inputs",)),
+    "rerun_workflow_run": (_RUN, ()),
+    "cancel_workflow_run": (_RUN, ()),
+    "get_workflow_run_logs": (_RUN, ()),
+    "list_workflow_runs": (("owner", "repo", "workflow_id"), ("actor", "branch", "event", "status") + _PAGED),
+    "get_workflow_run_usage": (_RUN, ()),
+}
+
+# tools annotated readOnlyHint=true by the real server
+READ_ONLY_TOOLS = {
+    "get_file_contents", "list_branches", "list_commits", "get_commit", "search_repositories",
+    "search_issues", "get_issue", "get_issue_comments", "list_issues",
+    "search_pull_requests", "list_pull_requests", "get_pull_request", "get_pull_request_diff",
+    "get_pull_request_files", "get_pull_request_reviews", "get_pull_request_status",
+    "get_me", "search_users", "list_notifications",
+    "get_workflow_run_logs", "list_workflow_runs", "get_workflow_run_usage",
+}
+
+_ARG_TYPES = {
+    "page": "number", "perPage": "number", "pullNumber": "number", "issue_number": "number",
+    "run_id": "number", "milestone": "number", "line": "number", "startLine": "number",
+    "private": "boolean", "autoInit": "boolean", "draft": "boolean", "maintainer_can_modify": "boolean",
+    "files": "array", "labels": "array", "assignees": "array", "inputs": "object",
+}
+
+
+def tool_schema(name: str) -> dict:
+    """The tools/list entry of `name`, with its argument schema (see TOOL_ARGS) and annotations."""
+    required, optional = TOOL_ARGS[name]
+    properties = {arg: {"type": _ARG_TYPES.get(arg, "string")} for arg in required + optional}
+    return {"name": name, "description": f"{name} (stand-in)",
+            "annotations": {"title": name, "readOnlyHint": name in READ_ONLY_TOOLS},
+            "inputSchema": {"type": "object", "properties": properties, "required": list(required)}}
+
+SEED_FILES = {
+    "README.md": "# Stand-in repository\n\nServed by the offline MCP stand-in.\n",
+    "src/main.py": "def main():\n    print(\"hello\")\n\n\nif __name__ == \"__main__\":\n    main()\n",
+}
+
+
+_state_dir: Optional[str] = None
+
+
+def stand_in_command() -> List[str]:
+    """
+    Command that starts this server, configured by MCP_STAND_IN_FIXTURES / _LATENCY_MS / _STRICT.
+
+    All workers started by one client process share their GitHub state through a JSON state
+    file (MCP_STAND_IN_STATE, default one in a private temp directory made for this process),
+    so a pool of stand-ins behaves like one GitHub and the state survives restarting the pool.
+    """
+    global _state_dir
+    state = os.getenv("MCP_STAND_IN_STATE")
+    if not state:
+        if _state_dir is None:
+            # mkdtemp: only this user can read or plant files in it, unlike a predictable name in /tmp
+            _state_dir = tempfile.mkdtemp(prefix="mcp-stand-in-")
+            atexit.register(shutil.rmtree, _state_dir, True)
+        state = os.path.join(_state_dir, "state.json")
+    command = [sys.executable, os.path.abspath(__file__), "--state", state]
+    fixtures = os.getenv("MCP_STAND_IN_FIXTURES")
+    if fixtures:
+        command += ["--fixtures", fixtures]
+    latency = os.getenv("MCP_STAND_IN_LATENCY_MS")
+    if latency:
+        command += ["--latency-ms", latency]
+    if os.getenv("MCP_STAND_IN_STRICT"):
+        command.append("--strict")
+    return command
+
+
+def blob_sha(content: str) -> str:
+    """Git blob SHA-1 of `content`, the same value GitHub reports for a file."""
+    data = content.encode()
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def canonical(arguments: dict) -> str:
+    return json.dumps(arguments, sort_keys=True, separators=(",", ":"))
+
+
+def load_fixtures(path: str) -> Tuple[Optional[list], Dict[Tuple[str, str], list]]:
+    """Read a recorded fixture file into (tools/list schemas or None, {(tool, canonical args): [results]})."""
+    tools = None
+    calls: Dict[Tuple[str, str], list] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if "tools" in entry:
+                tools = entry["tools"]
+            else:
+                calls.setdefault((entry["tool"], canonical(entry["arguments"])), []).append(entry["result"])
+    return tools, calls
+
+
+def _text(value) -> dict:
+    return {"content": [{"type": "text", "text": value if isinstance(value, str) else json.dumps(value)}]}
+
+
+def _error(message: str) -> dict:
+    return {"content": [{"type": "text", "text": message}], "isError": True}
+
+
+class FakeGitHub:
+    """Just enough GitHub state for the tool layer: every repository starts with SEED_FILES on main."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.branches: Dict[Tuple[str, str], Dict[str, Dict[str, str]]] = {}
+        self.commits: Dict[Tuple[str, str, str], List[dict]] = {}
+        self.issues: Dict[Tuple[str, str], Dict[int, dict]] = {}
+        self.comments: Dict[Tuple[str, str, int], List[dict]] = {}
+        self.pulls: Dict[Tuple[str, str], Dict[int, dict]] = {}
+        self.snapshots: Dict[Tuple[str, str, str], Dict[str, str]] = {}   # files as of each commit
+        self.runs: List[dict] = []
+        self.next_number = 1
+        self.next_id = 1000
+        self.replayed: Dict[Tuple[str, str], int] = {}   # recorded call -> answers already replayed
+        self._seen = b""
+
+    # ---------- helpers ----------
+
+    def _id(self) -> int:
+        self.next_id += 1
+        return self.next_id
+
+    def _repo(self, owner: str, repo: str) -> Dict[str, Dict[str, str]]:
+        key = (owner, repo)
+        if key not in self.branches:
+            self.branches[key] = {DEFAULT_BRANCH: dict(SEED_FILES)}
+            self._commit(owner, repo, DEFAULT_BRANCH, "Initial commit")
+        return self.branches[key]
+
+    def _files(self, owner: str, repo: str, ref: Optional[str]) -> Dict[str, str]:
+        branches = self._repo(owner, repo)
+        name = (ref or DEFAULT_BRANCH).replace("refs/heads/", "").replace("heads/", "")
+        if name in branches:
+            return branches[name]
+        for (o, r, sha), files in self.snapshots.items():
+            if (o, r) == (owner, repo) and len(name) >= 7 and sha.startswith(name):
+                return files
+        raise LookupError(f"No commit found for the ref {ref}")
+
+    def _commit(self, owner: str, repo: str, branch: str, message: str) -> dict:
+        history = self.commits.setdefault((owner, repo, branch), [])
+        files = self.branches[(owner, repo)][branch]
+        tree = hashlib.sha1(canonical({p: blob_sha(c) for p, c in files.items()}).encode()).hexdigest()
+        parent = history[-1]["sha"] if history else ""
+        sha = hashlib.sha1(f"{parent}{tree}{message}{len(history)}".encode()).hexdigest()
+        commit = {
+            "sha": sha,
+            "html_url": f"https://github.com/{owner}/{repo}/commit/{sha}",
+            "commit": {
+                "message": message,
+                "author": {"name": LOGIN, "email": f"{LOGIN}@example.com", "date": _now()},
+                "tree": {"sha": tree},
+            },
+            "author": {"login": LOGIN},
+            "parents": [{"sha": parent}] if parent else [],
+        }
+        history.append(commit)
+        self.snapshots[(owner, repo, sha)] = dict(files)
+        return commit
+
+    def _user(self) -> dict:
+        return {"login": LOGIN, "id": 1, "type": "User", "html_url": f"https://github.com/{LOGIN}"}
+
+    def _issue(self, owner: str, repo: str, number: int) -> dict:
+        issue = self.issues.get((owner, repo), {}).get(number)
+        if issue is None:
+            raise LookupError(f"failed to get issue: 404 Not Found (#{number})")
+        return issue
+
+    def _pull(self, owner: str, repo: str, number: int) -> dict:
+        pull = self.pulls.get((owner, repo), {}).get(number)
+        if pull is None:
+            raise LookupError(f"failed to get pull request: 404 Not Found (#{number})")
+        return pull
+
+    def _diff_files(self, pull: dict) -> List[dict]:
+        owner, repo = pull["base"]["repo"]["owner"]["login"], pull["base"]["repo"]["name"]
+        base = self._files(owner, repo, pull["base"]["ref"])
+        head = self._files(owner, repo, pull["head"]["ref"])
+        files = []
+        for path in sorted(set(base) | set(head)):
+            if base.get(path) == head.get(path):
+                continue
+            status = "added" if path not in base else "removed" if path not in head else "modified"
+            old, new = (base.get(path) or "").splitlines(), (head.get(path) or "").splitlines()
+            patch = "@@ -1,%d +1,%d @@\n" % (len(old), len(new)) + "\n".join(
+                ["-" + line for line in old] + ["+" + line for line in new])
+            files.append({
+                "filename": path, "status": status, "additions": len(new), "deletions": len(old),
+                "changes": len(new) + len(old), "sha": blob_sha(head.get(path, "")), "patch": patch,
+            })
+        return files
+
+    # ---------- tools ----------
+
+    def call(self, name: str, a: dict, state_path: Optional[str] = None) -> dict:
+        handler = getattr(self, f"tool_{name}", None)
+        if handler is None:
+            return _error(f"tool '{name}' is not served by the stand-in")
+        with self.lock, _locked(state_path):
+            before = self._load(state_path)
+            try:
+                return handler(a)
+            except LookupError as e:
+                return _error(str(e.args[0]) if e.args else str(e))
+            except (KeyError, TypeError, ValueError) as e:
+                return _error(f"invalid arguments for {name}: {e}")
+            finally:
+                self._save(state_path, before)
+
+    def replay(self, key: Tuple[str, str], recorded: list, state_path: Optional[str] = None) -> dict:
+        """
+        The next recorded answer for `key`: repeated calls walk through the recording, then keep
+        returning its last answer. The position is kept with the shared state, so the threads and
+        pooled workers of one client take each answer once and in order.
+        """
+        with self.lock, _locked(state_path):
+            before = self._load(state_path)
+            n = self.replayed.get(key, 0)
+            if n < len(recorded) - 1:
+                self.replayed[key] = n + 1
+            self._save(state_path, before)
+        return recorded[min(n, len(recorded) - 1)]
+
+    _STATE = ("branches", "commits", "snapshots", "issues", "comments", "pulls", "runs", "next_number", "next_id",
+              "replayed")
+
+    def _load(self, path: Optional[str]) -> bytes:
+        """Adopt the shared state written by sibling workers; returns it for change detection."""
+        if not path or not os.path.exists(path):
+            return b""
+        with open(path, "rb") as f:
+            data = f.read()
+        if data and data != self._seen:
+            self.__dict__.update(_decode(json.loads(data)))
+        self._seen = data
+        return data
+
+    def _save(self, path: Optional[str], before: bytes):
+        if not path:
+            return
+        data = json.dumps(_encode({k: getattr(self, k) for k in self._STATE}), sort_keys=True).encode()
+        if data != before:
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+            self._seen = data
+
+    # repository_management
+
+    def tool_get_file_contents(self, a):
+        files = self._files(a["owner"], a["repo"], a.get("sha") or a.get("ref"))
+        path = a.get("path", "/").lstrip("/")
+        if path in files:
+            ref = a.get("sha") or a.get("ref")
+            uri = "/".join(["repo:/", a["owner"], a["repo"]] + (["sha", a["sha"]] if a.get("sha") else [ref] if ref else []) + ["contents", path])
+            return {"content": [
+                {"type": "text", "text": "successfully downloaded text file"},
+                {"type": "resource", "resource": {"uri": uri, "mimeType": "text/plain; charset=utf-8", "text": files[path]}},
+            ]}
+        prefix = path.rstrip("/") + "/" if path.strip("/") else ""
+        entries = {}
+        for file_path in files:
+            if file_path.startswith(prefix):
+                rest = file_path[len(prefix):]
+                name = rest.split("/", 1)[0]
+                is_dir = "/" in rest
+                entries[name] = {
+                    "type": "dir" if is_dir else "file", "name": name, "path": prefix + name,
+                    "sha": "" if is_dir else blob_sha(files[file_path]),
+                    "size": 0 if is_dir else len(files[file_path].encode()),
+                }
+        if not entries:
+            return _error(f"failed to get file contents: 404 Not Found ({path})")
+        return _text(sorted(entries.values(), key=lambda e: e["path"]))
+
+    def tool_create_or_update_file(self, a):
+        files = self._files(a["owner"], a["repo"], a["branch"])
+        current = files.get(a["path"])
+        if current is not None and not a.get("sha"):
+            return _error(f"failed to create/update file: 422 Invalid request. \"sha\" wasn't supplied. ({a['path']})")
+        if current is not None and a["sha"] != blob_sha(current):
+            return _error(f"failed to create/update file: 409 {a['path']} does not match {a['sha']}")
+        files[a["path"]] = a["content"]
+        commit = self._commit(a["owner"], a["repo"], a["branch"], a["message"])
+        return _text({
+            "content": {"name": a["path"].rsplit("/", 1)[-1], "path": a["path"], "sha": blob_sha(a["content"]),
+                        "size": len(a["content"].encode())},
+            "commit": {"sha": commit["sha"], "message": a["message"], "html_url": commit["html_url"]},
+        })
+
+    def tool_delete_file(self, a):
+        files = self._files(a["owner"], a["repo"], a["branch"])
+        if a["path"] not in files:
+            return _error(f"failed to delete file: 404 Not Found ({a['path']})")
+        if a.get("sha") != blob_sha(files[a["path"]]):
+            return _error(f"failed to delete file: 409 {a['path']} does not match {a.get('sha') or 'no sha'}")
+        del files[a["path"]]
+        commit = self._commit(a["owner"], a["repo"], a["branch"], a["message"])
+        return _text({"content": None, "commit": {"sha": commit["sha"], "message": a["message"], "html_url": commit["html_url"]}})
+
+    def tool_push_files(self, a):
+        files = self._files(a["owner"], a["repo"], a["branch"])
+        for f in a["files"]:
+            files[f["path"]] = f["content"]
+        commit = self._commit(a["owner"], a["repo"], a["branch"], a["message"])
+        return _text({"ref": f"refs/heads/{a['branch']}", "object": {"sha": commit["sha"], "type": "commit"}})
+
+    def tool_create_branch(self, a):
+        branches = self._repo(a["owner"], a["repo"])
+        source = a.get("from_branch") or DEFAULT_BRANCH
+        if a["branch"] in branches:
+            return _error(f"failed to create branch: 422 Reference already exists ({a['branch']})")
+        branches[a["branch"]] = dict(self._files(a["owner"], a["repo"], source))
+        history = self.commits.get((a["owner"], a["repo"], source), [])
+        self.commits[(a["owner"], a["repo"], a["branch"])] = list(history)
+        return _text({"ref": f"refs/heads/{a['branch']}", "object": {"sha": history[-1]["sha"] if history else "", "type": "commit"}})
+
+    def tool_create_repository(self, a):
+        self._repo(LOGIN, a["name"])
+        return _text({"name": a["name"], "full_name": f"{LOGIN}/{a['name']}", "private": bool(a.get("private")),
+                      "description": a.get("description", ""), "html_url": f"https://github.com/{LOGIN}/{a['name']}",
+                      "default_branch": DEFAULT_BRANCH})
+
+    def tool_list_branches(self, a):
+        branches = self._repo(a["owner"], a["repo"])
+        return _text(_page([{"name": name, "commit": {"sha": self.commits[(a["owner"], a["repo"], name)][-1]["sha"]}, "protected": False}
+                            for name in sorted(branches)], a))
+
+    def tool_list_commits(self, a):
+        self._files(a["owner"], a["repo"], a.get("sha"))
+        branch = a.get("sha") or DEFAULT_BRANCH
+        history = self.commits.get((a["owner"], a["repo"], branch), [])
+        return _text(_page(list(reversed(history)), a))
+
+    def tool_get_commit(self, a):
+        self._repo(a["owner"], a["repo"])
+        for (owner, repo, _), history in self.commits.items():
+            for commit in history:
+                if (owner, repo) == (a["owner"], a["repo"]) and commit["sha"].startswith(a["sha"]):
+                    return _text(dict(commit, stats={"additions": 0, "deletions": 0, "total": 0}, files=[]))
+        return _error(f"failed to get commit: 404 No commit found for SHA: {a['sha']}")
+
+    def tool_search_repositories(self, a):
+        items = [{"name": repo, "full_name": f"{owner}/{repo}", "html_url": f"https://github.com/{owner}/{repo}"}
+                 for owner, repo in sorted(self.branches)]
+        return _text({"total_count": len(items), "incomplete_results": False, "items": items})
+
+    # issues
+
+    def tool_create_issue(self, a):
+        number, self.next_number = self.next_number, self.next_number + 1
+        issue = {
+            "id": self._id(), "number": number, "title": a["title"], "body": a.get("body", ""), "state": "open",
+            "labels": [{"name": label} for label in a.get("labels") or []],
+            "assignees": [{"login": login} for login in a.get("assignees") or []],
+            "user": self._user(), "comments": 0, "created_at": _now(), "updated_at": _now(),
+            "html_url": f"https://github.com/{a['owner']}/{a['repo']}/issues/{number}",
+        }
+        self.issues.setdefault((a["owner"], a["repo"]), {})[number] = issue
+        return _text(issue)
+
+    def tool_get_issue(self, a):
+        return _text(self._issue(a["owner"], a["repo"], int(a["issue_number"])))
+
+    def tool_update_issue(self, a):
+        issue = self._issue(a["owner"], a["repo"], int(a["issue_number"]))
+        for field in ("title", "body", "state"):
+            if a.get(field) is not None:
+                issue[field] = a[field]
+        if a.get("labels") is not None:
+            issue["labels"] = [{"name": label} for label in a["labels"]]
+        if a.get("assignees") is not None:
+            issue["assignees"] = [{"login": login} for login in a["assignees"]]
+        issue["updated_at"] = _now()
+        return _text(issue)
+
+    def tool_list_issues(self, a):
+        state = a.get("state") or "open"
+        issues = [i for i in self.issues.get((a["owner"], a["repo"]), {}).values() if state == "all" or i["state"] == state]
+        return _text(_page(issues, a))
+
+    def tool_search_issues(self, a):
+        query = a.get("query", "").lower()
+        items = [i for issues in self.issues.values() for i in issues.values() if query in (i["title"] + i["body"]).lower()]
+        return _text({"total_count": len(items), "incomplete_results": False, "items": _page(items, a)})
+
+    def tool_add_issue_comment(self, a):
+        number = int(a["issue_number"])
+        issue = self.issues.get((a["owner"], a["repo"]), {}).get(number) or self.pulls.get((a["owner"], a["repo"]), {}).get(number)
+        if issue is None:
+            raise LookupError(f"failed to create comment: 404 Not Found (#{number})")
+        comment_id = self._id()
+        comment = {"id": comment_id, "body": a["body"], "user": self._user(), "created_at": _now(),
+                   "html_url": f"https://github.com/{a['owner']}/{a['repo']}/issues/{number}#issuecomment-{comment_id}"}
+        self.comments.setdefault((a["owner"], a["repo"], number), []).append(comment)
+        issue["comments"] = issue.get("comments", 0) + 1
+        return _text(comment)
+
+    def tool_get_issue_comments(self, a):
+        self._issue(a["owner"], a["repo"], int(a["issue_number"]))
+        return _text(_page(self.comments.get((a["owner"], a["repo"], int(a["issue_number"])), []), a))
+
+    # pull_requests
+
+    def tool_create_pull_request(self, a):
+        owner, repo = a["owner"], a["repo"]
+        self._files(owner, repo, a["head"])
+        self._files(owner, repo, a["base"])
+        number, self.next_number = self.next_number, self.next_number + 1
+        repo_info = {"name": repo, "full_name": f"{owner}/{repo}", "owner": {"login": owner}}
+        pull = {
+            "id": self._id(), "number": number, "title": a["title"], "body": a.get("body", ""), "state": "open",
+            "draft": bool(a.get("draft")), "merged": False, "mergeable": True, "user": self._user(),
+            "head": {"ref": a["head"], "sha": self.commits[(owner, repo, a["head"])][-1]["sha"], "repo": repo_info},
+            "base": {"ref": a["base"], "sha": self.commits[(owner, repo, a["base"])][-1]["sha"], "repo": repo_info},
+            "created_at": _now(), "updated_at": _now(), "comments": 0, "reviews": [],
+            "html_url": f"https://github.com/{owner}/{repo}/pull/{number}",
+        }
+        self.pulls.setdefault((owner, repo), {})[number] = pull
+        return _text(_public_pull(pull))
+
+    def tool_get_pull_request(self, a):
+        return _text(_public_pull(self._pull(a["owner"], a["repo"], int(a["pullNumber"]))))
+
+    def tool_update_pull_request(self, a):
+        pull = self._pull(a["owner"], a["repo"], int(a["pullNumber"]))
+        for field in ("title", "body", "state"):
+            if a.get(field) is not None:
+                pull[field] = a[field]
+        if a.get("base"):
+            pull["base"]["ref"] = a["base"]
+        pull["updated_at"] = _now()
+        return _text(_public_pull(pull))
+
+    def tool_list_pull_requests(self, a):
+        state = a.get("state") or "open"
+        pulls = [_public_pull(p) for p in self.pulls.get((a["owner"], a["repo"]), {}).values() if state == "all" or p["state"] == state]
+        return _text(_page(pulls, a))
+
+    def tool_search_pull_requests(self, a):
+        query = a.get("query", "").lower()
+        items = [_public_pull(p) for pulls in self.pulls.values() for p in pulls.values() if query in (p["title"] + p["body"]).lower()]
+        return _text({"total_count": len(items), "incomplete_results": False, "items": _page(items, a)})
+
+    def tool_merge_pull_request(self, a):
+        pull = self._pull(a["owner"], a["repo"], int(a["pullNumber"]))
+        if pull["merged"]:
+            return _error("failed to merge pull request: 405 Pull Request is not mergeable")
+        owner, repo = a["owner"], a["repo"]
+        self.branches[(owner, repo)][pull["base"]["ref"]].update(self._files(owner, repo, pull["head"]["ref"]))
+        commit = self._commit(owner, repo, pull["base"]["ref"], a.get("commit_title") or f"Merge pull request #{pull['number']}")
+        pull.update(merged=True, state="closed", merge_commit_sha=commit["sha"])
+        return _text({"sha": commit["sha"], "merged": True, "message": "Pull Request successfully merged"})
+
+    def tool_get_pull_request_files(self, a):
+        return _text(_page(self._diff_files(self._pull(a["owner"], a["repo"], int(a["pullNumber"]))), a))
+
+    def tool_get_pull_request_diff(self, a):
+        pull = self._pull(a["owner"], a["repo"], int(a["pullNumber"]))
+        parts = []
+        for f in self._diff_files(pull):
+            name = f["filename"]
+            parts.append(f"diff --git a/{name} b/{name}\n--- a/{name}\n+++ b/{name}\n{f['patch']}\n")
+        return _text("".join(parts))
+
+    def tool_get_pull_request_status(self, a):
+        pull = self._pull(a["owner"], a["repo"], int(a["pullNumber"]))
+        return _text({"state": "success", "sha": pull["head"]["sha"], "total_count": 1, "statuses": [
+            {"state": "success", "context": "stand-in/ci", "description": "All checks passed"}]})
+
+    def tool_get_pull_request_reviews(self, a):
+        return _text(self._pull(a["owner"], a["repo"], int(a["pullNumber"]))["reviews"])
+
+    def _review(self, a, state: str, body: str = "") -> dict:
+        pull = self._pull(a["owner"], a["repo"], int(a["pullNumber"]))
+        review = {"id": self._id(), "user": self._user(), "state": state, "body": body, "comments": [], "submitted_at": _now()}
+        pull["reviews"].append(review)
+        return review
+
+    def _pending_review(self, a) -> dict:
+        pull = self._pull(a["owner"], a["repo"], int(a["pullNumber"]))
+        for review in pull["reviews"]:
+            if review["state"] == "PENDING":
+                return review
+        raise LookupError("No pending review found for the viewer")
+
+    def tool_create_and_submit_pull_request_review(self, a):
+        self._review(a, {"APPROVE": "APPROVED", "REQUEST_CHANGES": "CHANGES_REQUESTED"}.get(a["event"], "COMMENTED"), a["body"])
+        return _text("pull request review submitted successfully")
+
+    def tool_create_pending_pull_request_review(self, a):
+        self._review(a, "PENDING")
+        return _text("pending pull request created")
+
+    def tool_add_pull_request_review_comment_to_pending_review(self, a):
+        self._pending_review(a)["comments"].append({k: a[k] for k in ("path", "body") if k in a})
+        return _text("pull request review comment successfully added to pending review")
+
+    def tool_submit_pending_pull_request_review(self, a):
+        review = self._pending_review(a)
+        review.update(state={"APPROVE": "APPROVED", "REQUEST_CHANGES": "CHANGES_REQUESTED"}.get(a["event"], "COMMENTED"),
+                      body=a.get("body", ""))
+        return _text("pending pull request review successfully submitted")
+
+    def tool_delete_pending_pull_request_review(self, a):
+        pull = self._pull(a["owner"], a["repo"], int(a["pullNumber"]))
+        pull["reviews"].remove(self._pending_review(a))
+        return _text("pending pull request review successfully deleted")
+
+    # user
+
+    def tool_get_me(self, a):
+        return _text(dict(self._user(), name="Stand-in User", public_repos=len(self.branches)))
+
+    def tool_search_users(self, a):
+        return _text({"total_count": 1, "incomplete_results": False, "items": [self._user()]})
+
+    def tool_list_notifications(self, a):
+        return _text([])
+
+    # workflows
+
+    def _run(self, a, run_id: int) -> dict:
+        for run in self.runs:
+            if run["id"] == run_id:
+                return run
+        raise LookupError(f"failed to get workflow run: 404 Not Found ({run_id})")
+
+    def tool_run_workflow(self, a):
+        run = {"id": self._id(), "name": str(a["workflow_id"]), "head_branch": a.get("ref", DEFAULT_BRANCH),
+               "event": "workflow_dispatch", "status": "completed", "conclusion": "success", "run_number": len(self.runs) + 1,
+               "repository": {"full_name": f"{a['owner']}/{a['repo']}"}, "created_at": _now(), "updated_at": _now()}
+        self.runs.append(run)
+        return _text({"message": "Workflow run has been queued", "workflow_type": "workflow_id",
+                      "workflow_id": a["workflow_id"], "ref": run["head_branch"], "inputs": a.get("inputs") or {}})
+
+    def tool_rerun_workflow_run(self, a):
+        run = self._run(a, int(a["run_id"]))
+        run["status"] = "completed"
+        return _text({"message": "Workflow run has been queued for re-run", "run_id": run["id"]})
+
+    def tool_cancel_workflow_run(self, a):
+        run = self._run(a, int(a["run_id"]))
+        run.update(status="completed", conclusion="cancelled")
+        return _text({"message": "Workflow run has been cancelled", "run_id": run["id"]})
+
+    def tool_list_workflow_runs(self, a):
+        runs = [r for r in self.runs if r["repository"]["full_name"] == f"{a['owner']}/{a['repo']}"
+                and (not a.get("workflow_id") or r["name"] == str(a["workflow_id"]))]
+        return _text({"total_count": len(runs), "workflow_runs": _page(list(reversed(runs)), a)})
+
+    def tool_get_workflow_run_usage(self, a):
+        self._run(a, int(a["run_id"]))
+        return _text({"billable": {"UBUNTU": {"total_ms": 60000, "jobs": 1}}, "run_duration_ms": 60000})
+
+    def tool_get_workflow_run_logs(self, a):
+        run = self._run(a, int(a["run_id"]))
+        log = f"{_now()} ##[group]Run stand-in job\n{_now()} ok\n{_now()} ##[endgroup]\n"
+        return _text({"message": "Workflow run logs are available for download", "run_id": run["id"],
+                      "logs_url": f"data:text/plain;base64,{base64.b64encode(log.encode()).decode()}"})
+
+
+def _encode(value):
+    """`value` as plain JSON: dicts with tuple or int keys become {"__items__": [[key, value], ...]}."""
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            return {k: _encode(v) for k, v in value.items()}
+        return {"__items__": [[list(k) if isinstance(k, tuple) else k, _encode(v)] for k, v in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value):
+    """The inverse of _encode."""
+    if isinstance(value, dict):
+        if list(value) == ["__items__"]:
+            return {tuple(k) if isinstance(k, list) else k: _decode(v) for k, v in value["__items__"]}
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+@contextlib.contextmanager
+def _locked(state_path: Optional[str]):
+    """Exclusive lock shared with the other stand-in workers using `state_path`."""
+    if not state_path or fcntl is None:
+        yield
+        return
+    with open(state_path + ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _public_pull(pull: dict) -> dict:
+    return {k: v for k, v in pull.items() if k != "reviews"}
+
+
+def _page(items: list, a: dict) -> list:
+    per_page = int(a.get("perPage") or 30)
+    page = int(a.get("page") or 1)
+    return items[(page - 1) * per_page: page * per_page]
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+class StandInServer:
+    def __init__(self, fixtures: Optional[str] = None, latency_ms: float = 0.0, strict: bool = False,
+                 state: Optional[str] = None):
+        self.github = FakeGitHub()
+        self.state = state
+        self.latency = latency_ms / 1000.0
+        self.strict = strict
+        self.tools = [tool_schema(name) for name in TOOL_ARGS]
+        self.replay: Dict[Tuple[str, str], list] = {}
+        if fixtures:
+            recorded_tools, self.replay = load_fixtures(fixtures)
+            if recorded_tools:
+                self.tools = recorded_tools
+        self._out_lock = threading.Lock()
+        self._cancelled = set()
+
+    def send(self, message: dict):
+        line = json.dumps(message) + "\n"
+        with self._out_lock:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+
+    def tools_call(self, params: dict) -> dict:
+        name, arguments = params.get("name"), params.get("arguments") or {}
+        key = (name, canonical(arguments))
+        recorded = self.replay.get(key)
+        if recorded:
+            return self.github.replay(key, recorded, self.state)
+        if self.strict:
+            return _error(f"no recorded result for {name} {canonical(arguments)}")
+        return self.github.call(name, arguments, self.state)
+
+    def handle(self, request: dict):
+        method = request.get("method")
+        if method == "initialize":
+            result = {"protocolVersion": PROTOCOL_VERSION, "capabilities": {"tools": {}},
+                      "serverInfo": {"name": "github-mcp-server-stand-in", "version": "0.0.0"}}
+        elif method == "tools/list":
+            result = {"tools": self.tools}
+        elif method == "ping":
+            result = {}
+        elif method == "tools/call":
+            if self.latency:
+                time.sleep(self.latency)
+            result = self.tools_call(request.get("params") or {})
+        else:
+            self.send({"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32601, "message": f"Method not found: {method}"}})
+            return
+        if request["id"] in self._cancelled:
+            self._cancelled.discard(request["id"])
+            return
+        self.send({"jsonrpc": "2.0", "id": request["id"], "result": result})
+
+    def serve(self, stream=None):
+        sys.stderr.write("GitHub MCP Server (stand-in) running on stdio\n")
+        sys.stderr.flush()
+        for line in stream or sys.stdin:
+            if not line.strip():
+                continue
+            message = json.loads(line)
+            if message.get("method") == "notifications/cancelled":
+                self._cancelled.add((message.get("params") or {}).get("requestId"))
+                continue
+            if "id" not in message or "method" not in message:
+                continue
+            # like the real server, requests are handled concurrently and answered out of order
+            threading.Thread(target=self.handle, args=(message,), daemon=True).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stand-in for github-mcp-server (stdio JSON-RPC).")
+    parser.add_argument("--fixtures", help="JSONL file recorded with MCP_RECORD_FILE; matching calls are replayed")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fixed delay added to every tools/call")
+    parser.add_argument("--state", help="state file shared with other stand-in workers (default: private state)")
+    parser.add_argument("--strict", action="store_true", help="fail calls that are not in the fixtures instead of simulating them")
+    args = parser.parse_args()
+    StandInServer(args.fixtures, args.latency_ms, args.strict, args.state).serve()
+
+
+if __name__ == "__main__":
+    main()
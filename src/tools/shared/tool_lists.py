@@ -32,10 +32,12 @@ def return_all_implemented_tools():
         get_file_tool,
         write_file_tool,
         delete_file_tool,
+        flush_staged_changes_tool,
         push_files_tool,
         list_commits_tool,
         get_commit_tool,
         list_branches_tool,
+        list_tree_tool,
         search_repositories_tool,
     )
     from tools.user import (
@@ -51,6 +53,7 @@ def return_all_implemented_tools():
         list_workflow_runs_tool,
         get_workflow_run_usage_tool,
     )
+    from tools.outputs import get_tool_output_tool
 
     return [
         list_notifications_tool,
@@ -67,11 +70,13 @@ def return_all_implemented_tools():
         get_file_tool,
         write_file_tool,
         delete_file_tool,
+        flush_staged_changes_tool,
         push_files_tool,
         search_repositories_tool,
         list_commits_tool,
         get_commit_tool,
         list_branches_tool,
+        list_tree_tool,
         search_issues_tool,
         get_issue_comments_tool,
         search_pull_requests_tool,
@@ -95,4 +100,5 @@ def return_all_implemented_tools():
         list_workflow_runs_tool,
         rerun_workflow_run_tool,
         run_workflow_tool,
+        get_tool_output_tool,
     ]
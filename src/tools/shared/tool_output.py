@@ -0,0 +1,240 @@
+import json
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage, ToolMessage
+
+DEFAULT_MAX_CHARS = 6000
+MAX_STORED_OUTPUTS = 256
+MAX_STORED_CHARS = 64 * 1024 * 1024
+MIN_DROPPED_CHARS = 200    # normalizing away less than this is not worth a handle
+
+_outputs: "OrderedDict[str, str]" = OrderedDict()
+_stored_chars = 0
+_lock = threading.Lock()
+
+
+def max_chars() -> int:
+    """TOOL_OUTPUT_MAX_CHARS (default 6000): longer outputs are cut; 0 keeps them whole."""
+    return int(os.getenv("TOOL_OUTPUT_MAX_CHARS", DEFAULT_MAX_CHARS))
+
+
+def store(text: str) -> str:
+    """Keep a full tool output for get_tool_output; returns its handle. The oldest are dropped first."""
+    global _stored_chars
+    handle = f"out-{uuid.uuid4().hex[:8]}"
+    with _lock:
+        _outputs[handle] = text
+        _stored_chars += len(text)
+        while len(_outputs) > 1 and (len(_outputs) > MAX_STORED_OUTPUTS or _stored_chars > MAX_STORED_CHARS):
+            _, dropped = _outputs.popitem(last=False)
+            _stored_chars -= len(dropped)
+    return handle
+
+
+def fetch(handle: str) -> Optional[str]:
+    with _lock:
+        return _outputs.get(handle.strip())
+
+
+def unwrap(content: str) -> str:
+    """The text of an MCP result envelope ({"content": [{"type": "text", "text": ...}]}); anything else as is."""
+    if not content.lstrip().startswith("{"):
+        return content
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return content
+    if isinstance(data, dict) and isinstance(data.get("result"), dict):
+        data = data["result"]  # a whole JSON-RPC response
+    if isinstance(data, dict) and isinstance(data.get("content"), list):
+        texts = [c.get("text", "") for c in data["content"] if isinstance(c, dict) and c.get("type") == "text"]
+        if texts:
+            return "\n".join(texts)
+    return content
+
+
+def _diff(text: str) -> str:
+    """Unified diff without the git header noise, after a list of the changed files with +/- counts."""
+    files: List[list] = []
+    out: List[str] = []
+    in_header = False
+    for line in text.splitlines():
+        if line.startswith("diff --git "):
+            files.append([line.split(" b/", 1)[-1], 0, 0, ""])
+            out.append(f"=== {files[-1][0]}")
+            in_header = True
+            continue
+        if in_header:
+            if line.startswith("@@"):
+                in_header = False
+            else:
+                if line.startswith(("new file mode", "deleted file mode", "rename from")):
+                    files[-1][3] = " " + line.split(" ", 1)[0]
+                    out[-1] += f" ({files[-1][3].strip()})"
+                continue  # index / mode / ---/+++ lines
+        if files and line.startswith("+"):
+            files[-1][1] += 1
+        elif files and line.startswith("-"):
+            files[-1][2] += 1
+        out.append(line)
+    if not files:
+        return text
+    summary = [f"{len(files)} files changed:"] + [f"  {p} (+{a} -{d}){kind}" for p, a, d, kind in files]
+    return "\n".join(summary + [""] + out)
+
+
+def _files(text: str) -> str:
+    """One line per changed file; patches are left out (see get_pull_request_diff)."""
+    data = json.loads(text)
+    if not isinstance(data, list):
+        return text
+    lines = [f"{len(data)} files (patches omitted):"]
+    for f in data:
+        renamed = f" (from {f['previous_filename']})" if f.get("previous_filename") else ""
+        lines.append(f"{f.get('status', '?'):<8} {f.get('filename')}{renamed} (+{f.get('additions', 0)} -{f.get('deletions', 0)})")
+    return "\n".join(lines)
+
+
+def _status(text: str) -> str:
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        return text
+    lines = [f"Combined status: {data.get('state')} at {str(data.get('sha', ''))[:7]} ({data.get('total_count', 0)} checks)"]
+    for s in data.get("statuses") or []:
+        description = f" - {s['description']}" if s.get("description") else ""
+        lines.append(f"- {s.get('state')}: {s.get('context')}{description}")
+    return "\n".join(lines)
+
+
+_TIMESTAMP = re.compile(r"^\d{4}-\d\d-\d\dT[\d:.]+Z ?")
+_ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+
+def _clean_log(log: str) -> str:
+    """Log text without timestamps, colour codes, group markers and repeated lines."""
+    lines: List[str] = []
+    for line in log.splitlines():
+        line = _ANSI.sub("", _TIMESTAMP.sub("", line)).rstrip()
+        if line.startswith("##[endgroup]"):
+            continue
+        line = line.replace("##[group]", "> ", 1)
+        if lines and lines[-1] == line:
+            continue
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _logs(text: str) -> str:
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return _clean_log(text)
+    if not isinstance(data, dict):
+        return text
+    lines: List[str] = []
+    for job in data.get("jobs") or data.get("logs") or []:
+        if isinstance(job, dict):
+            lines.append(f"=== {job.get('job_name') or job.get('name') or job.get('job_id')}")
+            lines.append(_clean_log(str(job.get("logs_content") or job.get("content") or job.get("error") or "")))
+    for key, value in data.items():
+        if key in ("jobs", "logs"):
+            continue
+        if isinstance(value, str) and "\n" in value:
+            lines.append(_clean_log(value))
+        elif isinstance(value, str) and value.startswith("data:") and len(value) > 200:
+            lines.append(f"{key}: (inline data, {len(value)} chars)")
+        elif not isinstance(value, (dict, list)):
+            lines.append(f"{key}: {value}")
+    return "\n".join(lines)
+
+
+def _runs(text: str) -> str:
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text  # already formatted by list_workflow_runs
+    runs = data.get("workflow_runs") if isinstance(data, dict) else None
+    if not isinstance(runs, list):
+        return text
+    return "\n".join(
+        f"{r.get('id')}: {r.get('name')} #{r.get('run_number')} {r.get('status')}"
+        f"{'/' + r['conclusion'] if r.get('conclusion') else ''} on {r.get('head_branch')} ({r.get('event')})"
+        for r in runs)
+
+
+# tool name -> normalizer of its (unwrapped) text output; a normalizer that raises leaves the output as is
+NORMALIZERS: Dict[str, Callable[[str], str]] = {
+    "get_pull_request_diff": _diff,
+    "get_pull_request_files": _files,
+    "get_pull_request_status": _status,
+    "get_workflow_run_logs": _logs,
+    "list_workflow_runs": _runs,
+}
+
+# tools that return the MCP result envelope itself; only their output is unwrapped
+ENVELOPE_TOOLS = {
+    "get_pull_request", "get_pull_request_diff", "get_pull_request_files", "get_pull_request_reviews",
+    "get_pull_request_status", "search_pull_requests",
+    "get_workflow_run_logs", "get_workflow_run_usage", "run_workflow", "rerun_workflow_run", "cancel_workflow_run",
+}
+
+# file reads are never cut: an agent that edits a file it has only seen part of writes the cut body back
+UNCAPPED = {"get_file_contents", "get_file", "get_tool_output"}
+
+# outputs whose end matters most (a failing step is at the bottom of a log)
+KEEP_TAIL = {"get_workflow_run_logs"}
+
+
+def _cut(text: str, limit: int, tail: bool) -> str:
+    if tail:
+        part = text[-limit:]
+        return part[part.find("\n") + 1:] if "\n" in part else part
+    part = text[:limit]
+    return part[:part.rfind("\n")] if "\n" in part else part
+
+
+def compact(tool_name: Optional[str], content):
+    """
+    A tool output as it should enter the conversation: unwrapped from the MCP envelope
+    (ENVELOPE_TOOLS), normalized to a compact form (NORMALIZERS), and cut to
+    TOOL_OUTPUT_MAX_CHARS unless it is a file read (UNCAPPED). If anything was left out,
+    the full output is stored and the result names the handle to read it with get_tool_output.
+    """
+    if not isinstance(content, str) or tool_name == "get_tool_output":
+        return content
+    raw = unwrap(content) if tool_name in ENVELOPE_TOOLS else content
+    text = raw
+    normalizer = NORMALIZERS.get(tool_name or "")
+    if normalizer is not None:
+        try:
+            text = normalizer(raw)
+        except (ValueError, TypeError, KeyError, AttributeError):
+            text = raw
+    limit = max_chars()
+    cut = limit > 0 and len(text) > limit and tool_name not in UNCAPPED
+    if cut:
+        text = _cut(text, limit, tool_name in KEEP_TAIL)
+    if not cut and len(raw) - len(text) < MIN_DROPPED_CHARS:
+        return text
+    handle = store(raw)
+    shown = "the end" if cut and tool_name in KEEP_TAIL else "the start" if cut else "a compact form"
+    note = f"[showing {shown} of {len(raw)} chars; full output: get_tool_output(handle=\"{handle}\")]"
+    return f"{note}\n{text}" if cut and tool_name in KEEP_TAIL else f"{text}\n{note}"
+
+
+def compact_messages(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """compact() applied to the ToolMessages of a ToolNode result."""
+    compacted = []
+    for m in messages:
+        if isinstance(m, ToolMessage):
+            content = compact(m.name, m.content)
+            if content is not m.content:
+                m = m.model_copy(update={"content": content})
+        compacted.append(m)
+    return compacted
+
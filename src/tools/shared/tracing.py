@@ -0,0 +1,95 @@
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+
+_agent_role: ContextVar[Optional[str]] = ContextVar("mcp_agent_role", default=None)
+
+_exporters: List[Callable[[dict], None]] = []
+_file_lock = threading.Lock()
+
+
+@contextmanager
+def agent_role(role: Optional[str]):
+    """Tag every MCP span started inside this block (and in tasks/threads spawned from it) with `role`."""
+    token = _agent_role.set(role)
+    try:
+        yield
+    finally:
+        _agent_role.reset(token)
+
+
+def add_span_exporter(exporter: Callable[[dict], None]):
+    """Register a callback that receives every finished span record (e.g. to forward to an OTel SDK)."""
+    _exporters.append(exporter)
+
+
+class Span:
+    """
+    Latency breakdown of one MCP tool call.
+
+    Phases are durations in seconds keyed by name: spawn, banner, handshake (only when the
+    call had to start a worker), write, ttfb (request written -> first response byte),
+    read (first -> last response byte) and decode.
+    """
+
+    def __init__(self, tool_name: str):
+        self.tool_name = tool_name
+        self.role = _agent_role.get()
+        self.trace_id = secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self.phases: dict = {}
+        self.attributes: dict = {}
+        self.error: Optional[str] = None
+
+    def phase(self, name: str, seconds: float):
+        self.phases[name] = seconds
+
+    def finish(self, error: Optional[BaseException] = None):
+        duration = time.perf_counter() - self._start
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        _export(self.to_record(duration))
+
+    def to_record(self, duration: float) -> dict:
+        """OpenTelemetry-style span record (OTLP/JSON field names)."""
+        attributes = {
+            "mcp.tool": self.tool_name,
+            "agent.role": self.role or "unknown",
+            "mcp.duration_ms": round(duration * 1000, 3),
+        }
+        for name, seconds in self.phases.items():
+            attributes[f"mcp.phase.{name}_ms"] = round(seconds * 1000, 3)
+        attributes.update(self.attributes)
+        return {
+            "name": f"mcp.tools/call {self.tool_name}",
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "kind": "SPAN_KIND_CLIENT",
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.start_ns + int(duration * 1e9),
+            "attributes": attributes,
+            "status": {"code": "STATUS_CODE_ERROR", "message": self.error} if self.error else {"code": "STATUS_CODE_OK"},
+        }
+
+
+def _export(record: dict):
+    path = os.getenv("MCP_TRACE_FILE")
+    if path:
+        line = json.dumps(record)
+        with _file_lock:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    for exporter in _exporters:
+        try:
+            exporter(record)
+        except Exception as e:
+            print(f"[MCP] span exporter failed: {e}")
@@ -1,8 +1,7 @@
-from tools.shared.call_mcp import call_mcp
-from langchain_core.tools import tool
+from tools.shared.mcp_tool import mcp_tool, McpCall
 from typing import Optional
 
-@tool("get_me")
+@mcp_tool("get_me")
 def get_me_tool(reason: Optional[str] = None) -> str:
     """
     Get details of the authenticated GitHub user. Use this when a request includes "me", "my".
@@ -20,7 +19,7 @@ def get_me_tool(reason: Optional[str] = None) -> str:
         Exception: If there is an error during the request.
     """
     try:
-        result = call_mcp("get_me", {"reason": reason} if reason else {})
+        result = yield McpCall("get_me", {"reason": reason} if reason else {})
         if "error" in result:
             return f"Failed to get user: {result['error']}"
         return f"GitHub user info:\n{result['result']}"
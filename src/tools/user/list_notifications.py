@@ -1,9 +1,8 @@
-from ..shared.call_mcp import call_mcp
-from langchain_core.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 import json
 from typing import Optional
 
-@tool("list_notifications")
+@mcp_tool("list_notifications")
 def list_notifications_tool(
     owner: Optional[str] = None,
     repo: Optional[str] = None,
@@ -42,7 +41,7 @@ def list_notifications_tool(
 
         payload = {key: value for key, value in payload.items() if value is not None}
 
-        result = call_mcp("list_notifications", payload)
+        result = yield McpCall("list_notifications", payload)
 
         if "error" in result:
             return f"Error: {result['error']['message']}"
@@ -1,9 +1,8 @@
-from ..shared.call_mcp import call_mcp
-from langchain_core.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 import json
 from typing import Optional
 
-@tool("search_users")
+@mcp_tool("search_users")
 def search_users_tool(query: str, page: Optional[int] = 1, perPage: Optional[int] = 10, order: Optional[str] = None, sort: Optional[str] = None) -> str:
     """
     Search for GitHub users using MCP.
@@ -28,7 +27,7 @@ def search_users_tool(query: str, page: Optional[int] = 1, perPage: Optional[int
 
         payload = {key: value for key, value in payload.items() if value is not None}
         
-        result = call_mcp("search_users", payload)
+        result = yield McpCall("search_users", payload)
 
         if "error" in result:
             return f"Error: {result['error']['message']}"
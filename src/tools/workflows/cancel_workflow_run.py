@@ -1,7 +1,6 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 
-@tool("cancel_workflow_run")
+@mcp_tool("cancel_workflow_run")
 def cancel_workflow_run_tool(owner: str, repo: str, run_id: int) -> str:
     """
     Cancel an in-progress GitHub Actions workflow run using MCP.
@@ -24,7 +23,7 @@ def cancel_workflow_run_tool(owner: str, repo: str, run_id: int) -> str:
             "run_id": run_id
         }
 
-        result = call_mcp("cancel_workflow_run", payload)
+        result = yield McpCall("cancel_workflow_run", payload)
 
         if "error" in result:
             return f"Workflow cancellation failed: {result['error']}"
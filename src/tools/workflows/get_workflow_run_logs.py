@@ -1,8 +1,7 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 from typing import Optional
 
-@tool("get_workflow_run_logs")
+@mcp_tool("get_workflow_run_logs")
 def get_workflow_run_logs_tool(
     owner: str,
     repo: str,
@@ -32,7 +31,7 @@ def get_workflow_run_logs_tool(
             "tail_lines": tail_lines
         }
 
-        result = call_mcp("get_workflow_run:logs", payload)
+        result = yield McpCall("get_workflow_run_logs", payload)
 
         if "error" in result:
             return f"Fetching workflow logs failed: {result['error']}"
@@ -1,7 +1,6 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 
-@tool("get_workflow_run_usage")
+@mcp_tool("get_workflow_run_usage")
 def get_workflow_run_usage_tool(owner: str, repo: str, run_id: int) -> str:
     """
     Retrieve GitHub Actions usage metrics for a specific workflow run using MCP.
@@ -24,7 +23,7 @@ def get_workflow_run_usage_tool(owner: str, repo: str, run_id: int) -> str:
             "run_id": run_id
         }
 
-        result = call_mcp("get_workflow_run_usage", payload)
+        result = yield McpCall("get_workflow_run_usage", payload)
 
         if "error" in result:
             return f"Fetching workflow usage failed: {result['error']}"
@@ -1,8 +1,8 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, BlockingCall
+from ..shared.pagination import collect, json_items, more_note
 from typing import Optional
 
-@tool("list_workflow_runs")
+@mcp_tool("list_workflow_runs")
 def list_workflow_runs_tool(
     owner: str,
     repo: str,
@@ -11,8 +11,7 @@ def list_workflow_runs_tool(
     event: Optional[str] = None,
     status: Optional[str] = None,
     actor: Optional[str] = None,
-    page: Optional[int] = None,
-    per_page: Optional[int] = None
+    limit: Optional[int] = 20
 ) -> str:
     """
     List GitHub Actions workflow runs for a specific workflow using MCP.
@@ -25,8 +24,7 @@ def list_workflow_runs_tool(
         event (Optional[str]): GitHub event type that triggered the run (e.g., 'push', 'pull_request').
         status (Optional[str]): Status of the run ('queued', 'in_progress', 'completed', etc.).
         actor (Optional[str]): GitHub username who triggered the workflow.
-        page (Optional[int]): Page number for pagination.
-        per_page (Optional[int]): Number of results per page.
+        limit (Optional[int]): Maximum number of runs to return, newest first; 0 = all (default 20).
 
     Returns:
         str: List of workflow runs or an error message.
@@ -45,14 +43,24 @@ def list_workflow_runs_tool(
         if event: payload["event"] = event
         if status: payload["status"] = status
         if actor: payload["actor"] = actor
-        if page: payload["page"] = page
-        if per_page: payload["per_page"] = per_page
 
-        result = call_mcp("list_workflow_runs", payload)
+        limit = max(0, 20 if limit is None else limit)
+        runs = yield BlockingCall(collect, "list_workflow_runs", payload, limit=limit or None,
+                                  items=lambda result: json_items(result, "workflow_runs"))
 
-        if "error" in result:
-            return f"Listing workflow runs failed: {result['error']}"
-        return result.get("result", "No workflow runs found.")
+        if not runs:
+            return "No workflow runs found."
+
+        lines = [
+            f"{run.get('id')}: {run.get('name')} #{run.get('run_number')} {run.get('status')}"
+            f"{'/' + run['conclusion'] if run.get('conclusion') else ''} on {run.get('head_branch')} "
+            f"({run.get('event')}) — {run.get('html_url', '')}"
+            for run in runs
+        ]
+        note = more_note(runs, limit)
+        if note:
+            lines.append(note)
+        return "\n".join(lines)
 
     except Exception as e:
         return f"Exception during list_workflow_runs: {str(e)}"
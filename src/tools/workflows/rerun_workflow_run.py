@@ -1,7 +1,6 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 
-@tool("rerun_workflow_run")
+@mcp_tool("rerun_workflow_run")
 def rerun_workflow_run_tool(owner: str, repo: str, run_id: int) -> str:
     """
     Re-run an entire GitHub Actions workflow run using MCP.
@@ -24,7 +23,7 @@ def rerun_workflow_run_tool(owner: str, repo: str, run_id: int) -> str:
             "run_id": run_id
         }
 
-        result = call_mcp("rerun_workflow_run", payload)
+        result = yield McpCall("rerun_workflow_run", payload)
 
         if "error" in result:
             return f"Workflow re-run failed: {result['error']}"
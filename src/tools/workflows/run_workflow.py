@@ -1,8 +1,7 @@
-from ..shared.call_mcp import call_mcp
-from langchain.tools import tool
+from ..shared.mcp_tool import mcp_tool, McpCall
 from typing import Optional
 
-@tool("run_workflow")
+@mcp_tool("run_workflow")
 def run_workflow_tool(
     owner: str,
     repo: str,
@@ -37,7 +36,7 @@ def run_workflow_tool(
         if inputs is not None:
             payload["inputs"] = inputs
 
-        result = call_mcp("run_workflow", payload)
+        result = yield McpCall("run_workflow", payload)
 
         if "error" in result:
             return f"Workflow run failed: {result['error']}"
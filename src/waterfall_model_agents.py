@@ -3,11 +3,15 @@ from dotenv import load_dotenv
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from langchain_core.tools import tool
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph.message import add_messages
 from langgraph.graph import StateGraph
 from langgraph.prebuilt import ToolNode
 from tools import *
+from tools.shared import staging, tool_output
+from context_window import build_context
 from datetime import datetime
+import operator
 import os
 
 load_dotenv()
@@ -36,74 +40,46 @@ def append_log(log: str):
 
 class MultiAgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], add_messages]
+    # indices into `messages` where a prompt may start without orphaning tool results
+    # (every message except a ToolMessage), appended by the node that adds the message
+    window_starts: Annotated[list[int], operator.add]
     next_step: Optional[str]  # used for routing between agents
     agent: Optional[str]  # current agent name - for logging/debugging
 
-def _recent(state: MultiAgentState, k: int = 40) -> list[BaseMessage]:
-    msgs = list(state.get("messages", []))
-    if not msgs:
-        return []
-    cut = msgs[-k:]
-
-    def fix_leading_tool(cut_list):
-        if not cut_list or not isinstance(cut_list[0], ToolMessage):
-            return cut_list
-        start_idx = len(msgs) - len(cut_list)
-        i = start_idx - 1
-        while i >= 0:
-            m = msgs[i]
-            if isinstance(m, AIMessage) and getattr(m, "tool_calls", None):
-                return msgs[i:]
-            i -= 1
-        tmp = cut_list[:]
-        while tmp and isinstance(tmp[0], ToolMessage):
-            tmp = tmp[1:]
-        return tmp
-
-    cut = fix_leading_tool(cut)
-
-    if cut and isinstance(cut[-1], AIMessage) and getattr(cut[-1], "tool_calls", None):
-        end_idx = len(msgs)
-        slice_start = end_idx - len(cut)
-        after_last = slice_start + len(cut)
-        if after_last >= len(msgs) or not isinstance(msgs[after_last], ToolMessage):
-            cut = cut[:-1]
-
-    return cut
-
-
-def _sanitize_for_openai(system_msg: SystemMessage, recent: list[BaseMessage], full_history: list[BaseMessage]) -> list[BaseMessage]:
-    prompt = [system_msg]
-
-    while recent and isinstance(recent[0], ToolMessage):
-        idx = full_history.index(recent[0])
-        j = idx - 1
-        found = False
-        while j >= 0:
-            m = full_history[j]
-            if isinstance(m, AIMessage) and getattr(m, "tool_calls", None):
-                recent = full_history[j: full_history.index(recent[0]) + len(recent)]
-                found = True
-                break
-            j -= 1
-        if not found:
-            recent = recent[1:]
-
-    cleaned = []
-    for m in recent:
-        if isinstance(m, ToolMessage):
-            if cleaned and isinstance(cleaned[-1], AIMessage) and getattr(cleaned[-1], "tool_calls", None):
-                cleaned.append(m)  
-            else:
-                cleaned.append(m)  
-        else:
-            cleaned.append(m)
+
+def _window_starts(msgs: Sequence[BaseMessage]) -> list[int]:
+    return [i for i, m in enumerate(msgs) if not isinstance(m, ToolMessage)]
+
+
+def _appended(state: MultiAgentState, *msgs: BaseMessage) -> dict:
+    """State update adding `msgs` after the current messages, keeping the window index in step."""
+    index = len(state.get("messages", []))
+    return {
+        "messages": list(msgs),
+        "window_starts": [index + i for i, m in enumerate(msgs) if not isinstance(m, ToolMessage)],
+    }
+
+
+def _context(state: MultiAgentState, role: str) -> list[BaseMessage]:
+    """The latest messages that fit `role`'s token budget, older ones summarized (see context_window.py)."""
+    msgs = state.get("messages", [])
+    starts = state.get("window_starts")
+    if not starts or starts[-1] >= len(msgs):
+        starts = _window_starts(msgs)  # a state that was not built by these nodes
+    return build_context(msgs, starts, role)
+
+
+def _sanitize_for_openai(system_msg: SystemMessage, recent: list[BaseMessage]) -> list[BaseMessage]:
+    start = 0
+    while start < len(recent) and isinstance(recent[start], ToolMessage):
+        start += 1
+    cleaned = recent[start:]
 
     # don't end on tool_calls
     if cleaned and isinstance(cleaned[-1], AIMessage) and getattr(cleaned[-1], "tool_calls", None):
         cleaned = cleaned[:-1]
 
-    return prompt + cleaned
+    return [system_msg, *cleaned]
 
 
 
@@ -111,21 +87,46 @@ toolset = return_all_implemented_tools()
 super_agent = ChatOpenAI(model="gpt-4o-mini").bind_tools(toolset)
 
 
+def flush_staged_writes(agent: Optional[str]) -> Optional[str]:
+    """
+    Commit the file changes staged so far (one commit per branch), e.g. before the next agent takes over.
+    Returns the flush report if some changes could not be committed and are still staged, else None.
+    """
+    if not staging.pending():
+        return None
+    with agent_role(agent):
+        return _report_flush(agent, flush_staged_changes_tool.invoke({}))
+
+
+def _report_flush(agent: Optional[str], result: str) -> Optional[str]:
+    line = f"[{(agent or 'system').upper()} | staged writes] {result}"
+    print(line)
+    append_log(line)
+    return result if staging.pending() else None
+
+
+def _flush_failed(failure: str) -> HumanMessage:
+    # the agent said its changes were done, but they never reached the branch
+    return HumanMessage(content=
+        "Committing your staged file changes failed, so they are NOT on the branch yet:\n"
+        f"{failure}\n"
+        "Fix the cause (e.g. the branch or path), then call flush_staged_changes, before you finish.")
+
+
 def step_router(state: MultiAgentState) -> str:
     return state.get("next_step") or "end"
 
 
-def client_node(state: MultiAgentState) -> MultiAgentState:
+def client_node(state: MultiAgentState) -> dict:
     issue = input("\nUser: Describe the issue to solve: ")
     return {
-        "messages": [HumanMessage(content=issue)],
+        **_appended(state, HumanMessage(content=issue)),
         "next_step": "analyst",
         "agent": "client",
     }
 
 
-def analyst_agent(state: MultiAgentState) -> MultiAgentState:
-    state["agent"] = "analyst"
+def analyst_agent(state: MultiAgentState) -> dict:
     print("[ANALYST] Processing issue...")
     system_msg = SystemMessage(content=
         "Role: Analyst.\n"
@@ -139,16 +140,14 @@ def analyst_agent(state: MultiAgentState) -> MultiAgentState:
         "- A concise bullet list of requirements.\n"
         "- Any uncertainties with a recommended assumption.\n"
         "- The single next role to route to: 'architect'.")
-    recent = _recent(state)
-    prompt = _sanitize_for_openai(system_msg, recent, list(state.get("messages", [])))
+    recent = _context(state, "analyst")
+    prompt = _sanitize_for_openai(system_msg, recent)
     response = super_agent.invoke(prompt)
-    state["messages"] = [*state["messages"], response]
-    state["next_step"] = "analyst_tools" if getattr(response, "tool_calls", None) else "architect"
-    return state
+    next_step = "analyst_tools" if getattr(response, "tool_calls", None) else "architect"
+    return {**_appended(state, response), "next_step": next_step, "agent": "analyst"}
 
 
-def architect_agent(state: MultiAgentState) -> MultiAgentState:
-    state["agent"] = "architect"
+def architect_agent(state: MultiAgentState) -> dict:
     print("[ARCHITECT] Finding affected components...")
     system_msg = SystemMessage(content=
         "Role: Architect.\n"
@@ -160,16 +159,14 @@ def architect_agent(state: MultiAgentState) -> MultiAgentState:
         "- A numbered task list for the Programmer (files to edit/create, branches to use, test files to add).\n"
         "- A numbered task list for the Tester (what to verify, which workflow to expect).\n"
         "- The single next role to route to: 'programmer'.")
-    recent = _recent(state)
-    prompt = _sanitize_for_openai(system_msg, recent, list(state.get("messages", [])))
+    recent = _context(state, "architect")
+    prompt = _sanitize_for_openai(system_msg, recent)
     response = super_agent.invoke(prompt)
-    state["messages"] = [*state["messages"], response]
-    state["next_step"] = "architect_tools" if getattr(response, "tool_calls", None) else "programmer"
-    return state
+    next_step = "architect_tools" if getattr(response, "tool_calls", None) else "programmer"
+    return {**_appended(state, response), "next_step": next_step, "agent": "architect"}
 
 
-def programmer_agent(state: MultiAgentState) -> MultiAgentState:
-    state["agent"] = "programmer"
+def programmer_agent(state: MultiAgentState) -> dict:
     print("[PROGRAMMER] Writing code change...")
     system_msg = SystemMessage(content=
         "Role: Programmer.\n"
@@ -186,16 +183,19 @@ def programmer_agent(state: MultiAgentState) -> MultiAgentState:
         "- Brief summary of edits/commits performed.\n"
         "- If further edits are needed, perform them (using tools) before yielding.\n"
         "- If no more code changes are needed, set next step to 'tester'.")
-    recent = _recent(state)
-    prompt = _sanitize_for_openai(system_msg, recent, list(state.get("messages", [])))
+    recent = _context(state, "programmer")
+    prompt = _sanitize_for_openai(system_msg, recent)
     response = super_agent.invoke(prompt)
-    state["messages"] = [*state["messages"], response]
-    state["next_step"] = "programmer_tools" if getattr(response, "tool_calls", None) else "tester"
-    return state
+    next_step = "programmer_tools" if getattr(response, "tool_calls", None) else "tester"
+    if next_step == "tester":
+        failure = flush_staged_writes("programmer")
+        if failure:
+            return {**_appended(state, response, _flush_failed(failure)),
+                    "next_step": "programmer", "agent": "programmer"}
+    return {**_appended(state, response), "next_step": next_step, "agent": "programmer"}
 
 
-def tester_agent(state: MultiAgentState) -> MultiAgentState:
-    state["agent"] = "tester"
+def tester_agent(state: MultiAgentState) -> dict:
     print("[TESTER] Running tests...")
     system_msg = SystemMessage(content=(
     "Role: Tester.\n"
@@ -216,12 +216,16 @@ def tester_agent(state: MultiAgentState) -> MultiAgentState:
     "- CI run status if available; if newly created, instruct how to check the run.\n"
     "- If failing, list failing tests and propose fixes.\n"
 ))
-    recent = _recent(state)
-    prompt = _sanitize_for_openai(system_msg, recent, list(state.get("messages", [])))
+    recent = _context(state, "tester")
+    prompt = _sanitize_for_openai(system_msg, recent)
     response = super_agent.invoke(prompt)
-    state["messages"] = [*state["messages"], response]
-    state["next_step"] = "tester_tools" if getattr(response, "tool_calls", None) else "end"
-    return state
+    next_step = "tester_tools" if getattr(response, "tool_calls", None) else "end"
+    if next_step == "end":
+        failure = flush_staged_writes("tester")
+        if failure:
+            return {**_appended(state, response, _flush_failed(failure)),
+                    "next_step": "tester", "agent": "tester"}
+    return {**_appended(state, response), "next_step": next_step, "agent": "tester"}
 
 
 graph = StateGraph(MultiAgentState)
@@ -232,10 +236,64 @@ graph.add_node("analyst", analyst_agent)
 graph.add_node("architect", architect_agent)
 graph.add_node("programmer", programmer_agent)
 graph.add_node("tester", tester_agent)
-graph.add_node("done", lambda state: state)
+
+
+def done_node(state: MultiAgentState) -> dict:
+    flush_staged_writes(state.get("agent"))
+    left = staging.pending()
+    if left:
+        # staged changes live only in this process: ending the run now would lose them silently
+        summary = ", ".join(f"{branch} ({count})" for branch, count in left.items())
+        append_log(f"[SYSTEM | staged writes] run failed, changes never committed: {summary}")
+        raise RuntimeError(f"Run ended with staged file changes that could not be committed: {summary}")
+    return {}
+
+
+graph.add_node("done", done_node)
 
 tool_node = ToolNode(toolset)
-graph.add_node("tools", tool_node)
+
+
+def _needs_flush(state: MultiAgentState) -> bool:
+    # tools that look at the branch on GitHub (PRs, commits, CI) must see the staged writes
+    calls = getattr(state["messages"][-1], "tool_calls", None) or []
+    return any(c["name"] in staging.FLUSH_BEFORE for c in calls) and bool(staging.pending())
+
+
+def _compacted(update: dict) -> dict:
+    # raw tool outputs are normalized and capped before they enter the state (see shared/tool_output.py)
+    return {**update, "messages": tool_output.compact_messages(update.get("messages", []))}
+
+
+def _not_run(state: MultiAgentState, failure: str) -> dict:
+    # the calls would read a branch that is missing the staged changes; answer them with the failure instead
+    calls = state["messages"][-1].tool_calls
+    return {"messages": [
+        ToolMessage(content=f"Not run: the staged file changes had to be committed first and that failed:\n{failure}",
+                    tool_call_id=c["id"], name=c["name"])
+        for c in calls]}
+
+
+def tools_node(state: MultiAgentState, config: RunnableConfig) -> dict:
+    if _needs_flush(state):
+        failure = flush_staged_writes(state.get("agent"))
+        if failure:
+            return _not_run(state, failure)
+    # tag the MCP latency spans with the agent whose tool calls are being executed
+    with agent_role(state.get("agent")):
+        return _compacted(tool_node.invoke(state, config))
+
+
+async def atools_node(state: MultiAgentState, config: RunnableConfig) -> dict:
+    with agent_role(state.get("agent")):
+        if _needs_flush(state):
+            failure = _report_flush(state.get("agent"), await flush_staged_changes_tool.ainvoke({}))
+            if failure:
+                return _not_run(state, failure)
+        return _compacted(await tool_node.ainvoke(state, config))
+
+
+graph.add_node("tools", RunnableLambda(tools_node, afunc=atools_node))
 
 graph.set_entry_point("client")
 
@@ -255,11 +313,13 @@ graph.add_conditional_edges("architect", step_router, {
 
 graph.add_conditional_edges("programmer", step_router, {
     "programmer_tools": "tools",
+    "programmer": "programmer",  # its staged changes could not be committed
     "tester": "tester",
 })
 
 graph.add_conditional_edges("tester", step_router, {
     "tester_tools": "tools",
+    "tester": "tester",  # its staged changes could not be committed
     "end": "done",
 })
 
@@ -276,7 +336,10 @@ app = graph.compile()
 
 def run_agent():
     print("\n=== STARTING MULTI-AGENT WORKFLOW ===")
-    state: MultiAgentState = {"messages": [], "next_step": None, "agent": None}
+    # build (or reuse) the cached server binary up front instead of on the first tool call
+    if not os.getenv("MCP_STAND_IN"):
+        ensure_server_binary(os.getenv("github_mcp_server_location", ""))
+    state: MultiAgentState = {"messages": [], "window_starts": [], "next_step": None, "agent": None}
 
     for step in app.stream(state, stream_mode="values", config={"recursion_limit": 60}):
         step_agent = step.get("agent")  # set by each node above